@@ -0,0 +1,144 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from core.ai_integrations.claude_client import ClaudeClient
+
+
+MOCK_MESSAGE = {
+    "id": "msg_benchmark",
+    "type": "message",
+    "role": "assistant",
+    "model": "claude-3-5-sonnet-latest",
+    "content": [{"type": "text", "text": "Warm-up: 5 minutes of light cardio."}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 250, "output_tokens": 40},
+}
+
+
+class MockAnthropicServer(ThreadingHTTPServer):
+    """Minimal stand-in for the Messages API that counts TCP connections"""
+    daemon_threads = True
+
+    def __init__(self, latency_seconds):
+        super().__init__(("127.0.0.1", 0), MockAnthropicHandler)
+        self.latency_seconds = latency_seconds
+        self.connections = 0
+        self._connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+
+class MockAnthropicHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        time.sleep(self.server.latency_seconds)
+
+        body = json.dumps(MOCK_MESSAGE).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-request vs shared ClaudeClient against a local mock Anthropic server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--latency-ms", type=float, default=20.0,
+                            help="Simulated upstream generation latency")
+
+    def handle(self, *args, **options):
+        server = MockAnthropicServer(options["latency_ms"] / 1000)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        profile = {"age": 30, "fitness_level": "Beginner", "goals": ["strength"]}
+
+        try:
+            def per_request_call():
+                client = ClaudeClient(api_key="benchmark", base_url=server.base_url)
+                try:
+                    return client.generate_workout(profile, "strength")
+                finally:
+                    client.close()
+
+            shared = ClaudeClient(api_key="benchmark", base_url=server.base_url)
+
+            def shared_call():
+                return shared.generate_workout(profile, "strength")
+
+            for label, call in (("per-request client", per_request_call), ("shared client", shared_call)):
+                server.connections = 0
+                result = self._run(call, options["concurrency"], options["requests"])
+                result["connections"] = server.connections
+                self._report(label, result)
+
+            shared.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _run(self, call, concurrency, total):
+        latencies = []
+        failures = 0
+        lock = threading.Lock()
+
+        def timed():
+            nonlocal failures
+            start = time.perf_counter()
+            response = call()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not response["success"]:
+                    failures += 1
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(total):
+                executor.submit(timed)
+        wall = time.perf_counter() - wall_start
+
+        latencies.sort()
+        return {
+            "requests": total,
+            "concurrency": concurrency,
+            "failures": failures,
+            "wall_seconds": wall,
+            "throughput": total / wall,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+
+    def _report(self, label, result):
+        self.stdout.write(
+            f"{label:>20}: {result['requests']} requests @ {result['concurrency']} concurrent, "
+            f"{result['throughput']:.1f} req/s, mean {result['mean_ms']:.1f} ms, "
+            f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+            f"{result['connections']} TCP connections, {result['failures']} failures"
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='cache_hit',
+            field=models.BooleanField(default=False, help_text='Served from the generation cache'),
+        ),
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
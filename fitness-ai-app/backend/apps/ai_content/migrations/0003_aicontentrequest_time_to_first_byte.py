@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0002_aicontentrequest_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='time_to_first_byte_seconds',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Delay before the first streamed token reached the client', max_digits=6, null=True),
+        ),
+    ]
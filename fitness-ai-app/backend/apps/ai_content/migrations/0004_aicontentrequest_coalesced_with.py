@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0003_aicontentrequest_time_to_first_byte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='coalesced_with',
+            field=models.ForeignKey(blank=True, help_text='Request whose in-flight generation this one shared', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='coalesced_requests', to='ai_content.aicontentrequest'),
+        ),
+    ]
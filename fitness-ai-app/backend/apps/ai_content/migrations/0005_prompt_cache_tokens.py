@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0004_aicontentrequest_coalesced_with'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='cache_read_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Input tokens served from the prompt cache'),
+        ),
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='cache_write_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Input tokens written to the prompt cache'),
+        ),
+        migrations.AddField(
+            model_name='aiusagestats',
+            name='total_cache_read_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aiusagestats',
+            name='total_cache_write_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
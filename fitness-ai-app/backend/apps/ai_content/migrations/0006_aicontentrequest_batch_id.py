@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0005_prompt_cache_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='batch_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Batch job generating this request', max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0006_aicontentrequest_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicontentrequest',
+            name='model_used',
+            field=models.CharField(blank=True, help_text='Model that produced the content', max_length=100),
+        ),
+    ]
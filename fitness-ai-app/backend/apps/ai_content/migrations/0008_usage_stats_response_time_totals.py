@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:34
+
+from django.db import migrations, models
+
+
+def seed_response_time_totals(apps, schema_editor):
+    """Carry the old running average over as if every request had that latency"""
+    AIUsageStats = apps.get_model('ai_content', 'AIUsageStats')
+    for stats in AIUsageStats.objects.exclude(avg_response_time=None).exclude(total_requests=0):
+        stats.response_time_count = stats.total_requests
+        stats.total_response_time = stats.avg_response_time * stats.total_requests
+        stats.save(update_fields=['response_time_count', 'total_response_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0007_aicontentrequest_model_used'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiusagestats',
+            name='response_time_count',
+            field=models.PositiveIntegerField(default=0, help_text='Requests with a recorded response time'),
+        ),
+        migrations.AddField(
+            model_name='aiusagestats',
+            name='total_response_time',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(seed_response_time_totals, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='aiusagestats',
+            name='avg_response_time',
+        ),
+    ]
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -30,7 +31,23 @@ class AIContentRequest(models.Model):
     # Response data
     generated_content = models.TextField(blank=True)
     tokens_used = models.PositiveIntegerField(null=True, blank=True)
+    cache_read_tokens = models.PositiveIntegerField(default=0, help_text="Input tokens served from the prompt cache")
+    cache_write_tokens = models.PositiveIntegerField(default=0, help_text="Input tokens written to the prompt cache")
     generation_time_seconds = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    model_used = models.CharField(max_length=100, blank=True, help_text="Model that produced the content")
+    time_to_first_byte_seconds = models.DecimalField(
+        max_digits=6, decimal_places=3, null=True, blank=True,
+        help_text="Delay before the first streamed token reached the client"
+    )
+    
+    # Generation cache
+    cache_hit = models.BooleanField(default=False, help_text="Served from the generation cache")
+    cache_key = models.CharField(max_length=64, blank=True, db_index=True)
+    batch_id = models.CharField(max_length=100, blank=True, db_index=True, help_text="Batch job generating this request")
+    coalesced_with = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='coalesced_requests',
+        help_text="Request whose in-flight generation this one shared"
+    )
     
     # Quality metrics
     user_rating = models.PositiveIntegerField(
@@ -148,6 +165,8 @@ class AIUsageStats(models.Model):
     successful_requests = models.PositiveIntegerField(default=0)
     failed_requests = models.PositiveIntegerField(default=0)
     total_tokens_used = models.PositiveIntegerField(default=0)
+    total_cache_read_tokens = models.PositiveIntegerField(default=0)
+    total_cache_write_tokens = models.PositiveIntegerField(default=0)
     
     # Request type breakdown
     workout_requests = models.PositiveIntegerField(default=0)
@@ -155,7 +174,8 @@ class AIUsageStats(models.Model):
     health_analysis_requests = models.PositiveIntegerField(default=0)
     
     # Performance metrics
-    avg_response_time = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    response_time_count = models.PositiveIntegerField(default=0, help_text="Requests with a recorded response time")
+    total_response_time = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     avg_user_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -169,6 +189,12 @@ class AIUsageStats(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.date}"
 
+    @property
+    def avg_response_time(self):
+        if not self.response_time_count:
+            return None
+        return (self.total_response_time / self.response_time_count).quantize(Decimal('0.01'))
+
 
 class ContentTemplate(models.Model):
     TEMPLATE_TYPE_CHOICES = [
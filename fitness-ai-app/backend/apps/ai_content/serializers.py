@@ -10,13 +10,16 @@ class AIContentRequestSerializer(serializers.ModelSerializer):
         model = AIContentRequest
         fields = [
             'id', 'content_type', 'status', 'user_context', 'prompt_context',
-            'generated_content', 'tokens_used', 'generation_time_seconds',
-            'user_rating', 'user_feedback', 'error_message', 'retry_count',
-            'created_at', 'updated_at', 'completed_at'
+            'generated_content', 'tokens_used', 'cache_read_tokens', 'cache_write_tokens',
+            'generation_time_seconds', 'time_to_first_byte_seconds', 'model_used', 'cache_hit', 'coalesced_with',
+            'user_rating', 'user_feedback',
+            'error_message', 'retry_count', 'created_at', 'updated_at', 'completed_at'
         ]
         read_only_fields = [
-            'id', 'generated_content', 'tokens_used', 'generation_time_seconds',
-            'error_message', 'retry_count', 'created_at', 'updated_at', 'completed_at'
+            'id', 'generated_content', 'tokens_used', 'cache_read_tokens', 'cache_write_tokens',
+            'generation_time_seconds', 'time_to_first_byte_seconds', 'model_used', 'cache_hit', 'coalesced_with',
+            'error_message', 'retry_count',
+            'created_at', 'updated_at', 'completed_at'
         ]
 
     def create(self, validated_data):
@@ -52,12 +55,16 @@ class HealthInsightSerializer(serializers.ModelSerializer):
 
 
 class AIUsageStatsSerializer(serializers.ModelSerializer):
+    avg_response_time = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True, allow_null=True)
+
     class Meta:
         model = AIUsageStats
         fields = [
             'date', 'total_requests', 'successful_requests', 'failed_requests',
-            'total_tokens_used', 'workout_requests', 'nutrition_requests',
-            'health_analysis_requests', 'avg_response_time', 'avg_user_rating'
+            'total_tokens_used', 'total_cache_read_tokens', 'total_cache_write_tokens',
+            'workout_requests', 'nutrition_requests',
+            'health_analysis_requests', 'response_time_count', 'total_response_time',
+            'avg_response_time', 'avg_user_rating'
         ]
 
 
@@ -99,6 +106,7 @@ class WorkoutGenerationRequestSerializer(serializers.Serializer):
         required=False
     )
     custom_requirements = serializers.CharField(required=False)
+    use_cache = serializers.BooleanField(default=True)
 
 
 class NutritionGenerationRequestSerializer(serializers.Serializer):
@@ -132,6 +140,7 @@ class NutritionGenerationRequestSerializer(serializers.Serializer):
         choices=['minimal', 'moderate', 'extensive'],
         required=False
     )
+    use_cache = serializers.BooleanField(default=True)
 
 
 class HealthAnalysisRequestSerializer(serializers.Serializer):
@@ -148,10 +157,16 @@ class HealthAnalysisRequestSerializer(serializers.Serializer):
 class AIGenerationResponseSerializer(serializers.Serializer):
     success = serializers.BooleanField()
     request_id = serializers.IntegerField(required=False)
+    status = serializers.CharField(required=False)
+    retry_count = serializers.IntegerField(required=False)
     content = serializers.CharField(required=False)
     structured_data = serializers.DictField(required=False)
     tokens_used = serializers.IntegerField(required=False)
     generation_time = serializers.FloatField(required=False)
+    cache_hit = serializers.BooleanField(required=False)
+    model = serializers.CharField(required=False)
+    coalesced_with = serializers.IntegerField(required=False)
+    time_to_first_byte = serializers.FloatField(required=False)
     error_message = serializers.CharField(required=False)
     recommendations = serializers.ListField(
         child=serializers.CharField(),
@@ -0,0 +1,344 @@
+import json
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from typing import Dict, Optional
+
+from .models import AIContentRequest, NutritionPlan, HealthInsight, AIUsageStats
+from apps.workouts.models import Workout
+from core.ai_integrations.singleflight import single_flight
+
+
+# Key holding the generated text in each ClaudeClient response
+RESULT_KEYS = {
+    'workout': 'workout',
+    'nutrition': 'nutrition_plan',
+    'health_analysis': 'analysis',
+}
+
+# Per-type request counter on AIUsageStats
+USAGE_TYPE_COUNTERS = {
+    'workout': 'workout_requests',
+    'nutrition': 'nutrition_requests',
+    'health_analysis': 'health_analysis_requests',
+}
+
+
+def build_workout_profile(user, preferences: Dict) -> Dict:
+    """Build the user profile sent to Claude for workout generation"""
+    return {
+        'age': user.get_age(),
+        'gender': user.get_gender_display() if user.gender else 'Not specified',
+        'fitness_level': user.get_fitness_level_display(),
+        'goals': user.get_fitness_goals(),
+        'workout_duration': preferences.get('duration_minutes', user.preferred_workout_duration),
+        'equipment': preferences.get('equipment_available', user.get_available_equipment()),
+        'activity_level': user.get_activity_level_display(),
+        'medical_conditions': 'None specified'  # Would integrate with medical data
+    }
+
+
+def build_nutrition_profile(user, preferences: Dict) -> Dict:
+    """Build the user profile sent to Claude for nutrition planning"""
+    user_profile = {
+        'age': user.get_age(),
+        'gender': user.get_gender_display() if user.gender else 'Not specified',
+        'weight': float(user.weight) if user.weight else None,
+        'height': user.height,
+        'activity_level': user.get_activity_level_display(),
+        'fitness_goals': user.get_fitness_goals(),
+        'dietary_restrictions': user.dietary_restrictions or 'None specified'
+    }
+
+    # Add request-specific preferences
+    user_profile.update({key: value for key, value in preferences.items() if key != 'use_cache'})
+    return user_profile
+
+
+def build_medical_snapshot(latest_medical) -> Dict:
+    """Extract the vitals sent to Claude for health analysis"""
+    if not latest_medical:
+        return {}
+
+    return {
+        'heart_rate': latest_medical.resting_heart_rate,
+        'blood_pressure': f"{latest_medical.blood_pressure_systolic}/{latest_medical.blood_pressure_diastolic}" if latest_medical.blood_pressure_systolic else None,
+        'sleep_quality': latest_medical.sleep_hours,
+        'stress_level': latest_medical.stress_level,
+        'energy_level': latest_medical.energy_level
+    }
+
+
+def call_client(claude_client, ai_request: AIContentRequest, stream: bool = False):
+    """Invoke the ClaudeClient method that produces ai_request.
+
+    Returns whatever the client returns: a response dict (ClaudeClient), a
+    coroutine (AsyncClaudeClient) or, with stream=True, an async iterator of
+    streaming events.
+    """
+    user_context = ai_request.user_context
+    prompt_context = ai_request.prompt_context
+    use_cache = prompt_context.get('use_cache', True)
+
+    if ai_request.content_type == 'workout':
+        method = claude_client.stream_workout if stream else claude_client.generate_workout
+        workout_type = prompt_context.get('workout_type', 'general')
+        return method(user_context, workout_type, use_cache=use_cache)
+
+    if ai_request.content_type == 'nutrition':
+        method = claude_client.stream_nutrition_plan if stream else claude_client.generate_nutrition_plan
+        goals = prompt_context.get('goals', user_context.get('fitness_goals', []))
+        return method(user_context, goals, use_cache=use_cache)
+
+    if ai_request.content_type == 'health_analysis':
+        method = claude_client.stream_medical_analysis if stream else claude_client.analyze_medical_data
+        return method(user_context.get('medical_data', {}))
+
+    raise ValueError(f"Unsupported content type: {ai_request.content_type}")
+
+
+def request_fingerprint(claude_client, ai_request: AIContentRequest) -> Optional[str]:
+    """Key identifying requests that can share one generation, or None if it must run alone"""
+    user_context = ai_request.user_context
+    prompt_context = ai_request.prompt_context
+    if not prompt_context.get('use_cache', True):
+        return None
+
+    if ai_request.content_type == 'workout':
+        return claude_client.workout_fingerprint(user_context, prompt_context.get('workout_type', 'general'))
+
+    if ai_request.content_type == 'nutrition':
+        goals = prompt_context.get('goals', user_context.get('fitness_goals', []))
+        return claude_client.nutrition_fingerprint(user_context, goals)
+
+    return None
+
+
+def generate_coalesced(claude_client, ai_request: AIContentRequest) -> Dict:
+    """Run ai_request through a sync ClaudeClient, sharing one upstream call with
+    identical requests in flight in this or any other worker.
+
+    The response carries source_request_id, the request whose call produced it.
+    """
+    def generate():
+        ai_response = call_client(claude_client, ai_request)
+        ai_response['source_request_id'] = ai_request.id
+        return ai_response
+
+    fingerprint = request_fingerprint(claude_client, ai_request)
+    if fingerprint is None:
+        return generate()
+    return single_flight.do(fingerprint, generate)
+
+
+def finish_generation(ai_request: AIContentRequest, ai_response: Dict, generation_time: Optional[float],
+                      time_to_first_byte: Optional[float] = None) -> Dict:
+    """Record a ClaudeClient response on its request and build the API payload.
+
+    Pass generation_time=None when the wall time is not a response time
+    (e.g. batch jobs); it is then left out of the latency stats.
+    """
+    if generation_time is not None:
+        generation_time = round(generation_time, 2)
+
+    content_type = ai_request.content_type
+    user = ai_request.user
+
+    if not ai_response['success']:
+        ai_request.status = 'failed'
+        ai_request.error_message = ai_response['error']
+        ai_request.save()
+
+        update_ai_usage_stats(user, content_type, False, 0, generation_time)
+
+        return {
+            'success': False,
+            'error_message': ai_response['error']
+        }
+
+    content = ai_response[RESULT_KEYS[content_type]]
+    tokens_used = ai_response.get('tokens_used', 0)
+    cache_read_tokens = ai_response.get('cache_read_tokens', 0)
+    cache_write_tokens = ai_response.get('cache_write_tokens', 0)
+
+    # Coalesced onto another request's upstream call: link to it, no tokens of our own
+    source_request_id = ai_response.get('source_request_id')
+    if source_request_id and source_request_id != ai_request.id:
+        ai_request.coalesced_with_id = source_request_id
+        tokens_used = cache_read_tokens = cache_write_tokens = 0
+
+    ai_request.status = 'completed'
+    ai_request.generated_content = content
+    ai_request.error_message = ''
+    ai_request.tokens_used = tokens_used
+    ai_request.cache_read_tokens = cache_read_tokens
+    ai_request.cache_write_tokens = cache_write_tokens
+    ai_request.generation_time_seconds = generation_time
+    if time_to_first_byte is not None:
+        ai_request.time_to_first_byte_seconds = round(time_to_first_byte, 3)
+    ai_request.model_used = ai_response.get('model', '')
+    ai_request.cache_hit = ai_response.get('cache_hit', False)
+    ai_request.cache_key = ai_response.get('cache_key', '')
+    ai_request.completed_at = timezone.now()
+    ai_request.save()
+
+    structured_data = _materialize_content(ai_request, content)
+
+    update_ai_usage_stats(
+        user, content_type, True, tokens_used, generation_time,
+        cache_read_tokens=cache_read_tokens, cache_write_tokens=cache_write_tokens
+    )
+
+    response_data = {
+        'success': True,
+        'request_id': ai_request.id,
+        'content': content,
+        'tokens_used': tokens_used,
+        'generation_time': generation_time,
+        'cache_hit': ai_request.cache_hit
+    }
+    if ai_request.model_used:
+        response_data['model'] = ai_request.model_used
+    if ai_request.coalesced_with_id:
+        response_data['coalesced_with'] = ai_request.coalesced_with_id
+    if time_to_first_byte is not None:
+        response_data['time_to_first_byte'] = round(time_to_first_byte, 3)
+    if structured_data:
+        response_data['structured_data'] = structured_data
+    return response_data
+
+
+def abort_generation(ai_request: AIContentRequest, error: Exception, generation_time: Optional[float]) -> Dict:
+    """Mark a request failed after an unexpected error"""
+    ai_request.status = 'failed'
+    ai_request.error_message = str(error)
+    ai_request.save()
+
+    update_ai_usage_stats(ai_request.user, ai_request.content_type, False, 0, generation_time)
+
+    return {
+        'success': False,
+        'error_message': 'AI service temporarily unavailable'
+    }
+
+
+def generation_status(ai_request: AIContentRequest) -> Dict:
+    """Build the status payload for a queued request, including the result once finished"""
+    response_data = {
+        'success': ai_request.status != 'failed',
+        'request_id': ai_request.id,
+        'status': ai_request.status,
+        'retry_count': ai_request.retry_count
+    }
+
+    if ai_request.status == 'failed':
+        response_data['error_message'] = ai_request.error_message
+    elif ai_request.status == 'completed':
+        response_data.update({
+            'content': ai_request.generated_content,
+            'tokens_used': ai_request.tokens_used or 0,
+            'generation_time': float(ai_request.generation_time_seconds or 0),
+            'cache_hit': ai_request.cache_hit
+        })
+        if ai_request.model_used:
+            response_data['model'] = ai_request.model_used
+        if ai_request.coalesced_with_id:
+            response_data['coalesced_with'] = ai_request.coalesced_with_id
+        structured_data = _materialized_content(ai_request)
+        if structured_data:
+            response_data['structured_data'] = structured_data
+
+    return response_data
+
+
+def _materialized_content(ai_request: AIContentRequest) -> Optional[Dict]:
+    """Look up the domain objects created for a completed generation"""
+    if ai_request.content_type == 'workout':
+        workout_id = Workout.objects.filter(ai_request=ai_request).values_list('id', flat=True).first()
+        return {'workout_id': workout_id} if workout_id else None
+
+    if ai_request.content_type == 'nutrition':
+        plan_id = NutritionPlan.objects.filter(ai_request=ai_request).values_list('id', flat=True).first()
+        return {'nutrition_plan_id': plan_id} if plan_id else None
+
+    if ai_request.content_type == 'health_analysis':
+        insight_id = HealthInsight.objects.filter(ai_request=ai_request).values_list('id', flat=True).first()
+        return {'insight_id': insight_id} if insight_id else None
+
+    return None
+
+
+def _materialize_content(ai_request: AIContentRequest, content: str) -> Optional[Dict]:
+    """Create the domain objects that accompany a completed generation"""
+    # Pre-generated workouts are scheduled by their batch job instead, see apps.workouts.pregeneration
+    if ai_request.content_type == 'workout' and ai_request.prompt_context.get('create_workout'):
+        workout = Workout.objects.create(
+            user=ai_request.user,
+            ai_request=ai_request,
+            name=f"AI Generated {ai_request.prompt_context.get('workout_type', 'general').title()} Workout",
+            scheduled_date=timezone.now(),
+            ai_prompt_context=json.dumps(ai_request.prompt_context)
+        )
+        return {'workout_id': workout.id}
+
+    if ai_request.content_type == 'nutrition':
+        nutrition_plan = NutritionPlan.objects.create(
+            user=ai_request.user,
+            ai_request=ai_request,
+            name=f"AI Nutrition Plan - {timezone.now().strftime('%Y-%m-%d')}",
+            description="Personalized nutrition plan generated by AI",
+            meal_plan={},  # Would parse from AI response
+            duration_days=ai_request.prompt_context.get('plan_duration_days', 7)
+        )
+        return {'nutrition_plan_id': nutrition_plan.id}
+
+    if ai_request.content_type == 'health_analysis':
+        health_insight = HealthInsight.objects.create(
+            user=ai_request.user,
+            ai_request=ai_request,
+            insight_type='general',
+            priority='medium',
+            title=f"Health Analysis - {timezone.now().strftime('%Y-%m-%d')}",
+            content=content,
+            data_sources=ai_request.user_context.get('medical_data', {}),
+            confidence_score=0.85  # Would be calculated based on data quality
+        )
+        return {'insight_id': health_insight.id}
+
+    return None
+
+
+def update_ai_usage_stats(user, request_type, success, tokens_used, response_time,
+                          cache_read_tokens=0, cache_write_tokens=0):
+    """Add one request to the user's daily AI usage statistics.
+
+    Counters are incremented in the database with F() expressions, so
+    concurrent requests never lose updates; normally this is one UPDATE.
+    """
+    increments = {
+        'total_requests': 1,
+        'successful_requests' if success else 'failed_requests': 1,
+        'total_tokens_used': tokens_used,
+        'total_cache_read_tokens': cache_read_tokens,
+        'total_cache_write_tokens': cache_write_tokens,
+    }
+    type_counter = USAGE_TYPE_COUNTERS.get(request_type)
+    if type_counter:
+        increments[type_counter] = 1
+    if response_time is not None:
+        increments['response_time_count'] = 1
+        increments['total_response_time'] = Decimal(str(round(response_time, 2)))
+
+    today = timezone.now().date()
+    updates = {field: F(field) + value for field, value in increments.items() if value}
+    updates['updated_at'] = timezone.now()
+
+    if AIUsageStats.objects.filter(user=user, date=today).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            AIUsageStats.objects.create(user=user, date=today, **increments)
+    except IntegrityError:
+        # Another request created today's row first
+        AIUsageStats.objects.filter(user=user, date=today).update(**updates)
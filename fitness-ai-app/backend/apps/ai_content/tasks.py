@@ -0,0 +1,47 @@
+import time
+
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+
+from .models import AIContentRequest
+from .services import generate_coalesced, finish_generation, abort_generation
+from core.ai_integrations.claude_client import get_claude_client
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=settings.AI_GENERATION_MAX_RETRIES)
+def generate_content_task(self, request_id):
+    """Run a queued AIContentRequest through Claude, retrying transient API errors"""
+    try:
+        ai_request = AIContentRequest.objects.select_related('user').get(id=request_id)
+    except AIContentRequest.DoesNotExist:
+        return
+
+    # Redelivered after the request already finished (acks_late)
+    if ai_request.status in ('completed', 'failed'):
+        return
+
+    ai_request.status = 'processing'
+    ai_request.save(update_fields=['status', 'updated_at'])
+    start_time = time.time()
+
+    try:
+        ai_response = generate_coalesced(get_claude_client(), ai_request)
+    except Exception as e:
+        abort_generation(ai_request, e, time.time() - start_time)
+        return
+
+    if not ai_response['success'] and ai_response.get('retryable') and self.request.retries < self.max_retries:
+        countdown = get_exponential_backoff_interval(
+            factor=settings.AI_GENERATION_RETRY_BACKOFF,
+            retries=self.request.retries,
+            maximum=settings.AI_GENERATION_RETRY_BACKOFF_MAX,
+            full_jitter=True
+        )
+        ai_request.status = 'pending'
+        ai_request.error_message = ai_response['error']
+        ai_request.retry_count = self.request.retries + 1
+        ai_request.save(update_fields=['status', 'error_message', 'retry_count', 'updated_at'])
+        raise self.retry(countdown=countdown)
+
+    finish_generation(ai_request, ai_response, time.time() - start_time)
@@ -1,3 +1,226 @@
+import json
+import time
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from core.ai_integrations.providers import StubProvider
+from core.testing import QueryBudgetMixin, StubAIMixin
+
+from .models import AIContentRequest, NutritionPlan, HealthInsight, AIUsageStats
+from .services import update_ai_usage_stats
+from .tasks import generate_content_task
+
+User = get_user_model()
+
+
+class AIContentQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password='x')
+        source = None
+        for i in range(15):
+            ai_request = AIContentRequest.objects.create(
+                user=cls.user, content_type='workout', status='completed', user_context={}, prompt_context={},
+                generated_content='Workout', coalesced_with=source
+            )
+            source = source or ai_request
+            NutritionPlan.objects.create(
+                user=cls.user, ai_request=ai_request, name=f'Plan {i}', description='d', meal_plan={}
+            )
+            HealthInsight.objects.create(
+                user=cls.user, ai_request=ai_request, insight_type='general', title=f'Insight {i}',
+                content='c', data_sources=[]
+            )
+        cls.ai_request = ai_request
+        cls.plan = NutritionPlan.objects.filter(user=cls.user).first()
+        cls.insight = HealthInsight.objects.filter(user=cls.user).first()
+        AIUsageStats.objects.create(user=cls.user, date=date.today(), total_requests=15)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_request_list(self):
+        self.assertBudget(2, '/api/ai/requests/')
+
+    def test_nutrition_plan_list(self):
+        self.assertBudget(2, '/api/ai/nutrition/')
+
+    def test_nutrition_plan_detail(self):
+        self.assertBudget(1, f'/api/ai/nutrition/{self.plan.id}/')
+
+    def test_insight_list(self):
+        self.assertBudget(2, '/api/ai/insights/')
+
+    def test_insight_detail(self):
+        self.assertBudget(1, f'/api/ai/insights/{self.insight.id}/')
+
+    def test_usage_stats(self):
+        self.assertBudget(2, '/api/ai/usage-stats/')
+
+
+class AIStreamingTests(StubAIMixin, APITestCase):
+    """Generations streamed to the client as server-sent events"""
+
+    url = '/api/ai/generate/workout/stream/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='stream@example.com', username='stream', password='x')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def stream(self, data):
+        """POST to the stream endpoint; returns its (event, data) pairs in order"""
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        events = []
+        for block in async_to_sync(read)().decode().strip().split('\n\n'):
+            event, data = block.split('\n')
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+    def test_tokens_then_the_final_payload(self):
+        events = self.stream({'workout_type': 'strength'})
+        self.assertEqual(events[0][0], 'start')
+        self.assertEqual(events[-1][0], 'done')
+        tokens = [data['text'] for event, data in events if event == 'token']
+        self.assertGreater(len(tokens), 1)
+        done = events[-1][1]
+        self.assertEqual(''.join(tokens).strip(), done['content'])
+        self.assertFalse(done['cache_hit'])
+
+        ai_request = AIContentRequest.objects.get(id=events[0][1]['request_id'])
+        self.assertEqual(ai_request.status, 'completed')
+        self.assertEqual(ai_request.generated_content, done['content'])
+        self.assertIsNotNone(ai_request.time_to_first_byte_seconds)
+
+    def test_cached_generation_streams_in_one_token(self):
+        self.stream({'workout_type': 'strength'})
+        events = self.stream({'workout_type': 'strength'})
+        self.assertEqual([event for event, _ in events], ['start', 'token', 'done'])
+        self.assertTrue(events[-1][1]['cache_hit'])
+
+    def test_upstream_failure_ends_with_an_error_event(self):
+        with mock.patch.object(StubProvider, 'acreate', side_effect=TimeoutError('No answer')):
+            events = self.stream({'workout_type': 'strength'})
+        self.assertEqual([event for event, _ in events], ['start', 'error'])
+        self.assertFalse(events[-1][1]['success'])
+        self.assertEqual(AIContentRequest.objects.get(id=events[0][1]['request_id']).status, 'failed')
+
+
+class AIGenerationQueueTests(StubAIMixin, APITestCase):
+    """Generations queued for the Celery worker and polled through the status endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='queue@example.com', username='queue', password='x')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_queued_generation_is_polled_to_completion(self):
+        response = self.client.post('/api/ai/generate/nutrition/', {'goals': ['lose weight']}, format='json')
+        self.assertEqual(response.status_code, 202)
+        request_id = response.json()['request_id']
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertEqual(response['Location'], f'/api/ai/requests/{request_id}/')
+
+        result = self.client.get(response['Location']).json()
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['retry_count'], 0)
+        plan = NutritionPlan.objects.get(id=result['structured_data']['nutrition_plan_id'])
+        self.assertEqual(plan.ai_request_id, request_id)
+
+    def test_transient_failures_are_retried(self):
+        # Primary and fallback both time out once, then the retried task succeeds
+        calls = iter([TimeoutError('No answer'), TimeoutError('No answer')])
+
+        def create(provider, params, timeout):
+            error = next(calls, None)
+            if error:
+                raise error
+            return original_create(provider, params, timeout)
+
+        original_create = StubProvider.create
+        with mock.patch.object(StubProvider, 'create', autospec=True, side_effect=create):
+            response = self.client.post('/api/ai/generate/workout/', {'workout_type': 'cardio'}, format='json')
+        result = self.client.get(response['Location']).json()
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['retry_count'], 1)
+
+    def test_unreachable_broker_fails_the_request(self):
+        with mock.patch.object(generate_content_task, 'delay', side_effect=ConnectionError('Broker down')):
+            response = self.client.post('/api/ai/generate/workout/', {'workout_type': 'cardio'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(AIContentRequest.objects.get(user=self.user).status, 'failed')
+
+    def test_status_long_polls_an_unfinished_request(self):
+        ai_request = AIContentRequest.objects.create(
+            user=self.user, content_type='workout', status='pending', user_context={}, prompt_context={}
+        )
+        with mock.patch('apps.ai_content.views.LONG_POLL_INTERVAL', 0.05):
+            started = time.monotonic()
+            result = self.client.get(f'/api/ai/requests/{ai_request.id}/?wait=0.2').json()
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(result['status'], 'pending')
+
+    def test_other_users_requests_are_not_found(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='x')
+        ai_request = AIContentRequest.objects.create(
+            user=other, content_type='workout', status='completed', user_context={}, prompt_context={}
+        )
+        self.assertEqual(self.client.get(f'/api/ai/requests/{ai_request.id}/').status_code, 404)
+
+
+class AIUsageStatsTests(TestCase):
+    """Daily usage counters are incremented in the database"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='usage@example.com', username='usage', password='x')
+
+    def test_requests_accumulate_in_one_row(self):
+        update_ai_usage_stats(self.user, 'workout', True, 100, 1.5, cache_read_tokens=40, cache_write_tokens=60)
+        with self.assertNumQueries(1):
+            update_ai_usage_stats(self.user, 'nutrition', False, 0, None)
+        update_ai_usage_stats(self.user, 'workout', True, 50, 0.5, cache_read_tokens=40)
+
+        stats = AIUsageStats.objects.get(user=self.user)
+        self.assertEqual((stats.total_requests, stats.successful_requests, stats.failed_requests), (3, 2, 1))
+        self.assertEqual((stats.workout_requests, stats.nutrition_requests), (2, 1))
+        self.assertEqual(stats.total_tokens_used, 150)
+        self.assertEqual((stats.total_cache_read_tokens, stats.total_cache_write_tokens), (80, 60))
+        self.assertEqual(stats.response_time_count, 2)
+        self.assertEqual(float(stats.total_response_time), 2.0)
+
+    def test_row_created_by_a_concurrent_request_is_updated(self):
+        update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            # Another request creates today's row between our UPDATE and INSERT
+            if not raced:
+                raced.append(True)
+                update_ai_usage_stats(self.user, 'workout', True, 10, 1.0)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=racing_update):
+            update_ai_usage_stats(self.user, 'health_analysis', True, 20, 1.0)
 
-# Create your tests here.
+        stats = AIUsageStats.objects.get(user=self.user)
+        self.assertEqual(stats.total_requests, 2)
+        self.assertEqual(stats.total_tokens_used, 30)
+        self.assertEqual((stats.workout_requests, stats.health_analysis_requests), (1, 1))
@@ -4,12 +4,16 @@ from . import views
 urlpatterns = [
     # AI Content Requests
     path('requests/', views.AIContentRequestListView.as_view(), name='ai-request-list'),
+    path('requests/<int:request_id>/', views.ai_request_status_view, name='ai-request-status'),
     path('requests/<int:request_id>/feedback/', views.submit_feedback_view, name='ai-request-feedback'),
     
     # AI Generation Endpoints
     path('generate/workout/', views.generate_workout_view, name='generate-workout'),
     path('generate/nutrition/', views.generate_nutrition_plan_view, name='generate-nutrition'),
     path('analyze/health/', views.analyze_health_data_view, name='analyze-health'),
+    path('generate/workout/stream/', views.generate_workout_stream_view, name='generate-workout-stream'),
+    path('generate/nutrition/stream/', views.generate_nutrition_plan_stream_view, name='generate-nutrition-stream'),
+    path('analyze/health/stream/', views.analyze_health_data_stream_view, name='analyze-health-stream'),
     
     # Nutrition Plans
     path('nutrition/', views.NutritionPlanListCreateView.as_view(), name='nutrition-plan-list'),
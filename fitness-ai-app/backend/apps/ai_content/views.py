@@ -1,9 +1,17 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Sum
 from datetime import datetime, timedelta
+import asyncio
+import json
 import time
 
 from .models import (
@@ -16,9 +24,18 @@ from .serializers import (
     NutritionGenerationRequestSerializer, HealthAnalysisRequestSerializer,
     AIGenerationResponseSerializer, FeedbackSerializer
 )
-from core.ai_integrations.claude_client import ClaudeClient
+from .services import (
+    build_workout_profile, build_nutrition_profile, build_medical_snapshot,
+    call_client, finish_generation, abort_generation, generation_status
+)
+from .tasks import generate_content_task
+from core.ai_integrations.claude_client import get_async_claude_client
+from core.async_api import async_api_view
 from apps.users.models import MedicalData
 
+# How often a long-polling status request re-checks the database
+LONG_POLL_INTERVAL = 0.5
+
 
 class AIContentRequestListView(generics.ListAPIView):
     serializer_class = AIContentRequestSerializer
@@ -82,301 +99,196 @@ class HealthInsightDetailView(generics.RetrieveUpdateAPIView):
         return HealthInsight.objects.filter(user=self.request.user)
 
 
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def generate_workout_view(request):
-    """Generate AI-powered workout plan"""
+async def _create_workout_request(request, initial_status):
+    """Validate a workout generation request and record it"""
     serializer = WorkoutGenerationRequestSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     
-    user = request.user
     preferences = serializer.validated_data
-    start_time = time.time()
+    user_profile = build_workout_profile(request.user, preferences)
     
-    # Build user profile
-    user_profile = {
-        'age': user.get_age(),
-        'gender': user.get_gender_display() if user.gender else 'Not specified',
-        'fitness_level': user.get_fitness_level_display(),
-        'goals': user.get_fitness_goals(),
-        'workout_duration': preferences.get('duration_minutes', user.preferred_workout_duration),
-        'equipment': preferences.get('equipment_available', user.get_available_equipment()),
-        'activity_level': user.get_activity_level_display(),
-        'medical_conditions': 'None specified'  # Would integrate with medical data
-    }
-    
-    # Create AI request record
-    ai_request = AIContentRequest.objects.create(
-        user=user,
+    return await AIContentRequest.objects.acreate(
+        user=request.user,
         content_type='workout',
-        status='processing',
+        status=initial_status,
         user_context=user_profile,
         prompt_context=preferences
     )
-    
-    try:
-        # Use Claude to generate workout
-        claude_client = ClaudeClient()
-        workout_type = preferences.get('workout_type', 'general')
-        
-        ai_response = claude_client.generate_workout(user_profile, workout_type)
-        generation_time = time.time() - start_time
-        
-        if ai_response['success']:
-            # Update request record
-            ai_request.status = 'completed'
-            ai_request.generated_content = ai_response['workout']
-            ai_request.tokens_used = ai_response.get('tokens_used', 0)
-            ai_request.generation_time_seconds = round(generation_time, 2)
-            ai_request.completed_at = timezone.now()
-            ai_request.save()
-            
-            # Update usage stats
-            update_ai_usage_stats(user, 'workout', True, ai_response.get('tokens_used', 0), generation_time)
-            
-            response_data = {
-                'success': True,
-                'request_id': ai_request.id,
-                'content': ai_response['workout'],
-                'tokens_used': ai_response.get('tokens_used', 0),
-                'generation_time': round(generation_time, 2)
-            }
-        else:
-            # Handle failure
-            ai_request.status = 'failed'
-            ai_request.error_message = ai_response['error']
-            ai_request.save()
-            
-            update_ai_usage_stats(user, 'workout', False, 0, generation_time)
-            
-            response_data = {
-                'success': False,
-                'error_message': ai_response['error']
-            }
-            
-    except Exception as e:
-        # Handle unexpected errors
-        ai_request.status = 'failed'
-        ai_request.error_message = str(e)
-        ai_request.save()
-        
-        update_ai_usage_stats(user, 'workout', False, 0, time.time() - start_time)
-        
-        response_data = {
-            'success': False,
-            'error_message': 'AI service temporarily unavailable'
-        }
-    
-    serializer = AIGenerationResponseSerializer(response_data)
-    return Response(serializer.data)
 
 
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def generate_nutrition_plan_view(request):
-    """Generate AI-powered nutrition plan"""
+async def _create_nutrition_request(request, initial_status):
+    """Validate a nutrition plan request and record it"""
     serializer = NutritionGenerationRequestSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     
-    user = request.user
     preferences = serializer.validated_data
-    start_time = time.time()
-    
-    # Build user profile for nutrition
-    user_profile = {
-        'age': user.get_age(),
-        'gender': user.get_gender_display() if user.gender else 'Not specified',
-        'weight': float(user.weight) if user.weight else None,
-        'height': user.height,
-        'activity_level': user.get_activity_level_display(),
-        'fitness_goals': user.get_fitness_goals(),
-        'dietary_restrictions': user.dietary_restrictions or 'None specified'
-    }
+    user_profile = build_nutrition_profile(request.user, preferences)
     
-    # Add request-specific preferences
-    user_profile.update(preferences)
-    
-    # Create AI request record
-    ai_request = AIContentRequest.objects.create(
-        user=user,
+    return await AIContentRequest.objects.acreate(
+        user=request.user,
         content_type='nutrition',
-        status='processing',
+        status=initial_status,
         user_context=user_profile,
         prompt_context=preferences
     )
-    
-    try:
-        # Use Claude to generate nutrition plan
-        claude_client = ClaudeClient()
-        goals = preferences.get('goals', user.get_fitness_goals())
-        
-        ai_response = claude_client.generate_nutrition_plan(user_profile, goals)
-        generation_time = time.time() - start_time
-        
-        if ai_response['success']:
-            # Update request record
-            ai_request.status = 'completed'
-            ai_request.generated_content = ai_response['nutrition_plan']
-            ai_request.tokens_used = ai_response.get('tokens_used', 0)
-            ai_request.generation_time_seconds = round(generation_time, 2)
-            ai_request.completed_at = timezone.now()
-            ai_request.save()
-            
-            # Create structured nutrition plan
-            nutrition_plan = NutritionPlan.objects.create(
-                user=user,
-                ai_request=ai_request,
-                name=f"AI Nutrition Plan - {timezone.now().strftime('%Y-%m-%d')}",
-                description="Personalized nutrition plan generated by AI",
-                meal_plan={},  # Would parse from AI response
-                duration_days=preferences.get('plan_duration_days', 7)
-            )
-            
-            # Update usage stats
-            update_ai_usage_stats(user, 'nutrition', True, ai_response.get('tokens_used', 0), generation_time)
-            
-            response_data = {
-                'success': True,
-                'request_id': ai_request.id,
-                'content': ai_response['nutrition_plan'],
-                'structured_data': {
-                    'nutrition_plan_id': nutrition_plan.id
-                },
-                'tokens_used': ai_response.get('tokens_used', 0),
-                'generation_time': round(generation_time, 2)
-            }
-        else:
-            # Handle failure
-            ai_request.status = 'failed'
-            ai_request.error_message = ai_response['error']
-            ai_request.save()
-            
-            update_ai_usage_stats(user, 'nutrition', False, 0, generation_time)
-            
-            response_data = {
-                'success': False,
-                'error_message': ai_response['error']
-            }
-            
-    except Exception as e:
-        # Handle unexpected errors
-        ai_request.status = 'failed'
-        ai_request.error_message = str(e)
-        ai_request.save()
-        
-        update_ai_usage_stats(user, 'nutrition', False, 0, time.time() - start_time)
-        
-        response_data = {
-            'success': False,
-            'error_message': 'AI service temporarily unavailable'
-        }
-    
-    serializer = AIGenerationResponseSerializer(response_data)
-    return Response(serializer.data)
 
 
-@api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
-def analyze_health_data_view(request):
-    """Generate AI-powered health insights"""
+async def _create_health_request(request, initial_status):
+    """Validate a health analysis request, gather medical data and record it"""
     serializer = HealthAnalysisRequestSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     
-    user = request.user
     preferences = serializer.validated_data
-    start_time = time.time()
     
     # Gather user's health data
     medical_data = {}
     if preferences.get('include_medical_data', True):
-        latest_medical = MedicalData.objects.filter(user=user).first()
-        if latest_medical:
-            medical_data = {
-                'heart_rate': latest_medical.resting_heart_rate,
-                'blood_pressure': f"{latest_medical.blood_pressure_systolic}/{latest_medical.blood_pressure_diastolic}" if latest_medical.blood_pressure_systolic else None,
-                'sleep_quality': latest_medical.sleep_hours,
-                'stress_level': latest_medical.stress_level,
-                'energy_level': latest_medical.energy_level
-            }
+        latest_medical = await MedicalData.objects.filter(user=request.user).afirst()
+        medical_data = build_medical_snapshot(latest_medical)
     
-    # Create AI request record
-    ai_request = AIContentRequest.objects.create(
-        user=user,
+    return await AIContentRequest.objects.acreate(
+        user=request.user,
         content_type='health_analysis',
-        status='processing',
+        status=initial_status,
         user_context={'medical_data': medical_data},
         prompt_context=preferences
     )
-    
+
+
+async def enqueue_generation(ai_request):
+    """Queue a recorded request for the Celery worker and acknowledge it with 202
+    and the status URL in Location (also used by the workouts app)"""
     try:
-        # Use Claude to analyze health data
-        claude_client = ClaudeClient()
-        
-        ai_response = claude_client.analyze_medical_data(medical_data)
-        generation_time = time.time() - start_time
+        await sync_to_async(generate_content_task.delay)(ai_request.id)
+    except Exception as e:
+        response_data = await sync_to_async(abort_generation)(ai_request, e, None)
+        serializer = AIGenerationResponseSerializer(response_data)
+        return JsonResponse(serializer.data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    status_url = reverse('ai-request-status', args=[ai_request.id])
+    serializer = AIGenerationResponseSerializer({
+        'success': True,
+        'request_id': ai_request.id,
+        'status': 'pending'
+    })
+    return JsonResponse(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
+
+
+def _sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _stream_response(ai_request, start_time):
+    """Run a recorded request through Claude, pushing tokens as server-sent events.
+    
+    Emits one ``start`` event with the request id, a ``token`` event per text
+    delta and a final ``done`` (or ``error``) event carrying the same payload
+    as the non-streaming endpoint.
+    """
+    async def events():
+        yield _sse_event('start', {'request_id': ai_request.id})
         
-        if ai_response['success']:
-            # Update request record
-            ai_request.status = 'completed'
-            ai_request.generated_content = ai_response['analysis']
-            ai_request.tokens_used = ai_response.get('tokens_used', 0)
-            ai_request.generation_time_seconds = round(generation_time, 2)
-            ai_request.completed_at = timezone.now()
-            ai_request.save()
+        time_to_first_byte = None
+        try:
+            claude_client = get_async_claude_client()
+            ai_response = None
+            async for event in call_client(claude_client, ai_request, stream=True):
+                if event['type'] == 'text':
+                    if time_to_first_byte is None:
+                        time_to_first_byte = time.time() - start_time
+                    yield _sse_event('token', {'text': event['text']})
+                else:
+                    ai_response = event['response']
             
-            # Create health insight
-            health_insight = HealthInsight.objects.create(
-                user=user,
-                ai_request=ai_request,
-                insight_type='general',
-                priority='medium',
-                title=f"Health Analysis - {timezone.now().strftime('%Y-%m-%d')}",
-                content=ai_response['analysis'],
-                data_sources=medical_data,
-                confidence_score=0.85  # Would be calculated based on data quality
+            response_data = await sync_to_async(finish_generation)(
+                ai_request, ai_response, time.time() - start_time, time_to_first_byte
+            )
+        except asyncio.CancelledError:
+            # Client went away mid-stream; don't leave the request processing
+            await sync_to_async(abort_generation)(
+                ai_request, Exception('Client disconnected during streaming'), time.time() - start_time
+            )
+            raise
+        except Exception as e:
+            response_data = await sync_to_async(abort_generation)(
+                ai_request, e, time.time() - start_time
             )
-            
-            # Update usage stats
-            update_ai_usage_stats(user, 'health_analysis', True, ai_response.get('tokens_used', 0), generation_time)
-            
-            response_data = {
-                'success': True,
-                'request_id': ai_request.id,
-                'content': ai_response['analysis'],
-                'structured_data': {
-                    'insight_id': health_insight.id
-                },
-                'tokens_used': ai_response.get('tokens_used', 0),
-                'generation_time': round(generation_time, 2)
-            }
-        else:
-            # Handle failure
-            ai_request.status = 'failed'
-            ai_request.error_message = ai_response['error']
-            ai_request.save()
-            
-            update_ai_usage_stats(user, 'health_analysis', False, 0, generation_time)
-            
-            response_data = {
-                'success': False,
-                'error_message': ai_response['error']
-            }
-            
-    except Exception as e:
-        # Handle unexpected errors
-        ai_request.status = 'failed'
-        ai_request.error_message = str(e)
-        ai_request.save()
-        
-        update_ai_usage_stats(user, 'health_analysis', False, 0, time.time() - start_time)
         
-        response_data = {
-            'success': False,
-            'error_message': 'AI service temporarily unavailable'
-        }
+        serializer = AIGenerationResponseSerializer(response_data)
+        yield _sse_event('done' if response_data['success'] else 'error', serializer.data)
     
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@async_api_view(['POST'])
+async def generate_workout_view(request):
+    """Queue an AI-powered workout plan"""
+    ai_request = await _create_workout_request(request, 'pending')
+    return await enqueue_generation(ai_request)
+
+
+@async_api_view(['POST'])
+async def generate_workout_stream_view(request):
+    """Stream an AI-powered workout plan as server-sent events"""
+    start_time = time.time()
+    ai_request = await _create_workout_request(request, 'processing')
+    return _stream_response(ai_request, start_time)
+
+
+@async_api_view(['POST'])
+async def generate_nutrition_plan_view(request):
+    """Queue an AI-powered nutrition plan"""
+    ai_request = await _create_nutrition_request(request, 'pending')
+    return await enqueue_generation(ai_request)
+
+
+@async_api_view(['POST'])
+async def generate_nutrition_plan_stream_view(request):
+    """Stream an AI-powered nutrition plan as server-sent events"""
+    start_time = time.time()
+    ai_request = await _create_nutrition_request(request, 'processing')
+    return _stream_response(ai_request, start_time)
+
+
+@async_api_view(['POST'])
+async def analyze_health_data_view(request):
+    """Queue AI-powered health insights"""
+    ai_request = await _create_health_request(request, 'pending')
+    return await enqueue_generation(ai_request)
+
+
+@async_api_view(['POST'])
+async def analyze_health_data_stream_view(request):
+    """Stream AI-powered health insights as server-sent events"""
+    start_time = time.time()
+    ai_request = await _create_health_request(request, 'processing')
+    return _stream_response(ai_request, start_time)
+
+
+@async_api_view(['GET'])
+async def ai_request_status_view(request, request_id):
+    """Get the status of a generation request, holding the response up to ?wait= seconds until it finishes"""
+    try:
+        wait = min(max(float(request.query_params.get('wait', 0)), 0), settings.AI_GENERATION_LONG_POLL_MAX)
+    except ValueError:
+        raise ValidationError({'wait': 'Must be a number of seconds'})
+    deadline = time.monotonic() + wait
+    
+    while True:
+        ai_request = await AIContentRequest.objects.filter(id=request_id, user=request.user).afirst()
+        if ai_request is None:
+            return JsonResponse({'error': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
+        if ai_request.status in ('completed', 'failed') or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(LONG_POLL_INTERVAL)
+    
+    response_data = await sync_to_async(generation_status)(ai_request)
     serializer = AIGenerationResponseSerializer(response_data)
-    return Response(serializer.data)
+    return JsonResponse(serializer.data)
 
 
 @api_view(['POST'])
@@ -414,12 +326,18 @@ def ai_usage_stats_view(request):
         user=user,
         date__gte=start_date
     ).aggregate(
-        total_requests=Count('total_requests'),
-        successful_requests=Count('successful_requests'),
-        total_tokens=Count('total_tokens_used'),
+        total_requests=Sum('total_requests'),
+        successful_requests=Sum('successful_requests'),
+        total_tokens=Sum('total_tokens_used'),
+        response_time_count=Sum('response_time_count'),
+        total_response_time=Sum('total_response_time'),
         avg_rating=Avg('avg_user_rating')
     )
     
+    avg_response_time = None
+    if stats['response_time_count']:
+        avg_response_time = round(float(stats['total_response_time']) / stats['response_time_count'], 2)
+    
     # Get recent requests breakdown
     recent_requests = AIContentRequest.objects.filter(
         user=user,
@@ -433,49 +351,8 @@ def ai_usage_stats_view(request):
         'total_requests': stats['total_requests'] or 0,
         'successful_requests': stats['successful_requests'] or 0,
         'total_tokens_used': stats['total_tokens'] or 0,
+        'avg_response_time': avg_response_time,
         'average_rating': round(stats['avg_rating'] or 0, 2),
         'requests_breakdown': list(recent_requests)
     })
 
-
-def update_ai_usage_stats(user, request_type, success, tokens_used, response_time):
-    """Update daily AI usage statistics"""
-    today = timezone.now().date()
-    stats, created = AIUsageStats.objects.get_or_create(
-        user=user,
-        date=today,
-        defaults={
-            'total_requests': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'total_tokens_used': 0,
-            'workout_requests': 0,
-            'nutrition_requests': 0,
-            'health_analysis_requests': 0,
-        }
-    )
-    
-    # Update counters
-    stats.total_requests += 1
-    if success:
-        stats.successful_requests += 1
-    else:
-        stats.failed_requests += 1
-    
-    stats.total_tokens_used += tokens_used
-    
-    # Update request type counters
-    if request_type == 'workout':
-        stats.workout_requests += 1
-    elif request_type == 'nutrition':
-        stats.nutrition_requests += 1
-    elif request_type == 'health_analysis':
-        stats.health_analysis_requests += 1
-    
-    # Update average response time
-    if stats.avg_response_time:
-        stats.avg_response_time = (stats.avg_response_time + response_time) / 2
-    else:
-        stats.avg_response_time = response_time
-    
-    stats.save()
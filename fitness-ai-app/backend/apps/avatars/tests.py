@@ -1,3 +1,52 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.testing import QueryBudgetMixin
+
+from .models import Avatar, UserAvatar, AvatarInteraction, AvatarPreset
+
+User = get_user_model()
+
+
+class AvatarQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password='x')
+        for day in range(1, 8):
+            avatar = Avatar.objects.create(
+                name=f'Avatar {day}', gender='N', body_type='athletic', vrm_file_url='https://example.com/a.vrm'
+            )
+            user_avatar = UserAvatar.objects.create(user=cls.user, avatar=avatar, day_of_week=day)
+            for i in range(3):
+                AvatarInteraction.objects.create(user_avatar=user_avatar, interaction_type='encouragement', message='Go')
+            AvatarPreset.objects.create(
+                name=f'Preset {day}', description='d', avatar=avatar, skin_tone='#ffffff',
+                hair_color='#000000', outfit_config={}, is_featured=True
+            )
+        cls.avatar = avatar
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_avatar_list(self):
+        self.assertBudget(1, '/api/avatars/')
+
+    def test_avatar_detail(self):
+        self.assertBudget(1, f'/api/avatars/{self.avatar.id}/')
+
+    def test_user_avatar_list(self):
+        response = self.assertBudget(1, '/api/avatars/user/')
+        self.assertEqual(len(response.data), 7)
+
+    def test_user_avatar_detail(self):
+        self.assertBudget(1, '/api/avatars/user/3/')
+
+    def test_current_avatar(self):
+        self.assertBudget(3, '/api/avatars/user/current/')
+
+    def test_interaction_list(self):
+        response = self.assertBudget(2, '/api/avatars/interactions/')
+        self.assertEqual(response.data['count'], 21)
+
+    def test_preset_list(self):
+        self.assertBudget(1, '/api/avatars/presets/')
@@ -6,67 +6,70 @@ from datetime import datetime
 from .models import Avatar, UserAvatar, AvatarInteraction, AvatarPreset
 
 
+def _avatar_data(avatar):
+    return {
+        'id': avatar.id,
+        'name': avatar.name,
+        'description': avatar.description,
+        'gender': avatar.gender,
+        'body_type': avatar.body_type,
+        'vrm_file_url': avatar.vrm_file_url,
+        'preview_image_url': avatar.preview_image_url,
+        'is_premium': avatar.is_premium,
+        'customization_options': {
+            'skin_tones': avatar.skin_tones,
+            'hair_colors': avatar.hair_colors,
+            'outfit_options': avatar.outfit_options
+        }
+    }
+
+
+def _user_avatar_data(user_avatar):
+    return {
+        'day_of_week': user_avatar.day_of_week,
+        'day_name': user_avatar.get_day_of_week_display(),
+        'avatar': {
+            'id': user_avatar.avatar.id,
+            'name': user_avatar.avatar.name,
+            'vrm_file_url': user_avatar.avatar.vrm_file_url,
+            'preview_image_url': user_avatar.avatar.preview_image_url
+        },
+        'customizations': {
+            'skin_tone': user_avatar.skin_tone,
+            'hair_color': user_avatar.hair_color,
+            'outfit_config': user_avatar.outfit_config
+        },
+        'name': user_avatar.name,
+        'motivation_message': user_avatar.motivation_message,
+        'is_active': user_avatar.is_active,
+        'last_interacted': user_avatar.last_interacted
+    }
+
+
 class AvatarListView(generics.ListAPIView):
     queryset = Avatar.objects.filter(is_active=True)
     permission_classes = [permissions.IsAuthenticated]
     
     def list(self, request, *args, **kwargs):
-        avatars = self.get_queryset()
-        data = []
-        for avatar in avatars:
-            data.append({
-                'id': avatar.id,
-                'name': avatar.name,
-                'description': avatar.description,
-                'gender': avatar.gender,
-                'body_type': avatar.body_type,
-                'vrm_file_url': avatar.vrm_file_url,
-                'preview_image_url': avatar.preview_image_url,
-                'is_premium': avatar.is_premium,
-                'customization_options': {
-                    'skin_tones': avatar.skin_tones,
-                    'hair_colors': avatar.hair_colors,
-                    'outfit_options': avatar.outfit_options
-                }
-            })
-        return Response(data)
+        return Response([_avatar_data(avatar) for avatar in self.get_queryset()])
 
 
 class AvatarDetailView(generics.RetrieveAPIView):
     queryset = Avatar.objects.filter(is_active=True)
     permission_classes = [permissions.IsAuthenticated]
+    
+    def retrieve(self, request, *args, **kwargs):
+        return Response(_avatar_data(self.get_object()))
 
 
 class UserAvatarListView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return UserAvatar.objects.filter(user=self.request.user)
+        return UserAvatar.objects.filter(user=self.request.user).select_related('avatar')
     
     def list(self, request, *args, **kwargs):
-        user_avatars = self.get_queryset()
-        data = []
-        for user_avatar in user_avatars:
-            data.append({
-                'day_of_week': user_avatar.day_of_week,
-                'day_name': user_avatar.get_day_of_week_display(),
-                'avatar': {
-                    'id': user_avatar.avatar.id,
-                    'name': user_avatar.avatar.name,
-                    'vrm_file_url': user_avatar.avatar.vrm_file_url,
-                    'preview_image_url': user_avatar.avatar.preview_image_url
-                },
-                'customizations': {
-                    'skin_tone': user_avatar.skin_tone,
-                    'hair_color': user_avatar.hair_color,
-                    'outfit_config': user_avatar.outfit_config
-                },
-                'name': user_avatar.name,
-                'motivation_message': user_avatar.motivation_message,
-                'is_active': user_avatar.is_active,
-                'last_interacted': user_avatar.last_interacted
-            })
-        return Response(data)
+        return Response([_user_avatar_data(user_avatar) for user_avatar in self.get_queryset()])
 
 
 class UserAvatarDetailView(generics.RetrieveUpdateAPIView):
@@ -75,9 +78,15 @@ class UserAvatarDetailView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         day_of_week = self.kwargs['day_of_week']
         try:
-            return UserAvatar.objects.get(user=self.request.user, day_of_week=day_of_week)
+            return UserAvatar.objects.select_related('avatar').get(user=self.request.user, day_of_week=day_of_week)
         except UserAvatar.DoesNotExist:
             return None
+    
+    def retrieve(self, request, *args, **kwargs):
+        user_avatar = self.get_object()
+        if user_avatar is None:
+            return Response({'error': 'No avatar configured for this day'}, status=404)
+        return Response(_user_avatar_data(user_avatar))
 
 
 class AvatarInteractionListView(generics.ListAPIView):
@@ -87,11 +96,47 @@ class AvatarInteractionListView(generics.ListAPIView):
         return AvatarInteraction.objects.filter(
             user_avatar__user=self.request.user
         ).select_related('user_avatar')
+    
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response([
+            {
+                'id': interaction.id,
+                'day_of_week': interaction.user_avatar.day_of_week,
+                'type': interaction.interaction_type,
+                'message': interaction.message,
+                'animation_trigger': interaction.animation_trigger,
+                'context_data': interaction.context_data,
+                'is_read': interaction.is_read,
+                'created_at': interaction.created_at
+            }
+            for interaction in page
+        ])
 
 
 class AvatarPresetListView(generics.ListAPIView):
-    queryset = AvatarPreset.objects.filter(is_featured=True)
+    queryset = AvatarPreset.objects.filter(is_featured=True).select_related('avatar')
     permission_classes = [permissions.IsAuthenticated]
+    
+    def list(self, request, *args, **kwargs):
+        return Response([
+            {
+                'id': preset.id,
+                'name': preset.name,
+                'description': preset.description,
+                'avatar': {
+                    'id': preset.avatar.id,
+                    'name': preset.avatar.name,
+                    'vrm_file_url': preset.avatar.vrm_file_url,
+                    'preview_image_url': preset.avatar.preview_image_url
+                },
+                'skin_tone': preset.skin_tone,
+                'hair_color': preset.hair_color,
+                'outfit_config': preset.outfit_config,
+                'usage_count': preset.usage_count
+            }
+            for preset in self.get_queryset()
+        ])
 
 
 @api_view(['GET'])
@@ -101,7 +146,7 @@ def current_avatar_view(request):
     today = datetime.now().weekday() + 1  # Monday = 1
     
     try:
-        user_avatar = UserAvatar.objects.get(
+        user_avatar = UserAvatar.objects.select_related('avatar').get(
             user=request.user,
             day_of_week=today,
             is_active=True
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='preferred_workout_days',
+            field=models.CharField(blank=True, help_text='Preferred workout days as ISO weekday numbers, 1=Monday (comma-separated)', max_length=20),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:37
+
+from django.db import migrations, models
+
+
+def seed_longest_streak(apps, schema_editor):
+    # Until recompute_streaks runs, the current streak is the best lower bound
+    User = apps.get_model('users', 'User')
+    User.objects.update(longest_workout_streak=models.F('workout_streak'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_preferred_workout_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='longest_workout_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='workout_streak',
+            field=models.PositiveIntegerField(default=0, help_text='Consecutive days ending on last_workout_date'),
+        ),
+        migrations.RunPython(seed_longest_streak, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+# Frozen copy of the equipment table in apps.workouts.equipment when this migration
+# was written, so later edits to it cannot change what the backfill computes
+EQUIPMENT_BITS = {
+    'band': 8,
+    'bands': 8,
+    'barbell': 4,
+    'barbells': 4,
+    'bike': 64,
+    'body weight': 1,
+    'bodyweight': 1,
+    'cable machine': 32,
+    'cardio equipment': 64,
+    'chin up bar': 256,
+    'dumbbell': 2,
+    'dumbbells': 2,
+    'exercise bike': 64,
+    'gym': 32,
+    'kettlebell': 16,
+    'kettlebells': 16,
+    'machine': 32,
+    'machines': 32,
+    'mat': 128,
+    'no equipment': 1,
+    'none': 1,
+    'pull up bar': 256,
+    'pullup bar': 256,
+    'resistance band': 8,
+    'resistance bands': 8,
+    'rower': 64,
+    'rowing machine': 64,
+    'treadmill': 64,
+    'yoga mat': 128,
+}
+OTHER = 512
+
+
+def equipment_mask(names):
+    mask = 0
+    for name in names:
+        name = ' '.join(name.lower().replace('-', ' ').replace('_', ' ').split())
+        if name:
+            singular = ' '.join(word[:-1] if word.endswith('s') else word for word in name.split())
+            mask |= EQUIPMENT_BITS.get(name) or EQUIPMENT_BITS.get(singular) or OTHER
+    return mask
+
+
+def backfill_user_masks(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    batch = []
+    for row in User.objects.only('id', 'available_equipment').iterator(chunk_size=2000):
+        row.equipment_mask = equipment_mask(row.available_equipment.split(','))
+        if row.equipment_mask:
+            batch.append(row)
+        if len(batch) >= 2000:
+            User.objects.bulk_update(batch, ['equipment_mask'])
+            batch = []
+    User.objects.bulk_update(batch, ['equipment_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_longest_workout_streak'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='equipment_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='available_equipment as an EQUIPMENT_CHOICES bitmask'),
+        ),
+        migrations.RunPython(backfill_user_masks, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from cryptography.fernet import Fernet
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
 import json
 
 
@@ -43,6 +45,13 @@ class User(AbstractUser):
     # Preferences
     preferred_workout_duration = models.PositiveIntegerField(default=30, help_text="Preferred workout duration in minutes")
     available_equipment = models.TextField(blank=True, help_text="Available equipment (comma-separated)")
+    equipment_mask = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False, help_text="available_equipment as an EQUIPMENT_CHOICES bitmask"
+    )
+    preferred_workout_days = models.CharField(
+        max_length=20, blank=True,
+        help_text="Preferred workout days as ISO weekday numbers, 1=Monday (comma-separated)"
+    )
     
     # Goals and preferences
     fitness_goals = models.TextField(blank=True, help_text="Fitness goals (JSON format)")
@@ -52,7 +61,8 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_workout_date = models.DateTimeField(null=True, blank=True)
-    workout_streak = models.PositiveIntegerField(default=0)
+    workout_streak = models.PositiveIntegerField(default=0, help_text="Consecutive days ending on last_workout_date")
+    longest_workout_streak = models.PositiveIntegerField(default=0)
     
     # Privacy settings
     profile_visibility = models.CharField(
@@ -70,6 +80,14 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.email} ({self.get_full_name()})"
 
+    def save(self, *args, **kwargs):
+        from apps.workouts.equipment import equipment_mask
+        self.equipment_mask = equipment_mask(self.get_available_equipment())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'available_equipment' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'equipment_mask'}
+        super().save(*args, **kwargs)
+
     def get_age(self):
         if self.date_of_birth:
             from datetime import date
@@ -99,6 +117,19 @@ class User(AbstractUser):
             return [item.strip() for item in self.available_equipment.split(',')]
         return []
 
+    def get_preferred_workout_days(self):
+        if self.preferred_workout_days:
+            return [int(day) for day in self.preferred_workout_days.split(',') if day.strip().isdigit()]
+        return []
+
+    def get_current_streak(self):
+        """The stored streak, or 0 once a full day has passed without a workout"""
+        if not self.last_workout_date:
+            return 0
+        if timezone.localdate(self.last_workout_date) < timezone.localdate() - timedelta(days=1):
+            return 0
+        return self.workout_streak
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -14,7 +14,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'email', 'username', 'first_name', 'last_name', 'password', 
             'password_confirm', 'date_of_birth', 'gender', 'height', 'weight',
             'fitness_level', 'activity_level', 'preferred_workout_duration',
-            'available_equipment', 'dietary_restrictions'
+            'available_equipment', 'preferred_workout_days', 'dietary_restrictions'
         ]
 
     def validate(self, attrs):
@@ -66,11 +66,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'id', 'email', 'username', 'first_name', 'last_name', 
             'date_of_birth', 'age', 'gender', 'height', 'weight', 'bmi',
             'fitness_level', 'activity_level', 'preferred_workout_duration',
-            'available_equipment', 'equipment_list', 'fitness_goals',
-            'dietary_restrictions', 'last_workout_date', 'workout_streak',
+            'available_equipment', 'equipment_list', 'preferred_workout_days', 'fitness_goals',
+            'dietary_restrictions', 'last_workout_date', 'workout_streak', 'longest_workout_streak',
             'profile_visibility', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'email', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'email', 'last_workout_date', 'workout_streak', 'longest_workout_streak',
+            'created_at', 'updated_at'
+        ]
 
     def update(self, instance, validated_data):
         # Handle fitness goals if provided
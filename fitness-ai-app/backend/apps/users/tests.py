@@ -1,3 +1,42 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from core.testing import QueryBudgetMixin
+
+from .models import User, UserProfile, MedicalData, WorkoutGoal
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password='x')
+        UserProfile.objects.create(user=cls.user)
+        for i in range(10):
+            MedicalData.objects.create(user=cls.user, resting_heart_rate=60 + i)
+            WorkoutGoal.objects.create(user=cls.user, goal_type='endurance', target_date=date(2030, 1, i + 1))
+        cls.goal = WorkoutGoal.objects.filter(user=cls.user).first()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_profile(self):
+        self.assertBudget(0, '/api/users/profile/')
+
+    def test_profile_details(self):
+        self.assertBudget(1, '/api/users/profile/details/')
+
+    def test_dashboard(self):
+        self.assertBudget(2, '/api/users/dashboard/')
+
+    def test_stats(self):
+        self.assertBudget(0, '/api/users/stats/')
+
+    def test_goal_list(self):
+        self.assertBudget(2, '/api/users/goals/')
+
+    def test_goal_detail(self):
+        self.assertBudget(1, f'/api/users/goals/{self.goal.id}/')
+
+    def test_medical_list(self):
+        self.assertBudget(2, '/api/users/medical/')
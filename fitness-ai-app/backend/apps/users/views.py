@@ -131,8 +131,8 @@ def user_stats_view(request):
         'workouts_this_month': 0,
         'calories_burned_week': 0,
         'calories_burned_month': 0,
-        'current_streak': user.workout_streak,
-        'longest_streak': user.workout_streak,  # Will need separate tracking
+        'current_streak': user.get_current_streak(),
+        'longest_streak': user.longest_workout_streak,
         'total_workouts': 0,
         'avg_workout_duration': user.preferred_workout_duration,
         'favorite_workout_type': 'General Fitness'
@@ -0,0 +1,199 @@
+"""
+Training analytics over a user's completed sets.
+
+The set history is loaded in one query into NumPy columns (day, exercise,
+muscle group, reps, weight). Everything else is a vectorized pass over
+those columns:
+
+- volume (reps x weight) per muscle group for the last 7 and 28 days, and
+  per week for the last ANALYTICS_WEEKS weeks
+- estimated one-rep max per set, by the Epley and Brzycki formulas, and each
+  exercise's best
+- each exercise's e1RM trend: the least-squares slope of its best Epley
+  e1RM per training day, in kg per week
+
+Results are cached per user until one of their workouts or sessions changes
+(see signals.py), or the day ends.
+"""
+from datetime import date
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from typing import Dict
+
+from .models import Exercise, WorkoutSet
+
+MUSCLE_GROUPS = [key for key, _ in Exercise.MUSCLE_GROUP_CHOICES]
+
+# Weekly volume series length
+ANALYTICS_WEEKS = 12
+
+# Sets with more reps than this say little about a one-rep max
+MAX_E1RM_REPS = 12
+
+# Training days an exercise needs before its trend is reported
+MIN_TREND_DAYS = 3
+
+
+def analytics_cache_key(user_id: int) -> str:
+    # Dated, since the 7 and 28 day windows move even when nothing else changes
+    return f'workout_analytics:{user_id}:{timezone.localdate().isoformat()}'
+
+
+def invalidate_workout_analytics(user_id: int) -> None:
+    caches[settings.WORKOUT_ANALYTICS_CACHE_ALIAS].delete(analytics_cache_key(user_id))
+
+
+def load_set_history(user_id: int) -> Dict[str, np.ndarray]:
+    """The user's completed sets as aligned columns, oldest first"""
+    rows = list(
+        WorkoutSet.objects.filter(
+            session__workout__user_id=user_id,
+            session__workout__status='completed',
+            session__workout__completed_at__isnull=False,
+            reps__isnull=False
+        ).annotate(
+            day=TruncDate('session__workout__completed_at')
+        ).order_by(
+            'day'
+        ).values_list('day', 'session__exercise_id', 'session__exercise__muscle_groups', 'reps', 'weight_kg')
+    )
+    group_index = {group: i for i, group in enumerate(MUSCLE_GROUPS)}
+    count = len(rows)
+    return {
+        'day': np.fromiter((row[0].toordinal() for row in rows), dtype=np.int64, count=count),
+        'exercise': np.fromiter((row[1] for row in rows), dtype=np.int64, count=count),
+        'muscle_group': np.fromiter((group_index.get(row[2], -1) for row in rows), dtype=np.int64, count=count),
+        'reps': np.fromiter((row[3] for row in rows), dtype=np.float64, count=count),
+        'weight': np.fromiter((row[4] or 0 for row in rows), dtype=np.float64, count=count),
+    }
+
+
+def epley(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    return np.where(reps == 1, weight, weight * (1 + reps / 30))
+
+
+def brzycki(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    # Only defined below 37 reps; callers keep reps within MAX_E1RM_REPS
+    return weight * 36 / (37 - np.minimum(reps, 36))
+
+
+def muscle_group_volume(history: Dict[str, np.ndarray], today: int) -> Dict[str, Dict]:
+    """Recent and weekly volume per muscle group that has any"""
+    volume = history['reps'] * history['weight']
+    age = today - history['day']
+    known = (history['muscle_group'] >= 0) & (age >= 0)
+    groups = len(MUSCLE_GROUPS)
+
+    def per_group(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(history['muscle_group'][mask], weights=volume[mask], minlength=groups)
+
+    last_7 = per_group(known & (age < 7))
+    last_28 = per_group(known & (age < 28))
+
+    # Week 0 is the oldest of the series, ANALYTICS_WEEKS - 1 the one ending today
+    week = ANALYTICS_WEEKS - 1 - age // 7
+    in_series = known & (week >= 0)
+    weekly = np.bincount(
+        history['muscle_group'][in_series] * ANALYTICS_WEEKS + week[in_series],
+        weights=volume[in_series], minlength=groups * ANALYTICS_WEEKS
+    ).reshape(groups, ANALYTICS_WEEKS)
+
+    return {
+        group: {
+            'last_7_days': round(float(last_7[i]), 1),
+            'last_28_days': round(float(last_28[i]), 1),
+            'weekly': np.round(weekly[i], 1).tolist(),
+        }
+        for i, group in enumerate(MUSCLE_GROUPS)
+        if weekly[i].any() or last_28[i]
+    }
+
+
+def exercise_progress(history: Dict[str, np.ndarray]) -> Dict[int, Dict]:
+    """Best e1RM estimates and e1RM trend per exercise with weighted sets in range"""
+    usable = (history['weight'] > 0) & (history['reps'] >= 1) & (history['reps'] <= MAX_E1RM_REPS)
+    if not usable.any():
+        return {}
+    exercise = history['exercise'][usable]
+    day = history['day'][usable]
+    reps = history['reps'][usable]
+    weight = history['weight'][usable]
+    e1rm_epley = epley(weight, reps)
+    e1rm_brzycki = brzycki(weight, reps)
+
+    exercises, exercise_index = np.unique(exercise, return_inverse=True)
+    best_epley = np.zeros(len(exercises))
+    best_brzycki = np.zeros(len(exercises))
+    np.maximum.at(best_epley, exercise_index, e1rm_epley)
+    np.maximum.at(best_brzycki, exercise_index, e1rm_brzycki)
+    set_counts = np.bincount(exercise_index)
+    last_day = np.zeros(len(exercises), dtype=np.int64)
+    np.maximum.at(last_day, exercise_index, day)
+
+    # Best e1RM per (exercise, day), then a least-squares slope per exercise over those points
+    span = day.max() + 1
+    sessions, session_index = np.unique(exercise_index * span + day, return_inverse=True)
+    session_best = np.zeros(len(sessions))
+    np.maximum.at(session_best, session_index, e1rm_epley)
+    session_exercise = sessions // span
+    # Days from each exercise's first session keep the sums small
+    session_day = (sessions % span).astype(np.float64)
+    first_day = np.full(len(exercises), np.inf)
+    np.minimum.at(first_day, session_exercise, session_day)
+    x = session_day - first_day[session_exercise]
+    y = session_best
+
+    def sums(values: np.ndarray) -> np.ndarray:
+        return np.bincount(session_exercise, weights=values, minlength=len(exercises))
+
+    n = np.bincount(session_exercise, minlength=len(exercises)).astype(np.float64)
+    sum_x, sum_y, sum_xy, sum_xx = sums(x), sums(y), sums(x * y), sums(x * x)
+    denominator = n * sum_xx - sum_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope_per_day = (n * sum_xy - sum_x * sum_y) / denominator
+    has_trend = (n >= MIN_TREND_DAYS) & (denominator > 0)
+
+    return {
+        int(exercise_id): {
+            'sets': int(set_counts[i]),
+            'training_days': int(n[i]),
+            'best_e1rm_epley': round(float(best_epley[i]), 1),
+            'best_e1rm_brzycki': round(float(best_brzycki[i]), 1),
+            'e1rm_trend_per_week': round(float(slope_per_day[i]) * 7, 2) if has_trend[i] else None,
+            'last_performed': date.fromordinal(int(last_day[i])).isoformat(),
+        }
+        for i, exercise_id in enumerate(exercises.tolist())
+    }
+
+
+def compute_workout_analytics(user_id: int) -> Dict:
+    history = load_set_history(user_id)
+    today = timezone.localdate().toordinal()
+    progress = exercise_progress(history)
+    names = dict(Exercise.objects.filter(id__in=progress).values_list('id', 'name')) if progress else {}
+
+    exercises = [
+        {'exercise_id': exercise_id, 'name': names.get(exercise_id, ''), **stats}
+        for exercise_id, stats in sorted(progress.items(), key=lambda item: item[1]['last_performed'], reverse=True)
+    ]
+
+    return {
+        'total_sets': len(history['day']),
+        'total_volume': round(float(np.dot(history['reps'], history['weight'])), 1),
+        'muscle_groups': muscle_group_volume(history, today),
+        'exercises': exercises,
+    }
+
+
+def get_workout_analytics(user) -> Dict:
+    """The user's analytics, from the cache unless a workout or session changed since they were computed"""
+    cache = caches[settings.WORKOUT_ANALYTICS_CACHE_ALIAS]
+    key = analytics_cache_key(user.id)
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_workout_analytics(user.id)
+        cache.set(key, analytics, timeout=settings.WORKOUT_ANALYTICS_CACHE_TTL)
+    return analytics
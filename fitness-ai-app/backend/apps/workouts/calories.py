@@ -0,0 +1,84 @@
+"""
+Calorie estimates for completed workouts.
+
+``Exercise.calories_per_minute`` is taken as the burn rate of a
+REFERENCE_WEIGHT_KG person and scaled by body weight, as MET values are:
+
+    kcal = (weight / REFERENCE_WEIGHT_KG) * sum(session minutes * rate)
+
+Sessions without a recorded duration share the rest of the workout's
+duration at the mean rate of their exercises. Exercises without a rate
+count at DEFAULT_CALORIES_PER_MINUTE.
+"""
+from decimal import Decimal
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from typing import Dict, Iterable, Optional
+
+from .models import Workout, WorkoutSession
+
+REFERENCE_WEIGHT_KG = 70
+DEFAULT_CALORIES_PER_MINUTE = 5
+
+RATE = Coalesce(F('exercise__calories_per_minute'), Value(Decimal(DEFAULT_CALORIES_PER_MINUTE)))
+TIMED_SESSION = Q(duration_seconds__isnull=False)
+
+# Per-workout session totals, aggregated or grouped by the callers below
+SESSION_TOTALS = {
+    'timed_minutes': Sum(
+        ExpressionWrapper(F('duration_seconds') / 60.0, output_field=FloatField()), filter=TIMED_SESSION
+    ),
+    'timed_calories': Sum(
+        ExpressionWrapper(F('duration_seconds') * RATE / 60.0, output_field=FloatField()), filter=TIMED_SESSION
+    ),
+    'untimed_sessions': Count('id', filter=~TIMED_SESSION),
+    'untimed_rate': Avg(RATE, filter=~TIMED_SESSION, output_field=FloatField()),
+}
+
+
+def workout_minutes(workout: Workout) -> Optional[float]:
+    if workout.actual_duration:
+        return float(workout.actual_duration)
+    return workout.duration_minutes
+
+
+def estimate_calories(minutes: Optional[float], totals: Dict, weight_kg: Optional[Decimal]) -> Optional[int]:
+    """Calories for a workout from its duration, SESSION_TOTALS and the user's weight"""
+    calories = totals['timed_calories'] or 0.0
+    if totals['untimed_sessions'] and minutes:
+        untimed_minutes = max(minutes - (totals['timed_minutes'] or 0.0), 0.0)
+        calories += untimed_minutes * (totals['untimed_rate'] or DEFAULT_CALORIES_PER_MINUTE)
+    elif not totals['timed_calories'] and not totals['untimed_sessions'] and minutes:
+        # No sessions at all: the whole workout at the default rate
+        calories = minutes * DEFAULT_CALORIES_PER_MINUTE
+    if not calories:
+        return None
+    scale = float(weight_kg) / REFERENCE_WEIGHT_KG if weight_kg else 1.0
+    return round(calories * scale)
+
+
+def calories_for_workout(workout: Workout, weight_kg: Optional[Decimal]) -> Optional[int]:
+    """Estimate one workout's calories (one query over its sessions)"""
+    totals = WorkoutSession.objects.filter(workout_id=workout.id).aggregate(**SESSION_TOTALS)
+    return estimate_calories(workout_minutes(workout), totals, weight_kg)
+
+
+def backfill_calories(workouts: Iterable[Workout]) -> int:
+    """Estimate and store calories_burned for workouts (loaded with user); one read and one write query"""
+    workouts = list(workouts)
+    totals = {
+        row['workout_id']: row
+        for row in WorkoutSession.objects.filter(
+            workout_id__in=[workout.id for workout in workouts]
+        ).order_by().values('workout_id').annotate(**SESSION_TOTALS)
+    }
+    empty = {'timed_minutes': None, 'timed_calories': None, 'untimed_sessions': 0, 'untimed_rate': None}
+    estimated = []
+    for workout in workouts:
+        workout.calories_burned = estimate_calories(
+            workout_minutes(workout), totals.get(workout.id, empty), workout.user.weight
+        )
+        if workout.calories_burned is not None:
+            estimated.append(workout)
+    Workout.objects.bulk_update(estimated, ['calories_burned'])
+    return len(estimated)
@@ -0,0 +1,87 @@
+"""
+Per-process cache of the active exercise catalog.
+
+The catalog changes rarely but is fetched on every app launch, so each
+process keeps it serialized in memory under a catalog version. The version
+is shared between processes as a single ExerciseCatalogVersion row, which
+no cache eviction can drop, and replaced whenever an Exercise is saved or
+deleted (see signals.py); a process whose copy is tagged with an older
+version reloads it.
+
+The version also seeds the strong ETag of every catalog response.
+"""
+import hashlib
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from .models import Exercise, ExerciseCatalogVersion
+from .serializers import ExerciseSerializer
+
+CATALOG_VERSION_ID = 1
+
+# Query parameters that select a slice of the catalog, mapped to the exercise field they match
+CATALOG_FILTERS = {
+    'muscle_group': 'muscle_groups',
+    'equipment': 'equipment_required',
+    'difficulty': 'difficulty_level',
+}
+
+_catalog = None
+_catalog_by_id = None
+_catalog_version = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_version() -> str:
+    version = ExerciseCatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).values_list('version', flat=True).first()
+    if version is None:
+        catalog_version, _ = ExerciseCatalogVersion.objects.get_or_create(
+            pk=CATALOG_VERSION_ID, defaults={'version': uuid.uuid4().hex}
+        )
+        version = catalog_version.version
+    return version
+
+
+def bump_catalog_version() -> None:
+    """Invalidate every process's copy of the catalog"""
+    ExerciseCatalogVersion.objects.update_or_create(pk=CATALOG_VERSION_ID, defaults={'version': uuid.uuid4().hex})
+
+
+def _load_catalog() -> Tuple[str, List[Dict], Dict[int, Dict]]:
+    global _catalog, _catalog_by_id, _catalog_version
+    version = get_catalog_version()
+    with _catalog_lock:
+        if _catalog_version != version:
+            _catalog = ExerciseSerializer(Exercise.objects.filter(is_active=True), many=True).data
+            _catalog_by_id = {exercise['id']: exercise for exercise in _catalog}
+            _catalog_version = version
+        return version, _catalog, _catalog_by_id
+
+
+def get_exercise_catalog() -> Tuple[str, List[Dict]]:
+    """(version, serialized active exercises), reloaded only when the version has moved"""
+    version, exercises, _ = _load_catalog()
+    return version, exercises
+
+
+def get_catalog_exercises(exercise_ids: List[int]) -> List[Dict]:
+    """Serialized active exercises for exercise_ids, in that order; unknown or inactive ids are skipped"""
+    _, _, by_id = _load_catalog()
+    return [by_id[exercise_id] for exercise_id in exercise_ids if exercise_id in by_id]
+
+
+def filter_catalog(exercises: List[Dict], params) -> List[Dict]:
+    """Apply the catalog filters in params to serialized exercises"""
+    for param, field in CATALOG_FILTERS.items():
+        value = params.get(param)
+        if value:
+            exercises = [exercise for exercise in exercises if exercise[field] == value]
+    return exercises
+
+
+def catalog_etag(version: str, params, page: Optional[str]) -> str:
+    """Strong ETag for one filtered page of one catalog version"""
+    selection = [(param, params.get(param) or '') for param in CATALOG_FILTERS]
+    digest = hashlib.sha256(repr((version, selection, page)).encode()).hexdigest()[:32]
+    return f'"{digest}"'
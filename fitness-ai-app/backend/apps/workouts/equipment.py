@@ -0,0 +1,80 @@
+"""
+Equipment names normalized to ``Exercise.EQUIPMENT_CHOICES`` and packed into
+bitmasks, one bit per choice, so "can this user do this template" is a
+single bitwise test.
+
+Templates and users store their mask in an indexed ``equipment_mask``
+column. "Templates needing nothing the user lacks" is then a bitwise AND of
+the column with ``lacking_equipment(user_mask)`` compared to zero.
+
+Names that match no choice set the reserved OTHER bit rather than nothing,
+so a template needing unknown equipment is only offered to users who also
+listed some, instead of to everyone.
+"""
+from typing import Iterable, Optional
+
+from .models import Exercise
+
+EQUIPMENT_BITS = {key: 1 << bit for bit, (key, _) in enumerate(Exercise.EQUIPMENT_CHOICES)}
+BODYWEIGHT = EQUIPMENT_BITS['bodyweight']
+OTHER = 1 << len(Exercise.EQUIPMENT_CHOICES)
+ALL_EQUIPMENT = (OTHER << 1) - 1
+
+# Free-text spellings seen in profiles and templates, keyed in normalized form
+_ALIASES = {
+    'body weight': 'bodyweight',
+    'none': 'bodyweight',
+    'no equipment': 'bodyweight',
+    'band': 'resistance_bands',
+    'bands': 'resistance_bands',
+    'mat': 'yoga_mat',
+    'pullup bar': 'pull_up_bar',
+    'chin up bar': 'pull_up_bar',
+    'treadmill': 'cardio_equipment',
+    'exercise bike': 'cardio_equipment',
+    'bike': 'cardio_equipment',
+    'rower': 'cardio_equipment',
+    'rowing machine': 'cardio_equipment',
+    'cable machine': 'machines',
+    'gym': 'machines',
+}
+
+
+def _normalize(name: str) -> str:
+    return ' '.join(name.lower().replace('-', ' ').replace('_', ' ').split())
+
+
+def _singular(name: str) -> str:
+    return ' '.join(word[:-1] if word.endswith('s') else word for word in name.split())
+
+
+_LOOKUP = {}
+for _key, _label in Exercise.EQUIPMENT_CHOICES:
+    for _name in (_normalize(_key), _normalize(_label)):
+        _LOOKUP[_name] = _key
+        _LOOKUP[_singular(_name)] = _key
+for _name, _key in _ALIASES.items():
+    _LOOKUP[_name] = _key
+    _LOOKUP[_singular(_name)] = _key
+
+
+def normalize_equipment(name: str) -> Optional[str]:
+    """Map a free-text equipment name to its EQUIPMENT_CHOICES key, or None if unknown"""
+    name = _normalize(name)
+    return _LOOKUP.get(name) or _LOOKUP.get(_singular(name))
+
+
+def equipment_mask(names: Iterable[str]) -> int:
+    """Bitmask of the equipment in names; unknown names set OTHER, blank ones are skipped"""
+    mask = 0
+    for name in names:
+        if not name or not name.strip():
+            continue
+        key = normalize_equipment(name)
+        mask |= EQUIPMENT_BITS[key] if key else OTHER
+    return mask
+
+
+def lacking_equipment(mask: int) -> int:
+    """Mask of every equipment bit not in mask"""
+    return ALL_EQUIPMENT & ~mask
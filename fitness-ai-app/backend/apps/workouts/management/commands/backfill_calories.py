@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.workouts.calories import backfill_calories
+from apps.workouts.models import Workout
+from apps.workouts.stats import rebuild_user_workout_stats
+
+
+class Command(BaseCommand):
+    help = "Estimate calories_burned for completed workouts that have none, then refresh the affected stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Workouts per query and update batch")
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        chunk_size = options["chunk_size"]
+        pending = Workout.objects.filter(
+            status="completed", calories_burned__isnull=True
+        ).select_related("user").only(
+            "id", "user_id", "started_at", "completed_at", "actual_duration", "calories_burned", "user__weight"
+        ).order_by("id")
+
+        estimated = 0
+        users = set()
+        last_id = 0
+        while True:
+            # Keyset chunks: filled rows drop out of the filter, unfillable ones are skipped by id
+            chunk = list(pending.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            with transaction.atomic():
+                estimated += backfill_calories(chunk)
+            users.update(workout.user_id for workout in chunk if workout.calories_burned is not None)
+
+        for user_id in sorted(users):
+            with transaction.atomic():
+                rebuild_user_workout_stats(user_id)
+
+        self.stdout.write(
+            f"Estimated calories for {estimated} workouts and refreshed stats for {len(users)} users "
+            f"in {time.monotonic() - start:.1f}s"
+        )
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.workouts.pregeneration import (
+    find_pregeneration_candidates, submit_pregeneration_batch, collect_pregeneration_batches
+)
+
+
+class Command(BaseCommand):
+    help = "Pre-generate AI workouts for a day (tomorrow by default) through a batch job"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to generate for (YYYY-MM-DD)")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="List the users who would get a workout without submitting anything")
+        parser.add_argument("--collect-only", action="store_true",
+                            help="Only materialize workouts from batches that have finished")
+
+    def handle(self, *args, **options):
+        if options["collect_only"]:
+            self._report_collected(collect_pregeneration_batches())
+            return
+
+        if options["date"]:
+            try:
+                day = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+        else:
+            day = timezone.now().date() + timedelta(days=1)
+
+        if options["dry_run"]:
+            candidates = find_pregeneration_candidates(day)
+            for user, template in candidates:
+                source = f"plan template {template.name}" if template else "preferred day"
+                self.stdout.write(f"{user.email}: {source}")
+            self.stdout.write(f"{len(candidates)} users due a workout on {day}")
+            return
+
+        submitted = submit_pregeneration_batch(day)
+        self.stdout.write(
+            f"{day}: {submitted['requests']} requests, {submitted['from_cache']} served from cache, "
+            f"{submitted['batched']} batched as {submitted['unique_prompts']} prompts"
+            + (f" (batch {submitted['batch_id']})" if submitted['batch_id'] else "")
+        )
+        self._report_collected(collect_pregeneration_batches())
+
+    def _report_collected(self, collected):
+        self.stdout.write(
+            f"Collected {collected['batches']} finished batches: "
+            f"{collected['completed']} workouts created, {collected['failed']} failed"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.workouts.search import rebuild_exercise_search
+
+
+class Command(BaseCommand):
+    help = "Refill the SQLite exercise search table, e.g. after bulk edits that bypassed model signals"
+
+    def handle(self, *args, **options):
+        rebuild_exercise_search()
+        self.stdout.write("Rebuilt the exercise search index")
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.workouts.stats import rebuild_user_workout_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user workout stats rollup from the workouts table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this user (email)")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["user"]:
+            users = users.filter(email=options["user"])
+            if not users.exists():
+                raise CommandError(f"No user with email {options['user']}")
+
+        rebuilt = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            with transaction.atomic():
+                rebuild_user_workout_stats(user_id)
+            rebuilt += 1
+        self.stdout.write(f"Rebuilt workout stats for {rebuilt} users")
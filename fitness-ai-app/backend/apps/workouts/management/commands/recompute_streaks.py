@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.workouts.streaks import recompute_streaks
+
+
+class Command(BaseCommand):
+    help = "Recompute current and longest workout streaks for every user from completed workouts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Users per query and update batch")
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        totals = recompute_streaks(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            f"Recomputed streaks for {totals['users']} users "
+            f"({totals['workout_days']} workout days) in {time.monotonic() - start:.1f}s"
+        )
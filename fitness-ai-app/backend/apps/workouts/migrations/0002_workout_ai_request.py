@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0006_aicontentrequest_batch_id'),
+        ('workouts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workout',
+            name='ai_request',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workout', to='ai_content.aicontentrequest'),
+        ),
+    ]
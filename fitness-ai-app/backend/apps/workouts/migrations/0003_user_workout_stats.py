@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0008_usage_stats_response_time_totals'),
+        ('workouts', '0002_workout_ai_request'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserWorkoutStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_workouts', models.PositiveIntegerField(default=0, help_text='Workouts in any status')),
+                ('completed_workouts', models.PositiveIntegerField(default=0)),
+                ('total_calories_burned', models.PositiveIntegerField(default=0)),
+                ('total_duration_minutes', models.FloatField(default=0)),
+                ('timed_workouts', models.PositiveIntegerField(default=0)),
+                ('workout_type_counts', models.JSONField(default=dict, help_text='Completed workouts per template workout type')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_workout_stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='workout',
+            index=models.Index(fields=['user', 'status', 'completed_at'], name='workouts_user_id_e59ccc_idx'),
+        ),
+        migrations.AddField(
+            model_name='userworkoutstats',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='workout_stats', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
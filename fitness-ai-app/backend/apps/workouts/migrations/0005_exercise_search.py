@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE exercises_fts USING fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO exercises_fts (rowid, name, description) "
+            "SELECT id, name, description FROM exercises WHERE is_active"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX exercises_search_vector ON exercises USING GIN (("
+            "setweight(to_tsvector('english', name), 'A') || "
+            "setweight(to_tsvector('english', description), 'B')))"
+        )
+        schema_editor.execute("CREATE INDEX exercises_name_trgm ON exercises USING GIN (name gin_trgm_ops)")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS exercises_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS exercises_search_vector")
+        schema_editor.execute("DROP INDEX IF EXISTS exercises_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0004_equipment_mask'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
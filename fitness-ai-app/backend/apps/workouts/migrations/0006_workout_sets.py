@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:51
+
+import json
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _parse_list(value):
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def _reps(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) and value >= 0 else None
+
+
+def _weight(value):
+    try:
+        weight = Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return None
+    return weight if weight.is_finite() and abs(weight) < 10000 else None
+
+
+def split_sessions_into_sets(apps, schema_editor):
+    WorkoutSession = apps.get_model('workouts', 'WorkoutSession')
+    WorkoutSet = apps.get_model('workouts', 'WorkoutSet')
+    batch = []
+    sessions = WorkoutSession.objects.values_list('id', 'reps_completed', 'weight_used')
+    for session_id, reps_completed, weight_used in sessions.iterator(chunk_size=2000):
+        reps_list = _parse_list(reps_completed)
+        weight_list = _parse_list(weight_used)
+        for number in range(1, max(len(reps_list), len(weight_list)) + 1):
+            batch.append(WorkoutSet(
+                session_id=session_id,
+                set_number=number,
+                reps=_reps(reps_list[number - 1]) if number <= len(reps_list) else None,
+                weight_kg=_weight(weight_list[number - 1]) if number <= len(weight_list) else None
+            ))
+        if len(batch) >= 5000:
+            WorkoutSet.objects.bulk_create(batch)
+            batch = []
+    WorkoutSet.objects.bulk_create(batch)
+
+
+def join_sets_into_sessions(apps, schema_editor):
+    WorkoutSession = apps.get_model('workouts', 'WorkoutSession')
+    WorkoutSet = apps.get_model('workouts', 'WorkoutSet')
+    lists = {}
+    for session_id, reps, weight_kg in WorkoutSet.objects.order_by('session_id', 'set_number').values_list(
+        'session_id', 'reps', 'weight_kg'
+    ).iterator(chunk_size=5000):
+        reps_list, weight_list = lists.setdefault(session_id, ([], []))
+        reps_list.append(reps)
+        weight_list.append(float(weight_kg) if weight_kg is not None else None)
+    sessions = []
+    for session in WorkoutSession.objects.only('id').iterator(chunk_size=2000):
+        reps_list, weight_list = lists.get(session.id, ([], []))
+        session.reps_completed = json.dumps(reps_list)
+        session.weight_used = json.dumps(weight_list)
+        sessions.append(session)
+    WorkoutSession.objects.bulk_update(sessions, ['reps_completed', 'weight_used'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0005_exercise_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('set_number', models.PositiveIntegerField()),
+                ('reps', models.PositiveIntegerField(blank=True, null=True)),
+                ('weight_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sets', to='workouts.workoutsession')),
+            ],
+            options={
+                'db_table': 'workout_sets',
+                'ordering': ['set_number'],
+                'unique_together': {('session', 'set_number')},
+            },
+        ),
+        migrations.RunPython(split_sessions_into_sets, join_sets_into_sessions),
+        # Defaults only so the columns can be restored when migrating backwards
+        migrations.AlterField(
+            model_name='workoutsession',
+            name='reps_completed',
+            field=models.TextField(default='[]', help_text='JSON array of reps per set'),
+        ),
+        migrations.AlterField(
+            model_name='workoutsession',
+            name='weight_used',
+            field=models.TextField(blank=True, default='[]', help_text='JSON array of weights per set'),
+        ),
+        migrations.RemoveField(
+            model_name='workoutsession',
+            name='reps_completed',
+        ),
+        migrations.RemoveField(
+            model_name='workoutsession',
+            name='weight_used',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0006_workout_sets'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workout',
+            name='calories_burned',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0007_calories_burned_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workout',
+            name='plan',
+            field=models.ForeignKey(blank=True, help_text='Plan this workout was scheduled from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workouts', to='workouts.workoutplan'),
+        ),
+        migrations.AddField(
+            model_name='workoutplan',
+            name='completed_workouts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workoutplan',
+            name='total_workouts',
+            field=models.PositiveIntegerField(default=0, help_text='Workouts scheduled on activation'),
+        ),
+    ]
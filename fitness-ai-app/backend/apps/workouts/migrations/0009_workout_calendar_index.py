@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_content', '0008_usage_stats_response_time_totals'),
+        ('workouts', '0008_plan_activation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workout',
+            index=models.Index(fields=['user', 'scheduled_date', 'status'], name='workouts_user_id_8b419f_idx'),
+        ),
+    ]
@@ -1,7 +1,6 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-import json
 
 
 class Exercise(models.Model):
@@ -63,6 +62,18 @@ class Exercise(models.Model):
         return self.name
 
 
+class ExerciseCatalogVersion(models.Model):
+    """Single row holding the current exercise catalog version, replaced whenever an Exercise changes (see catalog.py)"""
+    version = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'exercise_catalog_version'
+
+    def __str__(self):
+        return self.version
+
+
 class WorkoutTemplate(models.Model):
     WORKOUT_TYPE_CHOICES = [
         ('strength', 'Strength Training'),
@@ -86,6 +97,9 @@ class WorkoutTemplate(models.Model):
     
     # Requirements
     equipment_needed = models.TextField(help_text="Comma-separated list of equipment")
+    equipment_mask = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False, help_text="equipment_needed as an EQUIPMENT_CHOICES bitmask"
+    )
     space_required = models.CharField(max_length=100, default="Small indoor space")
     
     # Metadata
@@ -104,6 +118,14 @@ class WorkoutTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.workout_type})"
 
+    def save(self, *args, **kwargs):
+        from .equipment import equipment_mask
+        self.equipment_mask = equipment_mask(self.get_equipment_list())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'equipment_needed' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'equipment_mask'}
+        super().save(*args, **kwargs)
+
     def get_equipment_list(self):
         if self.equipment_needed:
             return [item.strip() for item in self.equipment_needed.split(',')]
@@ -145,6 +167,10 @@ class Workout(models.Model):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='workouts')
     template = models.ForeignKey(WorkoutTemplate, on_delete=models.CASCADE, null=True, blank=True)
+    plan = models.ForeignKey(
+        'WorkoutPlan', on_delete=models.SET_NULL, null=True, blank=True, related_name='workouts',
+        help_text="Plan this workout was scheduled from"
+    )
     
     # Workout details
     name = models.CharField(max_length=200)
@@ -157,7 +183,7 @@ class Workout(models.Model):
     actual_duration = models.PositiveIntegerField(null=True, blank=True, help_text="Actual duration in minutes")
     
     # Performance metrics
-    calories_burned = models.PositiveIntegerField(null=True, blank=True)
+    calories_burned = models.PositiveIntegerField(null=True, blank=True, db_index=True)
     average_heart_rate = models.PositiveIntegerField(null=True, blank=True)
     max_heart_rate = models.PositiveIntegerField(null=True, blank=True)
     perceived_exertion = models.PositiveIntegerField(
@@ -175,6 +201,9 @@ class Workout(models.Model):
     
     # AI generation context
     ai_prompt_context = models.TextField(blank=True, help_text="Context used for AI generation")
+    ai_request = models.OneToOneField(
+        'ai_content.AIContentRequest', on_delete=models.SET_NULL, null=True, blank=True, related_name='workout'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -182,6 +211,10 @@ class Workout(models.Model):
     class Meta:
         db_table = 'workouts'
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['user', 'status', 'completed_at']),
+            models.Index(fields=['user', 'scheduled_date', 'status']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.name} ({self.scheduled_date.date()})"
@@ -203,9 +236,7 @@ class WorkoutSession(models.Model):
     planned_sets = models.PositiveIntegerField()
     completed_sets = models.PositiveIntegerField(default=0)
     
-    # Performance tracking
-    reps_completed = models.TextField(help_text="JSON array of reps per set")
-    weight_used = models.TextField(help_text="JSON array of weights per set", blank=True)
+    # Performance tracking (reps and weights live in WorkoutSet)
     duration_seconds = models.PositiveIntegerField(null=True, blank=True)
     
     # Feedback
@@ -226,22 +257,64 @@ class WorkoutSession(models.Model):
         return f"{self.workout.name} - {self.exercise.name}"
 
     def get_reps_list(self):
-        try:
-            return json.loads(self.reps_completed)
-        except (json.JSONDecodeError, TypeError):
-            return []
-
-    def set_reps_list(self, reps_list):
-        self.reps_completed = json.dumps(reps_list)
+        return [workout_set.reps for workout_set in self.sets.all()]
 
     def get_weight_list(self):
-        try:
-            return json.loads(self.weight_used)
-        except (json.JSONDecodeError, TypeError):
-            return []
+        return [
+            float(workout_set.weight_kg) if workout_set.weight_kg is not None else None
+            for workout_set in self.sets.all()
+        ]
+
+    def replace_sets(self, reps_list=None, weight_list=None):
+        """Rewrite this session's sets; a list left as None keeps its current values"""
+        if reps_list is None:
+            reps_list = self.get_reps_list()
+        if weight_list is None:
+            weight_list = self.get_weight_list()
+        count = max(len(reps_list), len(weight_list))
+        self.sets.all().delete()
+        WorkoutSet.objects.bulk_create([
+            WorkoutSet(
+                session=self,
+                set_number=number,
+                reps=reps_list[number - 1] if number <= len(reps_list) else None,
+                weight_kg=weight_list[number - 1] if number <= len(weight_list) else None
+            )
+            for number in range(1, count + 1)
+        ])
+        # Drop any prefetched sets so the lists above are re-read
+        getattr(self, '_prefetched_objects_cache', {}).pop('sets', None)
+
+
+class WorkoutSet(models.Model):
+    """One performed set of a session, stored per row so the database can aggregate volume"""
+    session = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE, related_name='sets')
+    set_number = models.PositiveIntegerField()
+    reps = models.PositiveIntegerField(null=True, blank=True)
+    weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        db_table = 'workout_sets'
+        ordering = ['set_number']
+        unique_together = ['session', 'set_number']
+
+    def __str__(self):
+        return f"{self.session} - set {self.set_number}"
 
-    def set_weight_list(self, weight_list):
-        self.weight_used = json.dumps(weight_list)
+
+class SyncOperation(models.Model):
+    """A client-generated operation id already applied by a workout sync, so a resent batch is skipped"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_operations')
+    workout = models.ForeignKey(Workout, on_delete=models.CASCADE, related_name='sync_operations')
+    operation_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'workout_sync_operations'
+        unique_together = ['user', 'operation_id']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.operation_id}"
 
 
 class WorkoutPlan(models.Model):
@@ -260,6 +333,8 @@ class WorkoutPlan(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     completion_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    total_workouts = models.PositiveIntegerField(default=0, help_text="Workouts scheduled on activation")
+    completed_workouts = models.PositiveIntegerField(default=0)
     
     # AI generation
     ai_generated = models.BooleanField(default=False)
@@ -288,3 +363,44 @@ class WorkoutPlanWorkout(models.Model):
 
     def __str__(self):
         return f"{self.plan.name} - Week {self.week_number}, Day {self.day_of_week}"
+
+
+class UserWorkoutStats(models.Model):
+    """Per-user workout totals, kept current as workouts are created and completed"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='workout_stats')
+    
+    total_workouts = models.PositiveIntegerField(default=0, help_text="Workouts in any status")
+    completed_workouts = models.PositiveIntegerField(default=0)
+    total_calories_burned = models.PositiveIntegerField(default=0)
+    
+    # Average duration over completed workouts with both a start and end time
+    total_duration_minutes = models.FloatField(default=0)
+    timed_workouts = models.PositiveIntegerField(default=0)
+    
+    workout_type_counts = models.JSONField(default=dict, help_text="Completed workouts per template workout type")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_workout_stats'
+
+    def __str__(self):
+        return f"{self.user.email} - {self.completed_workouts} workouts"
+
+    @property
+    def avg_workout_duration(self):
+        if not self.timed_workouts:
+            return 0
+        return self.total_duration_minutes / self.timed_workouts
+
+    @property
+    def favorite_workout_type(self):
+        if not self.workout_type_counts:
+            return 'Mixed'
+        return max(self.workout_type_counts, key=self.workout_type_counts.get)
+
+    @property
+    def completion_rate(self):
+        if not self.total_workouts:
+            return 0
+        return self.completed_workouts / self.total_workouts * 100
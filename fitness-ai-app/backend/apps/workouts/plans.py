@@ -0,0 +1,116 @@
+"""
+Workout plan activation and progress.
+
+Activation expands a plan's weekly schedule (``WorkoutPlanWorkout`` rows)
+into dated ``Workout`` rows with their ``WorkoutSession`` rows, using a
+bulk_create per table inside one transaction. Plan week ``n`` starts
+``7 * (n - 1)`` days after ``start_date`` and an entry lands on the day of
+that week whose ISO weekday is its ``day_of_week``. Weeks without entries
+of their own repeat the defined weeks in order, so a one-week template
+fills the whole plan.
+
+Each completed plan workout bumps the plan's counters with a single
+F() update.
+"""
+from datetime import date, datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+from typing import Dict, Optional
+
+from .models import Workout, WorkoutExercise, WorkoutPlan, WorkoutSession
+from .stats import record_workouts_created
+
+
+class PlanActivationError(Exception):
+    """The plan cannot be activated as it stands"""
+
+
+def plan_day(plan_start: date, week_number: int, day_of_week: int) -> date:
+    week_start = plan_start + timedelta(weeks=week_number - 1)
+    return week_start + timedelta(days=(day_of_week - week_start.isoweekday()) % 7)
+
+
+@transaction.atomic
+def activate_plan(plan: WorkoutPlan, start_date: Optional[date] = None) -> Dict:
+    """Create the plan's scheduled workouts; returns counts and the scheduled date range"""
+    # The row lock serializes concurrent activations; the second one then sees the first one's total
+    if WorkoutPlan.objects.select_for_update().values_list('total_workouts', flat=True).get(pk=plan.pk):
+        raise PlanActivationError("This plan has already been activated")
+    start_date = start_date or plan.start_date
+
+    schedule = {}
+    for template_id, name, week_number, day_of_week in plan.plan_workouts.order_by(
+        'week_number', 'day_of_week'
+    ).values_list('template_id', 'template__name', 'week_number', 'day_of_week'):
+        schedule.setdefault(week_number, []).append((template_id, name, day_of_week))
+    if not schedule:
+        raise PlanActivationError("This plan has no scheduled workouts")
+
+    defined_weeks = sorted(schedule)
+    entries = []
+    for week_number in range(1, plan.duration_weeks + 1):
+        week = schedule.get(week_number) or schedule[defined_weeks[(week_number - 1) % len(defined_weeks)]]
+        for template_id, name, day_of_week in week[:plan.workouts_per_week]:
+            entries.append((template_id, name, plan_day(start_date, week_number, day_of_week)))
+    if not entries:
+        raise PlanActivationError("This plan schedules no workouts")
+
+    template_exercises = {}
+    for template_id, exercise_id, order, sets in WorkoutExercise.objects.filter(
+        workout_template_id__in={template_id for template_id, _, _ in entries}
+    ).values_list('workout_template_id', 'exercise_id', 'order', 'sets'):
+        template_exercises.setdefault(template_id, []).append((exercise_id, order, sets))
+
+    start_hour = time(settings.WORKOUT_PLAN_START_HOUR)
+    workouts = Workout.objects.bulk_create([
+        Workout(
+            user_id=plan.user_id,
+            plan=plan,
+            template_id=template_id,
+            name=name,
+            scheduled_date=timezone.make_aware(datetime.combine(day, start_hour))
+        )
+        for template_id, name, day in entries
+    ])
+    sessions = WorkoutSession.objects.bulk_create([
+        WorkoutSession(workout=workout, exercise_id=exercise_id, order=order, planned_sets=sets)
+        for workout in workouts
+        for exercise_id, order, sets in template_exercises.get(workout.template_id, ())
+    ], batch_size=500)
+
+    plan.start_date = start_date
+    plan.end_date = start_date + timedelta(weeks=plan.duration_weeks) - timedelta(days=1)
+    plan.total_workouts = len(workouts)
+    plan.completed_workouts = 0
+    plan.completion_percentage = 0
+    plan.is_active = True
+    plan.save(update_fields=[
+        'start_date', 'end_date', 'total_workouts', 'completed_workouts', 'completion_percentage',
+        'is_active', 'updated_at'
+    ])
+    # bulk_create sends no post_save, so count the new workouts here
+    record_workouts_created(plan.user_id, len(workouts))
+
+    days = [day for _, _, day in entries]
+    return {
+        'workouts_created': len(workouts),
+        'sessions_created': len(sessions),
+        'first_workout_date': min(days),
+        'last_workout_date': max(days),
+    }
+
+
+def record_plan_workout_completed(plan_id: int) -> None:
+    """Count one more completed workout towards a plan; call inside the completion's transaction"""
+    completed = F('completed_workouts') + 1
+    WorkoutPlan.objects.filter(id=plan_id, total_workouts__gt=0).update(
+        completed_workouts=completed,
+        completion_percentage=ExpressionWrapper(
+            Round(completed * Value(100.0) / F('total_workouts'), 2),
+            output_field=DecimalField(max_digits=5, decimal_places=2)
+        ),
+        updated_at=timezone.now()
+    )
@@ -0,0 +1,215 @@
+"""
+Overnight pre-generation of the next day's AI workouts.
+
+``submit_pregeneration_batch`` finds users due to train on a given day (an
+active WorkoutPlan slot or one of their preferred workout days), records an
+AIContentRequest for each and submits the prompts as one batch job.
+``collect_pregeneration_batches`` picks up finished batches and materializes
+scheduled Workout rows, so the morning ``today/`` request is a plain read.
+"""
+import json
+from datetime import datetime, time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from typing import Dict, List, Tuple
+
+from .models import Workout, WorkoutPlanWorkout
+from apps.ai_content.models import AIContentRequest
+from apps.ai_content.services import build_workout_profile, finish_generation, abort_generation
+from core.ai_integrations.batch import get_batch_backend
+from core.ai_integrations.cache import generation_cache
+from core.ai_integrations.claude_client import get_claude_client
+
+User = get_user_model()
+
+
+def plan_week_number(plan, day) -> int:
+    """Week of the plan that day falls in (1-based)"""
+    return (day - plan.start_date).days // 7 + 1
+
+
+def find_pregeneration_candidates(day) -> List[Tuple]:
+    """Return (user, template or None) for users due a workout on day without one"""
+    already_scheduled = Workout.objects.filter(scheduled_date__date=day).values('user_id')
+    already_queued = AIContentRequest.objects.filter(
+        content_type='workout',
+        status__in=['pending', 'processing'],
+        prompt_context__scheduled_for=day.isoformat()
+    ).values('user_id')
+
+    candidates = {}
+
+    # Plan slots for that weekday; the week number depends on each plan's start
+    slots = WorkoutPlanWorkout.objects.filter(
+        plan__is_active=True,
+        plan__start_date__lte=day,
+        plan__end_date__gte=day,
+        day_of_week=day.isoweekday()
+    ).exclude(
+        plan__user_id__in=already_scheduled
+    ).exclude(
+        plan__user_id__in=already_queued
+    ).select_related('plan__user', 'template')
+
+    for slot in slots:
+        if slot.week_number == plan_week_number(slot.plan, day):
+            candidates.setdefault(slot.plan.user_id, (slot.plan.user, slot.template))
+
+    # Users who asked to train on that weekday
+    preferred = User.objects.filter(
+        is_active=True,
+        preferred_workout_days__contains=str(day.isoweekday())
+    ).exclude(
+        id__in=already_scheduled
+    ).exclude(
+        id__in=already_queued
+    )
+
+    for user in preferred:
+        if day.isoweekday() in user.get_preferred_workout_days():
+            candidates.setdefault(user.id, (user, None))
+
+    return list(candidates.values())
+
+
+def submit_pregeneration_batch(day, backend=None) -> Dict:
+    """Record pending workout requests for day and submit them as one batch job.
+
+    Requests whose generation is already cached are completed immediately;
+    identical prompts are submitted once and share the result.
+    """
+    claude_client = get_claude_client()
+    ai_requests = []
+    for user, template in find_pregeneration_candidates(day):
+        preferences = {
+            'workout_type': template.workout_type if template else 'general',
+            'use_cache': True,
+            'scheduled_for': day.isoformat()
+        }
+        if template:
+            preferences['template_id'] = template.id
+            preferences['duration_minutes'] = template.estimated_duration
+
+        user_profile = build_workout_profile(user, preferences)
+        ai_requests.append(AIContentRequest(
+            user=user,
+            content_type='workout',
+            status='pending',
+            user_context=user_profile,
+            prompt_context=preferences,
+            cache_key=claude_client.workout_fingerprint(user_profile, preferences['workout_type'])
+        ))
+
+    ai_requests = AIContentRequest.objects.bulk_create(ai_requests)
+
+    batch_requests = {}
+    queued = []
+    completed = 0
+    for ai_request in ai_requests:
+        cached = generation_cache.get(ai_request.cache_key)
+        if cached is not None:
+            _complete(ai_request, claude_client.cached_response(cached, ai_request.cache_key))
+            completed += 1
+            continue
+
+        if ai_request.cache_key not in batch_requests:
+            batch_requests[ai_request.cache_key] = claude_client.workout_message_params(
+                ai_request.user_context, ai_request.prompt_context['workout_type']
+            )
+        queued.append(ai_request.id)
+
+    batch_id = ''
+    if batch_requests:
+        backend = backend or get_batch_backend()
+        try:
+            batch_id = backend.submit(batch_requests)
+        except Exception as e:
+            for ai_request in AIContentRequest.objects.filter(id__in=queued).select_related('user'):
+                abort_generation(ai_request, e, None)
+            raise
+        AIContentRequest.objects.filter(id__in=queued).update(batch_id=batch_id)
+
+    return {
+        'requests': len(ai_requests),
+        'from_cache': completed,
+        'batched': len(queued),
+        'unique_prompts': len(batch_requests),
+        'batch_id': batch_id
+    }
+
+
+def collect_pregeneration_batches(backend=None) -> Dict:
+    """Materialize Workout rows for every pending batch that has finished"""
+    backend = backend or get_batch_backend()
+    batch_ids = AIContentRequest.objects.filter(
+        content_type='workout',
+        status='pending'
+    ).exclude(batch_id='').order_by().values_list('batch_id', flat=True).distinct()
+
+    collected = {'batches': 0, 'completed': 0, 'failed': 0}
+    for batch_id in list(batch_ids):
+        if not backend.is_finished(batch_id):
+            continue
+
+        responses = backend.results(batch_id, 'workout')
+        first_request_ids = {}
+        ai_requests = AIContentRequest.objects.filter(
+            batch_id=batch_id, status='pending'
+        ).select_related('user').order_by('id')
+
+        for ai_request in ai_requests:
+            ai_response = responses.get(ai_request.cache_key) or {
+                'success': False,
+                'error': 'Missing from batch results',
+                'workout': None
+            }
+            if ai_response['success']:
+                if ai_request.cache_key not in first_request_ids:
+                    first_request_ids[ai_request.cache_key] = ai_request.id
+                    generation_cache.set(ai_request.cache_key, ai_response)
+                ai_response = {
+                    **ai_response,
+                    'cache_key': ai_request.cache_key,
+                    'source_request_id': first_request_ids[ai_request.cache_key]
+                }
+
+            if _complete(ai_request, ai_response):
+                collected['completed' if ai_response['success'] else 'failed'] += 1
+
+        collected['batches'] += 1
+
+    return collected
+
+
+def _complete(ai_request: AIContentRequest, ai_response: Dict) -> bool:
+    """Record a batch response and create the scheduled workout it produced.
+
+    Returns False if the request was no longer pending (an overlapping
+    collect already recorded it).
+    """
+    with transaction.atomic():
+        # Locked, so overlapping collects of one batch record each request once
+        ai_request = AIContentRequest.objects.select_for_update(of=('self',)).select_related('user').get(
+            id=ai_request.id
+        )
+        if ai_request.status != 'pending':
+            return False
+
+        # Batch turnaround is not a response time, so it stays out of the latency stats
+        finish_generation(ai_request, ai_response, None)
+        if ai_request.status != 'completed':
+            return True
+
+        preferences = ai_request.prompt_context
+        day = datetime.strptime(preferences['scheduled_for'], '%Y-%m-%d').date()
+        Workout.objects.create(
+            user=ai_request.user,
+            template_id=preferences.get('template_id'),
+            name=f"AI Generated {preferences['workout_type'].title()} Workout",
+            scheduled_date=timezone.make_aware(datetime.combine(day, time(settings.AI_PREGENERATED_WORKOUT_HOUR))),
+            ai_prompt_context=json.dumps(preferences),
+            ai_request=ai_request
+        )
+    return True
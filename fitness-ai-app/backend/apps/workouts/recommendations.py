@@ -0,0 +1,192 @@
+"""
+Template suggestions for days without a scheduled workout.
+
+``TemplateIndex`` holds a feature matrix over public templates, one row each:
+- workout type (one-hot)
+- difficulty (one-hot)
+- duration bucket (one-hot)
+- popularity (log-scaled recent completions)
+Each template's equipment_mask is kept beside the matrix.
+
+A user's preference vector lives in the same space. It is built from:
+- completed workouts by type (the stats rollup)
+- fitness level
+- preferred duration
+Suggestions are the top-k rows of one matrix-vector product, restricted
+to templates the user has the equipment for.
+
+The index is rebuilt per process every WORKOUT_SUGGESTION_INDEX_TTL seconds,
+by the first request to find it stale; other requests meanwhile keep using
+the old index rather than waiting on the rebuild.
+Each user's suggestions are cached for the day (and until their profile
+changes) in the WORKOUT_SUGGESTION_CACHE_ALIAS cache.
+"""
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from django.utils import timezone
+from typing import Dict, List
+
+from .equipment import BODYWEIGHT
+from .models import Exercise, Workout, WorkoutTemplate
+from .stats import get_user_workout_stats
+
+WORKOUT_TYPES = [key for key, _ in WorkoutTemplate.WORKOUT_TYPE_CHOICES]
+DIFFICULTIES = [key for key, _ in Exercise.DIFFICULTY_CHOICES]
+# Upper bounds (minutes) of the duration buckets; the last bucket is open-ended
+DURATION_BUCKETS = [20, 35, 50, 70]
+
+TYPE_OFFSET = 0
+DIFFICULTY_OFFSET = TYPE_OFFSET + len(WORKOUT_TYPES)
+DURATION_OFFSET = DIFFICULTY_OFFSET + len(DIFFICULTIES)
+POPULARITY_COLUMN = DURATION_OFFSET + len(DURATION_BUCKETS) + 1
+FEATURES = POPULARITY_COLUMN + 1
+
+# Relative weight of each preference group in the score
+TYPE_WEIGHT = 1.0
+DIFFICULTY_WEIGHT = 0.8
+DURATION_WEIGHT = 0.6
+POPULARITY_WEIGHT = 0.3
+
+# Completions counted towards popularity
+POPULARITY_WINDOW_DAYS = 90
+
+# Users without history (or 'expert', which templates don't use) map onto this ladder
+LEVEL_TO_DIFFICULTY = {'beginner': 0, 'intermediate': 1, 'advanced': 2, 'expert': 2}
+
+
+def duration_bucket(minutes: int) -> int:
+    return int(np.searchsorted(DURATION_BUCKETS, minutes))
+
+
+class TemplateIndex:
+    """Feature matrix and display data for the public templates"""
+
+    def __init__(self, rows: List, popularity: Dict[int, int]):
+        count = len(rows)
+        self.ids = np.empty(count, dtype=np.int64)
+        self.equipment = np.zeros(count, dtype=np.int64)
+        self.features = np.zeros((count, FEATURES), dtype=np.float32)
+        self.display = []
+
+        type_columns = {workout_type: TYPE_OFFSET + i for i, workout_type in enumerate(WORKOUT_TYPES)}
+        difficulty_columns = {level: DIFFICULTY_OFFSET + i for i, level in enumerate(DIFFICULTIES)}
+        for row, (template_id, name, workout_type, difficulty, duration, equipment) in enumerate(rows):
+            self.ids[row] = template_id
+            self.equipment[row] = equipment
+            # Values outside the choices (legacy rows) just get no type or difficulty credit
+            if workout_type in type_columns:
+                self.features[row, type_columns[workout_type]] = 1
+            if difficulty in difficulty_columns:
+                self.features[row, difficulty_columns[difficulty]] = 1
+            self.features[row, DURATION_OFFSET + duration_bucket(duration)] = 1
+            self.display.append({
+                'id': template_id,
+                'name': name,
+                'type': workout_type,
+                'duration': duration,
+                'difficulty': difficulty
+            })
+
+        counts = np.fromiter((popularity.get(template_id, 0) for template_id in self.ids.tolist()),
+                             dtype=np.float32, count=count)
+        scaled = np.log1p(counts)
+        if count and scaled.max() > 0:
+            self.features[:, POPULARITY_COLUMN] = scaled / scaled.max()
+
+    @classmethod
+    def build(cls) -> 'TemplateIndex':
+        rows = list(WorkoutTemplate.objects.filter(is_public=True).order_by('id').values_list(
+            'id', 'name', 'workout_type', 'difficulty_level', 'estimated_duration', 'equipment_mask'
+        ))
+        since = timezone.now() - timedelta(days=POPULARITY_WINDOW_DAYS)
+        popularity = dict(
+            Workout.objects.filter(
+                status='completed', completed_at__gte=since, template__is_public=True
+            ).order_by().values_list('template_id').annotate(count=Count('id'))
+        )
+        return cls(rows, popularity)
+
+    def top(self, preferences: np.ndarray, user_equipment: int, k: int) -> List[Dict]:
+        """The k best-scoring templates the user has the equipment for"""
+        if not len(self.ids):
+            return []
+        scores = self.features @ preferences
+        # Applied even without listed equipment: that user gets bodyweight templates only
+        missing = self.equipment & ~(user_equipment | BODYWEIGHT)
+        scores[missing != 0] = -np.inf
+
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [self.display[i] for i in best.tolist() if np.isfinite(scores[i])]
+
+
+_index = None
+_index_built_at = 0.0
+_index_rebuilding = False
+_index_lock = threading.Lock()
+
+
+def get_template_index() -> TemplateIndex:
+    """This process's template index. Once it is older than the TTL, one caller
+    rebuilds it while the others keep being served the stale copy"""
+    global _index, _index_built_at, _index_rebuilding
+    with _index_lock:
+        if _index is None:
+            _index = TemplateIndex.build()
+            _index_built_at = time.monotonic()
+            return _index
+        if _index_rebuilding or time.monotonic() - _index_built_at <= settings.WORKOUT_SUGGESTION_INDEX_TTL:
+            return _index
+        _index_rebuilding = True
+
+    try:
+        index = TemplateIndex.build()
+        with _index_lock:
+            _index = index
+            _index_built_at = time.monotonic()
+    finally:
+        _index_rebuilding = False
+    return index
+
+
+def user_preferences(user) -> np.ndarray:
+    """Preference vector for user in the template feature space"""
+    preferences = np.zeros(FEATURES, dtype=np.float32)
+
+    # Workout types in proportion to what the user completes, with a floor so new types still surface
+    type_counts = get_user_workout_stats(user).workout_type_counts
+    total = sum(type_counts.values())
+    for i, workout_type in enumerate(WORKOUT_TYPES):
+        share = type_counts.get(workout_type, 0) / total if total else 0
+        preferences[TYPE_OFFSET + i] = TYPE_WEIGHT * (0.2 + 0.8 * share)
+
+    # Difficulty and duration peak at the user's level and preferred length, half credit one step away
+    level = LEVEL_TO_DIFFICULTY.get(user.fitness_level, 0)
+    for i in range(len(DIFFICULTIES)):
+        preferences[DIFFICULTY_OFFSET + i] = DIFFICULTY_WEIGHT * max(0.0, 1 - 0.5 * abs(i - level))
+
+    bucket = duration_bucket(user.preferred_workout_duration)
+    for i in range(len(DURATION_BUCKETS) + 1):
+        preferences[DURATION_OFFSET + i] = DURATION_WEIGHT * max(0.0, 1 - 0.5 * abs(i - bucket))
+
+    preferences[POPULARITY_COLUMN] = POPULARITY_WEIGHT
+    return preferences
+
+
+def suggest_templates(user, k: int = 5) -> List[Dict]:
+    """Today's top-k template suggestions for user, cached until tomorrow or a profile change"""
+    cache = caches[settings.WORKOUT_SUGGESTION_CACHE_ALIAS]
+    key = f'{user.id}:{timezone.localdate().isoformat()}:{user.updated_at.timestamp()}:{k}'
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = get_template_index().top(
+            user_preferences(user), user.equipment_mask, k
+        )
+        cache.set(key, suggestions, timeout=24 * 60 * 60)
+    return suggestions
@@ -0,0 +1,239 @@
+"""
+Ranked, typo-tolerant exercise search.
+
+Query words missing from the catalog vocabulary are corrected first.
+``FuzzyVocabulary`` finds close spellings through a trigram index and a
+bounded edit distance. The corrected query then goes to the database's own
+full-text index:
+
+- PostgreSQL: a weighted tsvector (name over description) ranked with
+  ts_rank, plus pg_trgm word similarity on the name. Both are served by GIN
+  indexes (migration 0005).
+- SQLite: the ``exercises_fts`` FTS5 table, ranked with bm25. Signals keep
+  it in sync with ``exercises`` (see signals.py).
+
+``search_exercises`` is the entry point for views and server-side callers
+alike, e.g. matching AI-written exercise names to the catalog.
+"""
+import bisect
+import re
+import threading
+from collections import Counter
+from django.db import connection
+from typing import Iterable, List, Optional
+
+from .catalog import get_exercise_catalog
+
+FTS_TABLE = 'exercises_fts'
+
+# bm25 weights of the FTS columns (name, description)
+FTS_WEIGHTS = (10.0, 1.0)
+
+# Shortest query word completed as a prefix ("squ" -> squat, squats)
+MIN_PREFIX_LENGTH = 3
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(word: str) -> set:
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(word: str) -> int:
+    """Edits tolerated in a word of this length"""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 6 else 2
+
+
+class FuzzyVocabulary:
+    """Spelling correction against a fixed set of words.
+
+    Candidates share at least one trigram with the misspelled word and are
+    checked, most shared trigrams first, against the edit distance allowed
+    for its length.
+    """
+
+    max_candidates = 50
+
+    def __init__(self, words: Iterable[str]):
+        self.counts = Counter(word for word in words if not word.isdigit())
+        self.sorted_words = sorted(self.counts)
+        self.trigram_index = {}
+        for word in self.counts:
+            for trigram in _trigrams(word):
+                self.trigram_index.setdefault(trigram, []).append(word)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.counts
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Whether some known word starts with prefix"""
+        i = bisect.bisect_left(self.sorted_words, prefix)
+        return i < len(self.sorted_words) and self.sorted_words[i].startswith(prefix)
+
+    def corrections(self, word: str, limit: int = 3) -> List[str]:
+        """Up to limit known words within max_typos(word) edits, closest and most frequent first"""
+        allowed = max_typos(word)
+        if not allowed:
+            return []
+        shared = Counter()
+        for trigram in _trigrams(word):
+            shared.update(self.trigram_index.get(trigram, ()))
+        matches = []
+        for candidate, _ in shared.most_common(self.max_candidates):
+            distance = edit_distance(word, candidate, allowed)
+            if distance <= allowed:
+                matches.append((distance, -self.counts[candidate], candidate))
+        return [candidate for _, _, candidate in sorted(matches)[:limit]]
+
+
+_vocabulary = None
+_vocabulary_version = None
+_vocabulary_lock = threading.Lock()
+
+
+def get_vocabulary() -> FuzzyVocabulary:
+    """Words of the active catalog's names and descriptions, rebuilt when the catalog version moves"""
+    global _vocabulary, _vocabulary_version
+    version, exercises = get_exercise_catalog()
+    with _vocabulary_lock:
+        if _vocabulary_version != version:
+            _vocabulary = FuzzyVocabulary(
+                word for exercise in exercises
+                for word in tokenize(f"{exercise['name']} {exercise['description']}")
+            )
+            _vocabulary_version = version
+        return _vocabulary
+
+
+def expand_query(query: str) -> List[List[str]]:
+    """Per query word, the spellings to search for (the word itself first).
+
+    Words that match nothing in the catalog, even allowing for typos, are
+    left out rather than emptying the results.
+    """
+    vocabulary = get_vocabulary()
+    groups = []
+    for word in tokenize(query):
+        if word in vocabulary or word.isdigit():
+            groups.append([word])
+            continue
+        corrections = vocabulary.corrections(word)
+        if len(word) >= MIN_PREFIX_LENGTH and vocabulary.has_prefix(word):
+            groups.append([word] + corrections)
+        elif corrections:
+            groups.append(corrections)
+    return groups
+
+
+def _search_sqlite(groups: List[List[str]], limit: int) -> List[int]:
+    terms = []
+    for spellings in groups:
+        alternatives = [f'"{word}"' for word in spellings]
+        if len(spellings[0]) >= MIN_PREFIX_LENGTH:
+            alternatives[0] += '*'
+        terms.append('(' + ' OR '.join(alternatives) + ')')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, {FTS_WEIGHTS[0]}, {FTS_WEIGHTS[1]}) LIMIT %s',
+            [' AND '.join(terms), limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_postgresql(query: str, groups: List[List[str]], limit: int) -> List[int]:
+    # Same expression as the exercises_search_vector index
+    vector = (
+        "setweight(to_tsvector('english', name), 'A') || "
+        "setweight(to_tsvector('english', description), 'B')"
+    )
+    tsquery = ' & '.join(
+        '(' + ' | '.join(
+            f"{word}:*" if i == 0 and len(word) >= MIN_PREFIX_LENGTH else word
+            for i, word in enumerate(spellings)
+        ) + ')'
+        for spellings in groups
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM exercises, to_tsquery('english', %s) query "
+            f"WHERE is_active AND (({vector}) @@ query OR %s <%% name) "
+            f"ORDER BY ts_rank({vector}, query) + word_similarity(%s, name) DESC, name "
+            f"LIMIT %s",
+            [tsquery, query, query, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_exercises(query: str, limit: int = 20) -> List[int]:
+    """Ids of active exercises matching query, best match first"""
+    groups = expand_query(query)
+    if not groups:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(query, groups, limit)
+    return _search_sqlite(groups, limit)
+
+
+def best_exercise_match(name: str) -> Optional[int]:
+    """Id of the catalog exercise that best matches a free-text name, if any does"""
+    matches = search_exercises(name, limit=1)
+    return matches[0] if matches else None
+
+
+def sync_exercise_search(exercise) -> None:
+    """Mirror one exercise into the SQLite FTS table (PostgreSQL indexes the table itself)"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [exercise.id])
+        if exercise.is_active:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+                [exercise.id, exercise.name, exercise.description]
+            )
+
+
+def remove_exercise_search(exercise_id: int) -> None:
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [exercise_id])
+
+
+def rebuild_exercise_search() -> None:
+    """Refill the SQLite FTS table from the exercises table"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM exercises WHERE is_active'
+        )
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Q
 from .models import (
     Exercise, WorkoutTemplate, WorkoutExercise, Workout, 
     WorkoutSession, WorkoutPlan, WorkoutPlanWorkout
@@ -58,14 +60,29 @@ class WorkoutTemplateCreateSerializer(serializers.ModelSerializer):
             'space_required', 'is_public', 'exercises'
         ]
 
+    def validate_exercises(self, value):
+        orders = [exercise_data['order'] for exercise_data in value]
+        if len(set(orders)) != len(orders):
+            raise serializers.ValidationError("Each exercise needs a distinct order")
+        
+        # One query for every referenced exercise
+        exercise_ids = {exercise_data['exercise_id'] for exercise_data in value}
+        found = set(Exercise.objects.filter(id__in=exercise_ids, is_active=True).values_list('id', flat=True))
+        missing = sorted(exercise_ids - found)
+        if missing:
+            raise serializers.ValidationError(f"Unknown exercise ids: {missing}")
+        return value
+
     def create(self, validated_data):
         exercises_data = validated_data.pop('exercises', [])
         validated_data['created_by'] = self.context['request'].user
         
-        template = WorkoutTemplate.objects.create(**validated_data)
-        
-        for exercise_data in exercises_data:
-            WorkoutExercise.objects.create(workout_template=template, **exercise_data)
+        with transaction.atomic():
+            template = WorkoutTemplate.objects.create(**validated_data)
+            WorkoutExercise.objects.bulk_create([
+                WorkoutExercise(workout_template=template, **exercise_data)
+                for exercise_data in exercises_data
+            ])
         
         return template
 
@@ -79,18 +96,50 @@ class WorkoutSessionSerializer(serializers.ModelSerializer):
         model = WorkoutSession
         fields = [
             'id', 'exercise', 'order', 'planned_sets', 'completed_sets',
-            'reps_completed', 'reps_list', 'weight_used', 'weight_list',
-            'duration_seconds', 'difficulty_rating', 'notes'
+            'reps_list', 'weight_list', 'duration_seconds', 'difficulty_rating', 'notes'
         ]
 
+    def validate(self, attrs):
+        # reps_list and weight_list are read from initial_data, so check them here
+        for field, child in (('reps_list', serializers.IntegerField(min_value=0, allow_null=True)),
+                             ('weight_list', serializers.DecimalField(max_digits=6, decimal_places=2, allow_null=True))):
+            if field in self.initial_data:
+                try:
+                    attrs[field] = serializers.ListField(child=child).run_validation(self.initial_data[field])
+                except serializers.ValidationError as e:
+                    raise serializers.ValidationError({field: e.detail})
+        return attrs
+
     def update(self, instance, validated_data):
-        # Handle reps and weights lists if provided in initial_data
-        if 'reps_list' in self.initial_data:
-            instance.set_reps_list(self.initial_data['reps_list'])
-        if 'weight_list' in self.initial_data:
-            instance.set_weight_list(self.initial_data['weight_list'])
+        reps_list = validated_data.pop('reps_list', None)
+        weight_list = validated_data.pop('weight_list', None)
         
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            if reps_list is not None or weight_list is not None:
+                instance.replace_sets(reps_list, weight_list)
+            return super().update(instance, validated_data)
+
+
+class WorkoutSetSyncSerializer(serializers.Serializer):
+    set_number = serializers.IntegerField(min_value=1)
+    reps = serializers.IntegerField(min_value=0, allow_null=True, required=False)
+    weight_kg = serializers.DecimalField(max_digits=6, decimal_places=2, allow_null=True, required=False)
+
+
+class SessionSyncOperationSerializer(serializers.Serializer):
+    """One queued edit of a session; fields left out keep their server values"""
+    operation_id = serializers.CharField(max_length=64)
+    session = serializers.IntegerField()
+    completed_sets = serializers.IntegerField(min_value=0, required=False)
+    duration_seconds = serializers.IntegerField(min_value=0, allow_null=True, required=False)
+    difficulty_rating = serializers.IntegerField(min_value=1, max_value=10, allow_null=True, required=False)
+    notes = serializers.CharField(allow_blank=True, required=False)
+    sets = WorkoutSetSyncSerializer(many=True, required=False)
+
+
+class WorkoutSyncSerializer(serializers.Serializer):
+    cursor = serializers.DateTimeField(required=False, allow_null=True)
+    operations = SessionSyncOperationSerializer(many=True, max_length=500)
 
 
 class WorkoutSerializer(serializers.ModelSerializer):
@@ -98,17 +147,18 @@ class WorkoutSerializer(serializers.ModelSerializer):
     template_id = serializers.IntegerField(write_only=True, required=False)
     sessions = WorkoutSessionSerializer(many=True, read_only=True)
     duration_minutes = serializers.ReadOnlyField()
+    ai_content = serializers.CharField(source='ai_request.generated_content', read_only=True, default=None)
 
     class Meta:
         model = Workout
         fields = [
-            'id', 'template', 'template_id', 'name', 'status', 'scheduled_date',
+            'id', 'template', 'template_id', 'plan', 'name', 'status', 'scheduled_date',
             'started_at', 'completed_at', 'actual_duration', 'duration_minutes',
             'calories_burned', 'average_heart_rate', 'max_heart_rate',
             'perceived_exertion', 'user_rating', 'notes', 'ai_prompt_context',
-            'sessions', 'created_at', 'updated_at'
+            'ai_content', 'sessions', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['plan', 'created_at', 'updated_at']
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -116,38 +166,45 @@ class WorkoutSerializer(serializers.ModelSerializer):
 
 
 class WorkoutCreateSerializer(serializers.ModelSerializer):
+    template_id = serializers.IntegerField(required=False, allow_null=True)
+
     class Meta:
         model = Workout
         fields = [
             'template_id', 'name', 'scheduled_date', 'ai_prompt_context'
         ]
 
+    def validate(self, attrs):
+        template_id = attrs.pop('template_id', None)
+        if template_id:
+            template = WorkoutTemplate.objects.filter(
+                Q(is_public=True) | Q(created_by=self.context['request'].user),
+                id=template_id
+            ).first()
+            if template is None:
+                raise serializers.ValidationError({'template_id': "Workout template not found"})
+            attrs['template'] = template
+            if not attrs.get('name'):
+                attrs['name'] = template.name
+        return attrs
+
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        template_id = validated_data.get('template_id')
         
-        if template_id:
-            try:
-                template = WorkoutTemplate.objects.get(id=template_id)
-                validated_data['template'] = template
-                if not validated_data.get('name'):
-                    validated_data['name'] = template.name
-            except WorkoutTemplate.DoesNotExist:
-                pass
-        
-        workout = Workout.objects.create(**validated_data)
-        
-        # Create workout sessions from template exercises
-        if workout.template:
-            for workout_exercise in workout.template.exercises.all():
-                WorkoutSession.objects.create(
-                    workout=workout,
-                    exercise=workout_exercise.exercise,
-                    order=workout_exercise.order,
-                    planned_sets=workout_exercise.sets,
-                    reps_completed="[]",
-                    weight_used="[]"
-                )
+        with transaction.atomic():
+            workout = Workout.objects.create(**validated_data)
+            
+            # Create workout sessions from template exercises
+            if workout.template:
+                WorkoutSession.objects.bulk_create([
+                    WorkoutSession(
+                        workout=workout,
+                        exercise_id=exercise_id,
+                        order=order,
+                        planned_sets=sets
+                    )
+                    for exercise_id, order, sets in workout.template.exercises.values_list('exercise_id', 'order', 'sets')
+                ])
         
         return workout
 
@@ -168,10 +225,13 @@ class WorkoutPlanSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'duration_weeks', 'workouts_per_week',
             'start_date', 'end_date', 'is_active', 'completion_percentage',
+            'total_workouts', 'completed_workouts',
             'ai_generated', 'generation_context', 'plan_workouts',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['completion_percentage', 'created_at', 'updated_at']
+        read_only_fields = [
+            'completion_percentage', 'total_workouts', 'completed_workouts', 'created_at', 'updated_at'
+        ]
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -217,6 +277,7 @@ class AIWorkoutRequestSerializer(serializers.Serializer):
         required=False
     )
     custom_requirements = serializers.CharField(required=False)
+    use_cache = serializers.BooleanField(default=True)
 
 
 class TodayWorkoutSerializer(serializers.Serializer):
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analytics import invalidate_workout_analytics
+from .catalog import bump_catalog_version
+from .models import Exercise, Workout, WorkoutSession
+from .search import remove_exercise_search, sync_exercise_search
+from .stats import invalidate_user_workout_stats, record_workouts_created
+
+
+@receiver(post_save, sender=Workout)
+def count_new_workout(sender, instance, created, **kwargs):
+    if created:
+        record_workouts_created(instance.user_id)
+
+
+@receiver(post_delete, sender=Workout)
+def drop_stats_for_deleted_workout(sender, instance, **kwargs):
+    invalidate_user_workout_stats(instance.user_id)
+
+
+@receiver(post_save, sender=Exercise)
+def index_exercise(sender, instance, **kwargs):
+    sync_exercise_search(instance)
+
+
+@receiver(post_delete, sender=Exercise)
+def unindex_exercise(sender, instance, **kwargs):
+    remove_exercise_search(instance.id)
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def refresh_exercise_catalog(sender, **kwargs):
+    # After commit, so no process reloads the catalog before the change is visible
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Workout)
+@receiver(post_delete, sender=Workout)
+def drop_analytics_for_workout(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_workout_analytics(instance.user_id))
+
+
+@receiver(post_save, sender=WorkoutSession)
+@receiver(post_delete, sender=WorkoutSession)
+def drop_analytics_for_session(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Workout):
+        # Cascading from a workout delete, which drops the analytics itself
+        return
+    user_id = instance.workout.user_id
+    transaction.on_commit(lambda: invalidate_workout_analytics(user_id))
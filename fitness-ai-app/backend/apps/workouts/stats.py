@@ -0,0 +1,99 @@
+"""
+Per-user workout rollup behind ``workout_stats_view``.
+
+``UserWorkoutStats`` holds lifetime totals so the stats endpoint never scans
+a user's history. Completing a workout updates the row in the same
+transaction; creating one bumps its workout count. Anything else that can
+change history (edits, deletes) drops the row, and the next read rebuilds
+it from the workouts table. ``rebuild_workout_stats`` rebuilds every row.
+"""
+from datetime import timedelta
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+from typing import Dict
+
+from .models import Workout, UserWorkoutStats
+
+COMPLETED = Q(status='completed')
+TIMED = Q(started_at__isnull=False, completed_at__isnull=False)
+DURATION = ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField())
+
+
+def rebuild_user_workout_stats(user_id: int) -> UserWorkoutStats:
+    """Recompute a user's rollup from their workouts"""
+    totals = Workout.objects.filter(user_id=user_id).aggregate(
+        total_workouts=Count('id'),
+        completed_workouts=Count('id', filter=COMPLETED),
+        total_calories_burned=Sum('calories_burned', filter=COMPLETED),
+        total_duration=Sum(DURATION, filter=COMPLETED & TIMED),
+        timed_workouts=Count('id', filter=COMPLETED & TIMED)
+    )
+    type_counts = Workout.objects.filter(
+        COMPLETED, user_id=user_id, template__isnull=False
+    ).order_by().values_list('template__workout_type').annotate(count=Count('id'))
+
+    stats, _ = UserWorkoutStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'total_workouts': totals['total_workouts'],
+            'completed_workouts': totals['completed_workouts'],
+            'total_calories_burned': totals['total_calories_burned'] or 0,
+            'total_duration_minutes': (totals['total_duration'] or timedelta()).total_seconds() / 60,
+            'timed_workouts': totals['timed_workouts'],
+            'workout_type_counts': dict(type_counts)
+        }
+    )
+    return stats
+
+
+def get_user_workout_stats(user) -> UserWorkoutStats:
+    stats = UserWorkoutStats.objects.filter(user=user).first()
+    if stats is None:
+        stats = rebuild_user_workout_stats(user.id)
+    return stats
+
+
+def record_workout_completed(workout: Workout) -> None:
+    """Add a just-completed (and saved) workout to the rollup; call inside its transaction"""
+    stats = UserWorkoutStats.objects.select_for_update().filter(user_id=workout.user_id).first()
+    if stats is None:
+        # The rebuild already counts this workout
+        rebuild_user_workout_stats(workout.user_id)
+        return
+
+    stats.completed_workouts += 1
+    stats.total_calories_burned += workout.calories_burned or 0
+    if workout.duration_minutes is not None:
+        stats.total_duration_minutes += workout.duration_minutes
+        stats.timed_workouts += 1
+    if workout.template_id:
+        workout_type = workout.template.workout_type
+        stats.workout_type_counts[workout_type] = stats.workout_type_counts.get(workout_type, 0) + 1
+    stats.save()
+
+
+def record_workouts_created(user_id: int, count: int = 1) -> None:
+    UserWorkoutStats.objects.filter(user_id=user_id).update(
+        total_workouts=F('total_workouts') + count,
+        updated_at=timezone.now()
+    )
+
+
+def invalidate_user_workout_stats(user_id: int) -> None:
+    """Drop a user's rollup so the next read rebuilds it"""
+    UserWorkoutStats.objects.filter(user_id=user_id).delete()
+
+
+def recent_completion_counts(user, now=None) -> Dict[str, int]:
+    """Workouts completed this week (from Monday) and this month, in one query"""
+    now = timezone.localtime(now or timezone.now())
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=now.weekday())
+    month_start = today_start.replace(day=1)
+
+    return Workout.objects.filter(
+        COMPLETED, user=user, completed_at__gte=min(week_start, month_start)
+    ).aggregate(
+        workouts_this_week=Count('id', filter=Q(completed_at__gte=week_start)),
+        workouts_this_month=Count('id', filter=Q(completed_at__gte=month_start))
+    )
@@ -0,0 +1,115 @@
+"""
+Workout streaks: consecutive calendar days (in the site time zone) with at
+least one completed workout.
+
+``User.workout_streak`` is the run ending on ``last_workout_date`` and
+``User.longest_workout_streak`` the longest run ever; ``get_current_streak``
+hides a run that has lapsed. Completions update both counters in one UPDATE
+statement; ``recompute_streaks`` rebuilds them from the workouts table.
+"""
+from datetime import timedelta
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, Max, Value, When
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+from typing import Dict, Iterator, List
+
+from .models import Workout
+
+User = get_user_model()
+
+
+def record_completion(user, completed_at) -> None:
+    """Extend, keep or restart the user's streak for a workout completed at completed_at.
+
+    The new values are computed by the database from the row's current
+    state, so concurrent completions cannot lose an update.
+    """
+    day = timezone.localdate(completed_at)
+    streak = Case(
+        When(last_workout_date__date=day, then=F('workout_streak')),
+        When(last_workout_date__date=day - timedelta(days=1), then=F('workout_streak') + 1),
+        default=Value(1)
+    )
+    User.objects.filter(id=user.id).update(
+        workout_streak=streak,
+        longest_workout_streak=Greatest(F('longest_workout_streak'), streak),
+        last_workout_date=completed_at
+    )
+    user.refresh_from_db(fields=['workout_streak', 'longest_workout_streak', 'last_workout_date'])
+
+
+def streak_runs(user_ids: np.ndarray, days: np.ndarray) -> Dict[str, np.ndarray]:
+    """Current and longest streak per user from distinct (user, day ordinal) pairs.
+
+    Input must be sorted by user then day. Returns arrays aligned with the
+    distinct users in order of appearance.
+    """
+    # A run starts at each new user or whenever a day does not follow the previous one
+    starts = np.ones(len(days), dtype=bool)
+    starts[1:] = (user_ids[1:] != user_ids[:-1]) | (days[1:] - days[:-1] != 1)
+    run_ids = np.cumsum(starts) - 1
+    run_lengths = np.bincount(run_ids)
+    run_users = user_ids[starts]
+
+    user_starts = np.flatnonzero(np.r_[True, run_users[1:] != run_users[:-1]])
+    user_ends = np.r_[user_starts[1:], len(run_users)] - 1
+    return {
+        'user_ids': run_users[user_starts],
+        'current': run_lengths[user_ends],
+        'longest': np.maximum.reduceat(run_lengths, user_starts)
+    }
+
+
+def _user_id_chunks(chunk_size: int) -> Iterator[List[int]]:
+    chunk = []
+    for user_id in User.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=chunk_size):
+        chunk.append(user_id)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def recompute_streaks(chunk_size: int = 2000) -> Dict[str, int]:
+    """Rebuild every user's streak fields from completed workouts, chunk_size users at a time"""
+    totals = {'users': 0, 'workout_days': 0}
+    for chunk in _user_id_chunks(chunk_size):
+        rows = list(
+            Workout.objects.filter(
+                user_id__in=chunk, status='completed', completed_at__isnull=False
+            ).annotate(
+                day=TruncDate('completed_at')
+            ).order_by(
+                'user_id', 'day'
+            ).values_list('user_id', 'day').annotate(last_completed=Max('completed_at'))
+        )
+
+        streaks = {}
+        if rows:
+            user_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            days = np.fromiter((row[1].toordinal() for row in rows), dtype=np.int64, count=len(rows))
+            runs = streak_runs(user_ids, days)
+            # Rows are sorted by day, so each user's final row holds their latest completion
+            last_rows = np.r_[np.flatnonzero(user_ids[1:] != user_ids[:-1]), len(rows) - 1]
+            for user_id, current, longest, last_row in zip(
+                runs['user_ids'].tolist(), runs['current'].tolist(), runs['longest'].tolist(), last_rows.tolist()
+            ):
+                streaks[user_id] = (current, longest, rows[last_row][2])
+
+        users = list(User.objects.filter(id__in=chunk).only('id'))
+        for user in users:
+            user.workout_streak, user.longest_workout_streak, user.last_workout_date = streaks.get(
+                user.id, (0, 0, None)
+            )
+        with transaction.atomic():
+            User.objects.bulk_update(
+                users, ['workout_streak', 'longest_workout_streak', 'last_workout_date'], batch_size=500
+            )
+
+        totals['users'] += len(users)
+        totals['workout_days'] += len(rows)
+    return totals
@@ -0,0 +1,103 @@
+"""
+Batched offline sync of a workout's sessions and sets.
+
+The app queues its edits while offline and sends them in one request. Each
+edit is an operation with a client-generated id. Operations are applied in
+order, with one bulk query per table, inside a single transaction. Their ids
+are then stored as ``SyncOperation`` rows, so a batch resent after a dropped
+response changes nothing the second time.
+
+The response carries the sessions changed since the client's cursor and a
+new cursor for the next sync. ``updated_at`` is stamped before a transaction
+commits, so the new cursor trails the clock by WORKOUT_SYNC_CURSOR_OVERLAP:
+sessions changed just before it may be sent twice, but never skipped.
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from typing import Dict, List, Optional
+
+from .analytics import invalidate_workout_analytics
+from .models import SyncOperation, Workout, WorkoutSession, WorkoutSet
+
+SESSION_SYNC_FIELDS = ['completed_sets', 'duration_seconds', 'difficulty_rating', 'notes']
+
+
+class SyncError(Exception):
+    """The batch refers to something outside the workout"""
+
+
+@transaction.atomic
+def apply_sync_operations(workout: Workout, operations: List[Dict]) -> Dict:
+    """Apply validated operations not seen before; returns the applied and duplicate operation ids"""
+    # Locked so that a batch and its retry cannot both get past the duplicate check
+    Workout.objects.select_for_update().filter(id=workout.id).exists()
+    now = timezone.now()
+
+    seen = set(SyncOperation.objects.filter(
+        user_id=workout.user_id, operation_id__in=[operation['operation_id'] for operation in operations]
+    ).values_list('operation_id', flat=True))
+    pending, duplicates = [], []
+    for operation in operations:
+        if operation['operation_id'] in seen:
+            duplicates.append(operation['operation_id'])
+        else:
+            pending.append(operation)
+            seen.add(operation['operation_id'])
+    if not pending:
+        return {'applied': [], 'duplicates': duplicates}
+
+    session_ids = {operation['session'] for operation in pending}
+    sessions = WorkoutSession.objects.filter(workout=workout).in_bulk(session_ids)
+    unknown = sorted(session_ids - set(sessions))
+    if unknown:
+        raise SyncError(f"Sessions not in this workout: {', '.join(map(str, unknown))}")
+
+    sets = {
+        (workout_set.session_id, workout_set.set_number): workout_set
+        for workout_set in WorkoutSet.objects.filter(session_id__in=sessions)
+    }
+    new_sets = {}
+    changed_sets = {}
+    for operation in pending:
+        session = sessions[operation['session']]
+        for field in SESSION_SYNC_FIELDS:
+            if field in operation:
+                setattr(session, field, operation[field])
+        session.updated_at = now
+        for values in operation.get('sets', ()):
+            key = (session.id, values['set_number'])
+            workout_set = sets.get(key) or new_sets.get(key)
+            if workout_set is None:
+                workout_set = new_sets[key] = WorkoutSet(session=session, set_number=values['set_number'])
+            elif key in sets:
+                changed_sets[key] = workout_set
+            for field in ('reps', 'weight_kg'):
+                if field in values:
+                    setattr(workout_set, field, values[field])
+
+    # bulk_update skips auto_now and post_save, hence updated_at above and the invalidation below
+    WorkoutSession.objects.bulk_update(sessions.values(), SESSION_SYNC_FIELDS + ['updated_at'])
+    WorkoutSet.objects.bulk_update(changed_sets.values(), ['reps', 'weight_kg'])
+    WorkoutSet.objects.bulk_create(new_sets.values())
+    SyncOperation.objects.bulk_create([
+        SyncOperation(user_id=workout.user_id, workout=workout, operation_id=operation['operation_id'])
+        for operation in pending
+    ])
+    transaction.on_commit(lambda: invalidate_workout_analytics(workout.user_id))
+
+    return {'applied': [operation['operation_id'] for operation in pending], 'duplicates': duplicates}
+
+
+def next_sync_cursor() -> datetime:
+    """Cursor for the client's next sync; take it before reading the changes"""
+    return timezone.now() - timedelta(seconds=settings.WORKOUT_SYNC_CURSOR_OVERLAP)
+
+
+def changed_sessions(workout: Workout, since: Optional[datetime]):
+    """The workout's sessions changed after since (all of them without it), ready to serialize"""
+    sessions = WorkoutSession.objects.filter(workout=workout)
+    if since is not None:
+        sessions = sessions.filter(updated_at__gt=since)
+    return sessions.select_related('exercise').prefetch_related('sets')
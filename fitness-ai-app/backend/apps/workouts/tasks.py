@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from .pregeneration import submit_pregeneration_batch, collect_pregeneration_batches
+
+
+@shared_task(ignore_result=True)
+def pregenerate_workouts_task():
+    """Submit tomorrow's AI workouts as one overnight batch job"""
+    tomorrow = timezone.now().date() + timedelta(days=1)
+    submit_pregeneration_batch(tomorrow)
+    collect_pregeneration_batches()
+
+
+@shared_task(ignore_result=True)
+def collect_workout_batches_task():
+    """Materialize workouts from batch jobs that have finished"""
+    collect_pregeneration_batches()
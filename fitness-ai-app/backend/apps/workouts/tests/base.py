@@ -0,0 +1,70 @@
+"""
+Shared fixture for the workouts API tests.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.ai_content.models import AIContentRequest
+from ..models import (
+    Exercise, WorkoutTemplate, WorkoutExercise, Workout,
+    WorkoutSession, WorkoutPlan, WorkoutPlanWorkout
+)
+
+User = get_user_model()
+
+
+class WorkoutAPITestCase(APITestCase):
+    """Authenticated as a user with 3 templates, 20 completed workouts (one a day) and 3 plans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password='x')
+        exercises = [
+            Exercise.objects.create(
+                name=f'Exercise {i}', description='d', instructions='i', muscle_groups='core'
+            )
+            for i in range(4)
+        ]
+        cls.templates = []
+        for i in range(3):
+            template = WorkoutTemplate.objects.create(
+                name=f'Template {i}', description='d', workout_type='strength', difficulty_level='beginner',
+                estimated_duration=30, intensity_level=5, equipment_needed='dumbbells', created_by=cls.user
+            )
+            for order, exercise in enumerate(exercises, start=1):
+                WorkoutExercise.objects.create(workout_template=template, exercise=exercise, order=order, sets=3)
+            cls.templates.append(template)
+
+        now = timezone.now()
+        for i in range(20):
+            ai_request = AIContentRequest.objects.create(
+                user=cls.user, content_type='workout', status='completed',
+                user_context={}, prompt_context={}, generated_content='Workout'
+            )
+            workout = Workout.objects.create(
+                user=cls.user, template=cls.templates[i % 3], name=f'Workout {i}', status='completed',
+                scheduled_date=now - timedelta(days=i), started_at=now - timedelta(days=i, minutes=40),
+                completed_at=now - timedelta(days=i), ai_request=ai_request
+            )
+            for order, exercise in enumerate(exercises, start=1):
+                session = WorkoutSession.objects.create(
+                    workout=workout, exercise=exercise, order=order, planned_sets=3
+                )
+                session.replace_sets([10, 10, 8], [20, 20, 20])
+        cls.workout = workout
+
+        for i in range(3):
+            plan = WorkoutPlan.objects.create(
+                user=cls.user, name=f'Plan {i}', description='d', duration_weeks=4, workouts_per_week=3,
+                start_date=now.date(), end_date=now.date() + timedelta(weeks=4)
+            )
+            for week in range(1, 3):
+                for day, template in enumerate(cls.templates, start=1):
+                    WorkoutPlanWorkout.objects.create(plan=plan, template=template, week_number=week, day_of_week=day)
+        cls.plan = plan
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.test import override_settings
+
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+
+ANALYTICS_CACHE = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'workout_analytics'}
+
+
+@override_settings(CACHES={**settings.CACHES, 'workout_analytics': ANALYTICS_CACHE})
+class WorkoutAnalyticsTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Volume and e1RM analytics over the user's completed sets"""
+
+    def test_analytics(self):
+        response = self.client.get('/api/workouts/analytics/')
+        self.assertEqual(response.status_code, 200)
+        # 20 workouts, one a day, of 4 sessions doing 10, 10 and 8 reps at 20 kg
+        self.assertEqual(response.data['total_sets'], 20 * 4 * 3)
+        core = response.data['muscle_groups']['core']
+        self.assertEqual(core['last_7_days'], 7 * 4 * 560)
+        self.assertEqual(core['last_28_days'], 20 * 4 * 560)
+        self.assertEqual(sum(core['weekly']), 20 * 4 * 560)
+        self.assertEqual(len(response.data['exercises']), 4)
+        exercise = response.data['exercises'][0]
+        self.assertEqual(exercise['best_e1rm_epley'], 26.7)
+        self.assertEqual(exercise['best_e1rm_brzycki'], 26.7)
+        self.assertEqual(exercise['e1rm_trend_per_week'], 0)
+
+        # Served from the cache until a session changes
+        self.assertBudget(0, '/api/workouts/analytics/')
+        session = self.workout.sessions.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/workouts/sessions/{session.id}/', {'weight_list': [30, 30, 30]}, format='json')
+        response = self.client.get('/api/workouts/analytics/')
+        self.assertEqual(response.data['total_volume'], 20 * 4 * 560 + 28 * 10)
@@ -0,0 +1,40 @@
+from django.utils import timezone
+
+from .base import WorkoutAPITestCase
+from ..models import Exercise, WorkoutTemplate, Workout
+
+
+class BulkCreateTests(WorkoutAPITestCase):
+    """Templates and workouts create their exercise rows in one query"""
+
+    def test_create_workout_from_template(self):
+        template = self.templates[0]
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/workouts/', {
+                'template_id': template.id, 'name': 'From template', 'scheduled_date': timezone.now().isoformat()
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        workout = Workout.objects.get(name='From template')
+        self.assertEqual(workout.template_id, template.id)
+        self.assertEqual(workout.sessions.count(), template.exercises.count())
+
+    def test_create_template_with_exercises(self):
+        exercise_ids = list(Exercise.objects.values_list('id', flat=True))
+        exercises = [{'exercise_id': exercise_ids[i % 4], 'order': i + 1, 'sets': 3} for i in range(20)]
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/workouts/templates/', {
+                'name': 'Bulk', 'description': 'd', 'workout_type': 'strength', 'difficulty_level': 'beginner',
+                'estimated_duration': 45, 'intensity_level': 6, 'equipment_needed': 'dumbbells',
+                'exercises': exercises
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WorkoutTemplate.objects.get(name='Bulk').exercises.count(), 20)
+
+    def test_create_template_rejects_unknown_exercise(self):
+        response = self.client.post('/api/workouts/templates/', {
+            'name': 'Broken', 'description': 'd', 'workout_type': 'strength', 'difficulty_level': 'beginner',
+            'estimated_duration': 45, 'intensity_level': 6, 'equipment_needed': 'dumbbells',
+            'exercises': [{'exercise_id': 999999, 'order': 1}]
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WorkoutTemplate.objects.filter(name='Broken').exists())
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+from ..models import Workout
+
+
+class WorkoutCalendarTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Per-day workout summaries as parallel columns"""
+
+    def test_calendar(self):
+        today = timezone.localdate()
+        first_day = today - timedelta(days=9)
+        planned = Workout.objects.create(
+            user=self.user, name='Planned', scheduled_date=timezone.now() + timedelta(days=1)
+        )
+        response = self.assertBudget(
+            1, f'/api/workouts/calendar/?from={first_day.isoformat()}&to={(today + timedelta(days=1)).isoformat()}'
+        )
+        data = response.data
+        completed = data['statuses'].index('completed')
+        scheduled = data['statuses'].index('scheduled')
+        # One completed workout on each of the last 10 days, then the planned one tomorrow
+        self.assertEqual(data['day'], list(range(10)) + [10])
+        self.assertEqual(data['status'], [completed] * 10 + [scheduled])
+        self.assertEqual(data['count'], [1] * 11)
+        self.assertEqual(len(data['ids']), 11)
+        self.assertEqual(data['ids'][-1], planned.id)
+
+    def test_calendar_rejects_bad_ranges(self):
+        today = timezone.localdate()
+        for query in ('', f'from={today}', f'from={today}&to=tomorrow', f'from={today}&to={today - timedelta(days=1)}',
+                      f'from={today}&to={today + timedelta(days=62)}'):
+            self.assertEqual(self.client.get(f'/api/workouts/calendar/?{query}').status_code, 400)
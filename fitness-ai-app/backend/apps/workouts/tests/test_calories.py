@@ -0,0 +1,41 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from .base import WorkoutAPITestCase
+from ..models import Exercise, Workout, WorkoutSession
+from ..stats import get_user_workout_stats
+
+
+class CalorieEstimateTests(WorkoutAPITestCase):
+    """Calories estimated on completion and backfilled for past workouts"""
+
+    def test_complete_workout_estimates_calories(self):
+        self.user.weight = 84
+        self.user.save(update_fields=['weight'])
+        rowing = Exercise.objects.create(
+            name='Rowing', description='d', instructions='i', muscle_groups='cardio', calories_per_minute=8
+        )
+        plank = Exercise.objects.create(name='Plank', description='d', instructions='i', muscle_groups='core')
+        workout = Workout.objects.create(
+            user=self.user, name='Calories', status='in_progress', scheduled_date=timezone.now(),
+            started_at=timezone.now() - timedelta(minutes=40)
+        )
+        WorkoutSession.objects.create(workout=workout, exercise=rowing, order=1, planned_sets=1, duration_seconds=600)
+        WorkoutSession.objects.create(workout=workout, exercise=plank, order=2, planned_sets=3)
+
+        response = self.client.post(f'/api/workouts/{workout.id}/complete/')
+        self.assertEqual(response.status_code, 200)
+        # (10 timed minutes at 8 kcal/min + 30 remaining at the default 5) scaled by 84/70 kg
+        self.assertEqual(response.data['calories_burned'], round((10 * 8 + 30 * 5) * 1.2))
+        workout.refresh_from_db()
+        self.assertEqual(workout.calories_burned, response.data['calories_burned'])
+        self.assertEqual(self.user.workout_stats.total_calories_burned, workout.calories_burned)
+
+    def test_backfill_calories(self):
+        call_command('backfill_calories', stdout=StringIO())
+        # Untimed sessions of default-rate exercises over each 40 minute workout
+        self.assertEqual(set(Workout.objects.values_list('calories_burned', flat=True)), {40 * 5})
+        self.assertEqual(get_user_workout_stats(self.user).total_calories_burned, 20 * 40 * 5)
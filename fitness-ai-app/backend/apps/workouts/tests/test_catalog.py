@@ -0,0 +1,40 @@
+from django.core.cache import caches
+
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+from ..models import Exercise
+
+
+class ExerciseCatalogTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """The exercise list served from the in-memory catalog, with ETags"""
+
+    def test_exercise_list(self):
+        self.client.get('/api/workouts/exercises/')
+        # Only the catalog version is looked up once the catalog is in memory
+        response = self.assertBudget(1, '/api/workouts/exercises/?difficulty=beginner')
+        self.assertEqual(response.data['count'], 4)
+        response = self.assertBudget(1, '/api/workouts/exercises/?difficulty=advanced')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_exercise_list_not_modified(self):
+        response = self.client.get('/api/workouts/exercises/')
+        etag = response['ETag']
+        response = self.client.get('/api/workouts/exercises/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get('/api/workouts/exercises/?muscle_group=core', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Any exercise change moves the catalog version and with it every ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            Exercise.objects.create(name='New', description='d', instructions='i', muscle_groups='core')
+        response = self.client.get('/api/workouts/exercises/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['count'], 5)
+
+    def test_etag_survives_cache_eviction(self):
+        etag = self.client.get('/api/workouts/exercises/')['ETag']
+        caches['default'].clear()
+        response = self.client.get('/api/workouts/exercises/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+from ..equipment import ALL_EQUIPMENT
+from ..models import Exercise, WorkoutTemplate
+
+
+class EquipmentFilterTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Templates filtered down to what the user's equipment allows"""
+
+    def test_template_list_my_equipment(self):
+        WorkoutTemplate.objects.create(
+            name='Barbell', description='d', workout_type='strength', difficulty_level='beginner',
+            estimated_duration=30, intensity_level=5, equipment_needed='Barbell, dumbbells', created_by=self.user
+        )
+        WorkoutTemplate.objects.create(
+            name='Bodyweight', description='d', workout_type='hiit', difficulty_level='beginner',
+            estimated_duration=20, intensity_level=5, equipment_needed='none', created_by=self.user
+        )
+        self.user.available_equipment = 'Dumbbells, Yoga mat'
+        self.user.save(update_fields=['available_equipment'])
+
+        response = self.assertBudget(4, '/api/workouts/templates/?my_equipment=true')
+        names = sorted(template['name'] for template in response.data['results'])
+        self.assertEqual(names, ['Bodyweight', 'Template 0', 'Template 1', 'Template 2'])
+
+    def test_unknown_equipment_is_not_offered_to_everyone(self):
+        WorkoutTemplate.objects.create(
+            name='Sled', description='d', workout_type='strength', difficulty_level='beginner',
+            estimated_duration=30, intensity_level=5, equipment_needed='Sled', created_by=self.user
+        )
+        self.user.available_equipment = 'Dumbbells'
+        self.user.save(update_fields=['available_equipment'])
+        response = self.client.get('/api/workouts/templates/?my_equipment=true')
+        self.assertNotIn('Sled', [template['name'] for template in response.data['results']])
+
+        self.user.available_equipment = 'Dumbbells, Sled'
+        self.user.save(update_fields=['available_equipment'])
+        response = self.client.get('/api/workouts/templates/?my_equipment=true')
+        self.assertIn('Sled', [template['name'] for template in response.data['results']])
+
+    def test_full_equipment_filter_is_a_single_bitwise_test(self):
+        WorkoutTemplate.objects.create(
+            name='Sled', description='d', workout_type='strength', difficulty_level='beginner',
+            estimated_duration=30, intensity_level=5, equipment_needed='Sled, barbell', created_by=self.user
+        )
+        self.user.available_equipment = ', '.join([label for _, label in Exercise.EQUIPMENT_CHOICES] + ['Sled'])
+        self.user.save(update_fields=['available_equipment'])
+        self.assertEqual(self.user.equipment_mask, ALL_EQUIPMENT)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/workouts/templates/?my_equipment=true')
+        self.assertIn('Sled', [template['name'] for template in response.data['results']])
+        # No bound parameter per submask, however much equipment the user lists
+        self.assertFalse(any('equipment_mask" IN' in query['sql'] for query in queries))
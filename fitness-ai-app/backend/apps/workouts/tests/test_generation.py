@@ -0,0 +1,27 @@
+from apps.ai_content.models import AIContentRequest
+from core.testing import StubAIMixin
+from .base import WorkoutAPITestCase
+from ..models import Workout
+
+
+class AIWorkoutGenerationTests(StubAIMixin, WorkoutAPITestCase):
+    """AI workouts queued for the Celery worker rather than generated inside the request"""
+
+    def test_generation_is_queued_and_creates_the_workout(self):
+        response = self.client.post('/api/workouts/generate/', {'workout_type': 'strength'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        result = self.client.get(response['Location']).json()
+        self.assertEqual(result['status'], 'completed')
+        self.assertTrue(result['content'].startswith('Stub response from primary'))
+        workout = Workout.objects.get(id=result['structured_data']['workout_id'])
+        self.assertEqual(workout.user, self.user)
+        self.assertEqual(workout.name, 'AI Generated Strength Workout')
+        self.assertEqual(workout.ai_request_id, result['request_id'])
+
+    def test_invalid_preferences_are_rejected_before_queueing(self):
+        requests = AIContentRequest.objects.count()
+        response = self.client.post('/api/workouts/generate/', {'duration_minutes': 5}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AIContentRequest.objects.count(), requests)
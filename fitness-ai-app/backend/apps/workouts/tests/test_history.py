@@ -0,0 +1,19 @@
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+
+
+class WorkoutHistoryTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Cursor pages of completed workouts with a summary of the whole period"""
+
+    def test_workout_history(self):
+        response = self.assertBudget(6, '/api/workouts/history/?days=30&page_size=8')
+        self.assertEqual(len(response.data['workouts']), 8)
+        self.assertEqual(response.data['summary']['total_workouts'], 20)
+        self.assertAlmostEqual(response.data['summary']['total_time_minutes'], 20 * 40)
+
+        seen = [workout['id'] for workout in response.data['workouts']]
+        while response.data['next']:
+            response = self.assertBudget(6, response.data['next'])
+            seen += [workout['id'] for workout in response.data['workouts']]
+        self.assertEqual(len(seen), 20)
+        self.assertEqual(len(set(seen)), 20)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .base import WorkoutAPITestCase
+from ..models import Workout
+from ..stats import get_user_workout_stats
+
+User = get_user_model()
+
+
+class PlanActivationTests(WorkoutAPITestCase):
+    """Plans expanded into scheduled workouts, with progress kept up as they are completed"""
+
+    def test_activate_plan(self):
+        get_user_workout_stats(self.user)
+        start = timezone.localdate() + timedelta(days=1)
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                f'/api/workouts/plans/{self.plan.id}/activate/', {'start_date': start.isoformat()}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        # 4 weeks of 3 workouts, weeks 3-4 repeating the two defined weeks, 4 exercises each
+        self.assertEqual(response.data['workouts_created'], 12)
+        self.assertEqual(response.data['sessions_created'], 48)
+        workouts = Workout.objects.filter(plan=self.plan).order_by('scheduled_date')
+        self.assertEqual(workouts.count(), 12)
+        self.assertEqual(
+            {timezone.localtime(workout.scheduled_date).isoweekday() for workout in workouts}, {1, 2, 3}
+        )
+        self.assertGreaterEqual(timezone.localtime(workouts[0].scheduled_date).date(), start)
+        self.assertEqual(get_user_workout_stats(self.user).total_workouts, 20 + 12)
+
+        response = self.client.post(f'/api/workouts/plans/{self.plan.id}/activate/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Workout.objects.filter(plan=self.plan).count(), 12)
+
+    def test_activation_reports_the_scheduled_date_range(self):
+        # Starting on a Wednesday, each week's Wednesday slot comes before its Monday and Tuesday ones
+        today = timezone.localdate()
+        start = today + timedelta(days=(3 - today.isoweekday()) % 7 or 7)
+        response = self.client.post(
+            f'/api/workouts/plans/{self.plan.id}/activate/', {'start_date': start.isoformat()}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        days = [
+            timezone.localtime(scheduled).date()
+            for scheduled in Workout.objects.filter(plan=self.plan).values_list('scheduled_date', flat=True)
+        ]
+        self.assertEqual(response.data['first_workout_date'], min(days))
+        self.assertEqual(response.data['last_workout_date'], max(days))
+        self.assertEqual(min(days), start)
+        self.assertEqual(max(days), start + timedelta(days=27))
+
+    def test_activate_plan_of_another_user(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='x')
+        self.client.force_authenticate(other)
+        response = self.client.post(f'/api/workouts/plans/{self.plan.id}/activate/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_completing_plan_workouts_updates_progress(self):
+        self.client.post(f'/api/workouts/plans/{self.plan.id}/activate/')
+        workouts = list(Workout.objects.filter(plan=self.plan)[:3])
+        for workout in workouts:
+            self.client.post(f'/api/workouts/{workout.id}/start/')
+            response = self.client.post(f'/api/workouts/{workout.id}/complete/')
+            self.assertEqual(response.status_code, 200)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.completed_workouts, 3)
+        self.assertEqual(str(self.plan.completion_percentage), '25.00')
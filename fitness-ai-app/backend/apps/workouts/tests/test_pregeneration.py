@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.ai_content.models import AIContentRequest, AIUsageStats
+from core.ai_integrations.batch import LocalBatchBackend
+from core.testing import StubAIMixin
+from .. import pregeneration
+from ..models import Workout
+from ..pregeneration import collect_pregeneration_batches, submit_pregeneration_batch
+
+User = get_user_model()
+
+
+class RereadableBatchBackend(LocalBatchBackend):
+    """Keeps results readable after collection, like the Message Batches API"""
+
+    def results(self, batch_id, result_key):
+        return {
+            custom_id: self.claude_client.message_response(result_key, message)
+            for custom_id, message in self._batches[batch_id].items()
+        }
+
+
+class PregenerationTests(StubAIMixin, TestCase):
+    """Overnight pre-generation through the in-process batch backend"""
+
+    def setUp(self):
+        super().setUp()
+        self.day = date.today() + timedelta(days=1)
+        self.users = [
+            User.objects.create_user(
+                email=f'early{n}@example.com', username=f'early{n}', password='x',
+                preferred_workout_days=str(self.day.isoweekday())
+            )
+            for n in range(2)
+        ]
+        User.objects.create_user(email='rest@example.com', username='rest', password='x')
+        self.backend = LocalBatchBackend()
+
+    def test_submit_then_collect_schedules_workouts(self):
+        submitted = submit_pregeneration_batch(self.day, backend=self.backend)
+        # Identical profiles share one prompt
+        self.assertEqual(submitted['requests'], 2)
+        self.assertEqual(submitted['batched'], 2)
+        self.assertEqual(submitted['unique_prompts'], 1)
+        self.assertFalse(Workout.objects.exists())
+
+        collected = collect_pregeneration_batches(backend=self.backend)
+        self.assertEqual(collected, {'batches': 1, 'completed': 2, 'failed': 0})
+
+        workouts = Workout.objects.filter(scheduled_date__date=self.day)
+        self.assertEqual(sorted(w.user_id for w in workouts), sorted(u.id for u in self.users))
+        first, second = AIContentRequest.objects.order_by('id')
+        self.assertEqual((first.status, second.status), ('completed', 'completed'))
+        self.assertEqual(second.coalesced_with_id, first.id)
+
+        # Users with a workout on the day are not picked again
+        self.assertEqual(submit_pregeneration_batch(self.day, backend=self.backend)['requests'], 0)
+
+    def test_cached_generations_complete_without_a_batch(self):
+        submit_pregeneration_batch(self.day, backend=self.backend)
+        collect_pregeneration_batches(backend=self.backend)
+
+        next_week = self.day + timedelta(days=7)
+        submitted = submit_pregeneration_batch(next_week, backend=self.backend)
+        self.assertEqual(submitted['from_cache'], 2)
+        self.assertEqual(submitted['batched'], 0)
+        self.assertEqual(submitted['batch_id'], '')
+        self.assertEqual(Workout.objects.filter(scheduled_date__date=next_week).count(), 2)
+
+    def test_overlapping_collects_record_each_request_once(self):
+        backend = RereadableBatchBackend()
+        submit_pregeneration_batch(self.day, backend=backend)
+        complete = pregeneration._complete
+        overlapping = {}
+
+        def complete_during_another_collect(ai_request, ai_response):
+            # A second collect starts after this one listed the pending requests
+            if 'started' not in overlapping:
+                overlapping['started'] = True
+                overlapping['collected'] = collect_pregeneration_batches(backend=backend)
+            return complete(ai_request, ai_response)
+
+        with mock.patch.object(pregeneration, '_complete', side_effect=complete_during_another_collect):
+            collected = collect_pregeneration_batches(backend=backend)
+
+        self.assertEqual(overlapping['collected']['completed'], 2)
+        self.assertEqual(collected['completed'], 0)
+        for ai_request in AIContentRequest.objects.all():
+            self.assertEqual(Workout.objects.filter(ai_request=ai_request).count(), 1)
+        self.assertEqual(
+            sorted(AIUsageStats.objects.values_list('total_requests', flat=True)), [1, 1]
+        )
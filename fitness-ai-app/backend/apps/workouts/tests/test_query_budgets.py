@@ -0,0 +1,30 @@
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+
+
+class WorkoutQueryBudgetTests(QueryBudgetMixin, WorkoutAPITestCase):
+    def test_workout_list(self):
+        response = self.assertBudget(6, '/api/workouts/')
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_workout_detail(self):
+        self.assertBudget(5, f'/api/workouts/{self.workout.id}/')
+
+    def test_today_workout(self):
+        response = self.assertBudget(5, '/api/workouts/today/')
+        self.assertTrue(response.data['has_workout'])
+
+    def test_template_list(self):
+        self.assertBudget(4, '/api/workouts/templates/')
+
+    def test_template_detail(self):
+        self.assertBudget(3, f'/api/workouts/templates/{self.templates[0].id}/')
+
+    def test_session_list(self):
+        self.assertBudget(3, f'/api/workouts/{self.workout.id}/sessions/')
+
+    def test_plan_list(self):
+        self.assertBudget(5, '/api/workouts/plans/')
+
+    def test_plan_detail(self):
+        self.assertBudget(4, f'/api/workouts/plans/{self.plan.id}/')
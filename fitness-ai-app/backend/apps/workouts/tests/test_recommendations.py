@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+from .. import recommendations
+from ..models import WorkoutTemplate
+from ..stats import get_user_workout_stats
+
+User = get_user_model()
+
+
+class TodaySuggestionTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Template suggestions for days without a scheduled workout"""
+
+    def test_today_suggestions(self):
+        # No workout today, and neither the template index nor the user's suggestions built yet
+        user = User.objects.create_user(
+            email='fresh@example.com', username='fresh', password='x',
+            fitness_level='intermediate', available_equipment='Dumbbells, mat'
+        )
+        WorkoutTemplate.objects.create(
+            name='Barbell', description='d', workout_type='strength', difficulty_level='intermediate',
+            estimated_duration=30, intensity_level=5, equipment_needed='barbell', created_by=self.user
+        )
+        get_user_workout_stats(user)
+        recommendations._index = None
+        caches[settings.WORKOUT_SUGGESTION_CACHE_ALIAS].clear()
+        self.client.force_authenticate(user)
+
+        response = self.assertBudget(4, '/api/workouts/today/')
+        self.assertFalse(response.data['has_workout'])
+        suggestions = response.data['suggestions']
+        self.assertEqual(sorted(s['id'] for s in suggestions), sorted(t.id for t in self.templates))
+
+        # Suggestions are cached for the day; only today's workout is looked up
+        self.assertBudget(1, '/api/workouts/today/')
+
+    def test_no_listed_equipment_means_bodyweight_only(self):
+        WorkoutTemplate.objects.create(
+            name='Barbell', description='d', workout_type='strength', difficulty_level='beginner',
+            estimated_duration=30, intensity_level=5, equipment_needed='barbell', created_by=self.user
+        )
+        recommendations._index = None
+        caches[settings.WORKOUT_SUGGESTION_CACHE_ALIAS].clear()
+        user = User.objects.create_user(email='bare@example.com', username='bare', password='x')
+        self.assertEqual(user.equipment_mask, 0)
+        self.client.force_authenticate(user)
+
+        suggestions = self.client.get('/api/workouts/today/').data['suggestions']
+        self.assertNotIn('Barbell', [suggestion['name'] for suggestion in suggestions])
+
+    def test_stale_index_is_served_while_another_request_rebuilds_it(self):
+        recommendations._index = None
+        index = recommendations.get_template_index()
+        recommendations._index_built_at = time.monotonic() - settings.WORKOUT_SUGGESTION_INDEX_TTL - 1
+        recommendations._index_rebuilding = True
+        self.addCleanup(setattr, recommendations, '_index_rebuilding', False)
+        with self.assertNumQueries(0):
+            self.assertIs(recommendations.get_template_index(), index)
+
+        recommendations._index_rebuilding = False
+        self.assertIsNot(recommendations.get_template_index(), index)
+        self.assertIs(recommendations.get_template_index(), recommendations._index)
+
+    def test_template_with_an_unknown_type_is_still_ranked(self):
+        WorkoutTemplate.objects.create(
+            name='Legacy', description='d', workout_type='crossfit', difficulty_level='beginner',
+            estimated_duration=30, intensity_level=5, created_by=self.user
+        )
+        recommendations._index = None
+        caches[settings.WORKOUT_SUGGESTION_CACHE_ALIAS].clear()
+
+        response = self.client.get('/api/workouts/today/')
+        self.assertEqual(response.status_code, 200)
+        index = recommendations.get_template_index()
+        row = index.ids.tolist().index(WorkoutTemplate.objects.get(name='Legacy').id)
+        self.assertFalse(index.features[row, recommendations.TYPE_OFFSET:recommendations.DIFFICULTY_OFFSET].any())
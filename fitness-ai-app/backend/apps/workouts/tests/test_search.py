@@ -0,0 +1,33 @@
+from core.testing import QueryBudgetMixin
+from .base import WorkoutAPITestCase
+from ..models import Exercise
+
+
+class ExerciseSearchTests(QueryBudgetMixin, WorkoutAPITestCase):
+    """Ranked, typo-tolerant search over the exercise catalog"""
+
+    def test_exercise_search(self):
+        for name, description in [
+            ('Barbell Back Squat', 'Squat with the bar across the upper back'),
+            ('Romanian Deadlift', 'Hinge at the hips with a barbell'),
+            ('Push-up', 'Lower your chest to the floor and press back up'),
+        ]:
+            Exercise.objects.create(name=name, description=description, instructions='i', muscle_groups='legs')
+
+        def names(query):
+            response = self.client.get('/api/workouts/exercises/search/', {'q': query})
+            self.assertEqual(response.status_code, 200)
+            return [exercise['name'] for exercise in response.data['results']]
+
+        self.assertEqual(names('squat'), ['Barbell Back Squat'])
+        self.assertEqual(names('barbell')[0], 'Barbell Back Squat')
+        self.assertEqual(names('push'), ['Push-up'])
+        self.assertEqual(names('romanain deadlfit'), ['Romanian Deadlift'])
+        self.assertEqual(names('zzzz'), [])
+        self.assertEqual(self.client.get('/api/workouts/exercises/search/').status_code, 400)
+
+        Exercise.objects.filter(name='Push-up').get().delete()
+        self.assertEqual(names('push'), [])
+
+        # Catalog and vocabulary are in memory: version lookups plus the full-text query
+        self.assertBudget(3, '/api/workouts/exercises/search/?q=squat')
@@ -0,0 +1,32 @@
+from django.db.models import F, Sum
+
+from .base import WorkoutAPITestCase
+from ..models import WorkoutSet
+
+
+class WorkoutSetTests(WorkoutAPITestCase):
+    """Session reps and weights stored as WorkoutSet rows"""
+
+    def test_session_sets(self):
+        session = self.workout.sessions.first()
+        response = self.client.get(f'/api/workouts/sessions/{session.id}/')
+        self.assertEqual(response.data['reps_list'], [10, 10, 8])
+        self.assertEqual(response.data['weight_list'], [20.0, 20.0, 20.0])
+
+        response = self.client.patch(f'/api/workouts/sessions/{session.id}/', {
+            'reps_list': [12, 10, 8, 6], 'completed_sets': 4
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reps_list'], [12, 10, 8, 6])
+        self.assertEqual(response.data['weight_list'], [20.0, 20.0, 20.0, None])
+
+        response = self.client.patch(f'/api/workouts/sessions/{session.id}/', {
+            'weight_list': [22.5, 22.5, 25, 25]
+        }, format='json')
+        self.assertEqual(response.data['weight_list'], [22.5, 22.5, 25.0, 25.0])
+        volume = WorkoutSet.objects.filter(session=session).aggregate(volume=Sum(F('reps') * F('weight_kg')))
+        self.assertEqual(volume['volume'], 12 * 22.5 + 10 * 22.5 + 8 * 25 + 6 * 25)
+
+        response = self.client.patch(f'/api/workouts/sessions/{session.id}/', {'reps_list': [-1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reps_list', response.data)
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .base import WorkoutAPITestCase
+from ..models import Workout, WorkoutPlan, WorkoutTemplate, UserWorkoutStats
+from ..stats import (
+    get_user_workout_stats, invalidate_user_workout_stats, rebuild_user_workout_stats,
+    record_workout_completed, record_workouts_created
+)
+
+ROLLUP_FIELDS = (
+    'total_workouts', 'completed_workouts', 'total_calories_burned',
+    'total_duration_minutes', 'timed_workouts', 'workout_type_counts'
+)
+
+
+class WorkoutStatsTests(WorkoutAPITestCase):
+    """The per-user rollup, kept up to date as workouts are completed"""
+
+    def test_completing_twice_counts_once(self):
+        stats = get_user_workout_stats(self.user)
+        completed, calories = stats.completed_workouts, stats.total_calories_burned
+        self.client.post(f'/api/workouts/plans/{self.plan.id}/activate/')
+        workout = Workout.objects.filter(plan=self.plan).first()
+        workout.status = 'in_progress'
+        workout.started_at = timezone.now()
+        workout.save()
+
+        first = self.client.post(f'/api/workouts/{workout.id}/complete/')
+        second = self.client.post(f'/api/workouts/{workout.id}/complete/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 400)
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.completed_workouts, completed + 1)
+        self.assertEqual(stats.total_calories_burned, calories + first.data['calories_burned'])
+        self.assertEqual(WorkoutPlan.objects.get(id=self.plan.id).completed_workouts, 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.workout_streak, first.data['current_streak'])
+
+    def test_rollup_is_built_from_history(self):
+        stats = get_user_workout_stats(self.user)
+        self.assertEqual((stats.total_workouts, stats.completed_workouts, stats.timed_workouts), (20, 20, 20))
+        self.assertAlmostEqual(stats.total_duration_minutes, 20 * 40)
+        self.assertEqual(stats.workout_type_counts, {'strength': 20})
+
+    def test_incremental_updates_match_a_rebuild(self):
+        get_user_workout_stats(self.user)
+        template = WorkoutTemplate.objects.create(
+            name='Run', description='d', workout_type='cardio', difficulty_level='beginner',
+            estimated_duration=20, intensity_level=6, created_by=self.user
+        )
+        now = timezone.now()
+        workout = Workout.objects.create(
+            user=self.user, template=template, name='Run', scheduled_date=now
+        )
+        workout.status = 'completed'
+        workout.started_at = now - timedelta(minutes=25)
+        workout.completed_at = now
+        workout.calories_burned = 250
+        workout.save()
+        with transaction.atomic():
+            record_workout_completed(workout)
+
+        stats = UserWorkoutStats.objects.get(user=self.user)
+        self.assertEqual(stats.workout_type_counts, {'strength': 20, 'cardio': 1})
+        incremental = [getattr(stats, field) for field in ROLLUP_FIELDS]
+        rebuilt = rebuild_user_workout_stats(self.user.id)
+        self.assertEqual(incremental, [getattr(rebuilt, field) for field in ROLLUP_FIELDS])
+
+    def test_invalidated_rollup_is_rebuilt_on_read(self):
+        get_user_workout_stats(self.user)
+        Workout.objects.filter(user=self.user).first().delete()
+        invalidate_user_workout_stats(self.user.id)
+        # Without a row there is nothing to bump; the rebuild counts it instead
+        record_workouts_created(self.user.id)
+        self.assertFalse(UserWorkoutStats.objects.filter(user=self.user).exists())
+        self.assertEqual(get_user_workout_stats(self.user).total_workouts, 19)
+
+    def test_plan_activation_counts_bulk_created_workouts(self):
+        stats = get_user_workout_stats(self.user)
+        self.client.post(f'/api/workouts/plans/{self.plan.id}/activate/')
+        created = Workout.objects.filter(plan=self.plan).count()
+        self.assertGreater(created, 0)
+        stats.refresh_from_db()
+        self.assertEqual(stats.total_workouts, 20 + created)
@@ -0,0 +1,89 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Workout
+from ..streaks import record_completion, recompute_streaks
+
+User = get_user_model()
+
+
+def noon(days_ago):
+    day = timezone.localdate() - timedelta(days=days_ago)
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+class RecordCompletionTests(TestCase):
+    """Streak counters updated as workouts are completed"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='streak@example.com', username='streak', password='x')
+
+    def test_consecutive_days_extend_the_streak(self):
+        for days_ago in (2, 1, 0):
+            record_completion(self.user, noon(days_ago))
+        self.assertEqual((self.user.workout_streak, self.user.longest_workout_streak), (3, 3))
+
+    def test_second_workout_on_the_same_day_keeps_the_streak(self):
+        record_completion(self.user, noon(1))
+        record_completion(self.user, noon(0))
+        record_completion(self.user, noon(0) + timedelta(hours=2))
+        self.assertEqual(self.user.workout_streak, 2)
+
+    def test_gap_restarts_the_streak_and_keeps_the_longest(self):
+        for days_ago in (6, 5, 4, 1):
+            record_completion(self.user, noon(days_ago))
+        self.assertEqual((self.user.workout_streak, self.user.longest_workout_streak), (1, 3))
+        self.assertEqual(self.user.get_current_streak(), 1)
+
+    def test_lapsed_streak_reads_as_zero(self):
+        record_completion(self.user, noon(3))
+        record_completion(self.user, noon(2))
+        self.assertEqual(self.user.workout_streak, 2)
+        self.assertEqual(self.user.get_current_streak(), 0)
+
+
+class RecomputeStreaksTests(TestCase):
+    """Rebuilding the counters from the workouts table"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='streak@example.com', username='streak', password='x')
+        self.idle = User.objects.create_user(
+            email='idle@example.com', username='idle', password='x', workout_streak=4, longest_workout_streak=4
+        )
+        for days_ago in (7, 6, 5, 1, 0, 0):
+            self.complete(self.user, noon(days_ago))
+        Workout.objects.create(user=self.user, name='Skipped', scheduled_date=noon(2), status='skipped')
+
+    def complete(self, user, completed_at):
+        Workout.objects.create(
+            user=user, name='Done', status='completed', scheduled_date=completed_at, completed_at=completed_at
+        )
+
+    def test_recompute_streaks(self):
+        totals = recompute_streaks(chunk_size=1)
+        self.assertEqual(totals, {'users': 2, 'workout_days': 5})
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.workout_streak, self.user.longest_workout_streak), (2, 3))
+        self.assertEqual(self.user.last_workout_date, noon(0))
+        self.idle.refresh_from_db()
+        self.assertEqual((self.idle.workout_streak, self.idle.longest_workout_streak), (0, 0))
+        self.assertIsNone(self.idle.last_workout_date)
+
+    def test_command_matches_incremental_updates(self):
+        tracked = User.objects.create_user(email='tracked@example.com', username='tracked', password='x')
+        for days_ago in (4, 3, 1, 0):
+            self.complete(tracked, noon(days_ago))
+            record_completion(tracked, noon(days_ago))
+        expected = (tracked.workout_streak, tracked.longest_workout_streak, tracked.last_workout_date)
+
+        out = StringIO()
+        call_command('recompute_streaks', '--chunk-size', '2', stdout=out)
+        self.assertIn('Recomputed streaks for 3 users (9 workout days)', out.getvalue())
+        tracked.refresh_from_db()
+        self.assertEqual((tracked.workout_streak, tracked.longest_workout_streak, tracked.last_workout_date), expected)
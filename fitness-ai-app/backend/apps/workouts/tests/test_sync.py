@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from .base import WorkoutAPITestCase
+from ..models import Workout, WorkoutSession, WorkoutSet, SyncOperation
+
+
+class WorkoutSyncTests(WorkoutAPITestCase):
+    """Batched, idempotent offline sync of a workout's sessions and sets"""
+
+    def test_sync_session_batch(self):
+        sessions = list(self.workout.sessions.all())
+        operations = [
+            {'operation_id': f'op-{i}', 'session': session.id, 'completed_sets': 3,
+             'sets': [{'set_number': 3, 'reps': 12}, {'set_number': 4, 'reps': 6, 'weight_kg': '22.50'}]}
+            for i, session in enumerate(sessions)
+        ]
+        url = f'/api/workouts/{self.workout.id}/sync/'
+        with self.assertNumQueries(13), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applied'], [f'op-{i}' for i in range(4)])
+        self.assertEqual(len(response.data['sessions']), 4)
+        self.assertEqual(response.data['sessions'][0]['reps_list'], [10, 10, 12, 6])
+        self.assertEqual(response.data['sessions'][0]['weight_list'], [20, 20, 20, 22.5])
+
+        # A resent batch changes nothing; sessions within the cursor overlap come back unchanged
+        synced = response.data['sessions']
+        cursor = response.data['cursor']
+        response = self.client.post(url, {'operations': operations, 'cursor': cursor}, format='json')
+        self.assertEqual(response.data['applied'], [])
+        self.assertEqual(response.data['duplicates'], [f'op-{i}' for i in range(4)])
+        self.assertEqual(response.data['sessions'], synced)
+        self.assertEqual(WorkoutSet.objects.filter(session__in=sessions).count(), 16)
+
+        self.client.patch(f'/api/workouts/sessions/{sessions[1].id}/', {'notes': 'Elbow'}, format='json')
+        response = self.client.post(url, {'operations': [], 'cursor': cursor}, format='json')
+        notes = {session['id']: session['notes'] for session in response.data['sessions']}
+        self.assertEqual(notes[sessions[1].id], 'Elbow')
+
+    def test_sync_outside_the_overlap_returns_nothing_new(self):
+        with override_settings(WORKOUT_SYNC_CURSOR_OVERLAP=0):
+            response = self.client.post(f'/api/workouts/{self.workout.id}/sync/', {'operations': []}, format='json')
+            response = self.client.post(
+                f'/api/workouts/{self.workout.id}/sync/',
+                {'operations': [], 'cursor': response.data['cursor']}, format='json'
+            )
+        self.assertEqual(response.data['sessions'], [])
+
+    def test_edit_committed_after_the_cursor_is_not_skipped(self):
+        url = f'/api/workouts/{self.workout.id}/sync/'
+        response = self.client.post(url, {'operations': []}, format='json')
+        # Another transaction stamped a session just before the cursor was taken and committed after it
+        session = self.workout.sessions.first()
+        WorkoutSession.objects.filter(id=session.id).update(
+            notes='Late', updated_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.post(url, {'operations': [], 'cursor': response.data['cursor']}, format='json')
+        self.assertEqual([s['notes'] for s in response.data['sessions'] if s['id'] == session.id], ['Late'])
+
+    def test_sync_rejects_other_workouts_sessions(self):
+        other_session = Workout.objects.exclude(id=self.workout.id).first().sessions.first()
+        response = self.client.post(
+            f'/api/workouts/{self.workout.id}/sync/',
+            {'operations': [{'operation_id': 'op', 'session': other_session.id, 'notes': 'x'}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SyncOperation.objects.exists())
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     # Exercises
     path('exercises/', views.ExerciseListView.as_view(), name='exercise-list'),
+    path('exercises/search/', views.exercise_search_view, name='exercise-search'),
     
     # Workout Templates
     path('templates/', views.WorkoutTemplateListCreateView.as_view(), name='workout-template-list'),
@@ -18,14 +19,18 @@ urlpatterns = [
     # Workout Sessions
     path('<int:workout_id>/sessions/', views.WorkoutSessionListView.as_view(), name='workout-session-list'),
     path('sessions/<int:pk>/', views.WorkoutSessionDetailView.as_view(), name='workout-session-detail'),
+    path('<int:workout_id>/sync/', views.sync_workout_view, name='workout-sync'),
     
     # Workout Plans
     path('plans/', views.WorkoutPlanListCreateView.as_view(), name='workout-plan-list'),
     path('plans/<int:pk>/', views.WorkoutPlanDetailView.as_view(), name='workout-plan-detail'),
+    path('plans/<int:plan_id>/activate/', views.activate_plan_view, name='workout-plan-activate'),
     
     # Analytics and AI
     path('today/', views.today_workout_view, name='today-workout'),
     path('stats/', views.workout_stats_view, name='workout-stats'),
     path('history/', views.workout_history_view, name='workout-history'),
+    path('calendar/', views.workout_calendar_view, name='workout-calendar'),
+    path('analytics/', views.workout_analytics_view, name='workout-analytics'),
     path('generate/', views.generate_ai_workout_view, name='generate-ai-workout'),
 ]
\ No newline at end of file
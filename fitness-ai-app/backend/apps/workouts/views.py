@@ -1,41 +1,128 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from django.db.models import Count, Avg, Q
+from django.utils.http import parse_etags
+from django.db import transaction
+from django.db.models import Count, Avg, F, Prefetch, Q, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from .models import (
-    Exercise, WorkoutTemplate, Workout, WorkoutSession, 
+    WorkoutTemplate, Workout, WorkoutSession, 
     WorkoutPlan, WorkoutPlanWorkout
 )
 from .serializers import (
     ExerciseSerializer, WorkoutTemplateSerializer, WorkoutTemplateCreateSerializer,
     WorkoutSerializer, WorkoutCreateSerializer, WorkoutSessionSerializer,
     WorkoutPlanSerializer, WorkoutStatsSerializer, AIWorkoutRequestSerializer,
-    TodayWorkoutSerializer
+    TodayWorkoutSerializer, WorkoutSyncSerializer
 )
-from core.ai_integrations.claude_client import ClaudeClient
+from .analytics import get_workout_analytics
+from .calories import calories_for_workout
+from .catalog import catalog_etag, filter_catalog, get_catalog_exercises, get_exercise_catalog
+from .equipment import BODYWEIGHT, lacking_equipment
+from .plans import PlanActivationError, activate_plan, record_plan_workout_completed
+from .recommendations import suggest_templates
+from .search import search_exercises
+from .streaks import record_completion
+from .sync import SyncError, apply_sync_operations, changed_sessions, next_sync_cursor
+from .stats import (
+    COMPLETED, DURATION, TIMED,
+    get_user_workout_stats, invalidate_user_workout_stats, recent_completion_counts, record_workout_completed
+)
+from apps.ai_content.models import AIContentRequest
+from apps.ai_content.services import build_workout_profile
+from apps.ai_content.views import enqueue_generation
+from core.async_api import async_api_view
+
+
+def with_template_details(queryset, prefix=''):
+    """Eager-load what WorkoutTemplateSerializer renders for the template at prefix"""
+    return queryset.select_related(f'{prefix}created_by').prefetch_related(f'{prefix}exercises__exercise')
+
+
+def with_workout_details(queryset):
+    """Eager-load what WorkoutSerializer renders, in a fixed number of queries"""
+    return queryset.select_related(
+        'template__created_by', 'ai_request'
+    ).prefetch_related(
+        'template__exercises__exercise',
+        Prefetch('sessions', queryset=WorkoutSession.objects.select_related('exercise')),
+        'sessions__sets'
+    )
+
+
+class WorkoutHistoryPagination(CursorPagination):
+    """Keyset pages of completed workouts, newest first; `cursor` continues from the last page"""
+    ordering = '-completed_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+# Longest window the history summary covers
+MAX_HISTORY_DAYS = 365
+
+# Most results one exercise search returns
+MAX_SEARCH_RESULTS = 50
+
+# Longest range one calendar request covers (a month view with its leading and trailing weeks fits)
+MAX_CALENDAR_DAYS = 62
+
+# Status codes of the calendar payload: indexes into this list
+CALENDAR_STATUSES = [key for key, _ in Workout.STATUS_CHOICES]
+
+
+def with_plan_details(queryset):
+    """Eager-load what WorkoutPlanSerializer renders, in a fixed number of queries"""
+    return queryset.prefetch_related(
+        Prefetch('plan_workouts', queryset=WorkoutPlanWorkout.objects.select_related('template__created_by')),
+        'plan_workouts__template__exercises__exercise'
+    )
 
 
 class ExerciseListView(generics.ListAPIView):
-    queryset = Exercise.objects.filter(is_active=True)
+    """Active exercises, served from the in-memory catalog with a strong ETag"""
     serializer_class = ExerciseSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        muscle_group = self.request.query_params.get('muscle_group')
-        equipment = self.request.query_params.get('equipment')
-        difficulty = self.request.query_params.get('difficulty')
+    def list(self, request, *args, **kwargs):
+        version, exercises = get_exercise_catalog()
+        page_number = request.query_params.get(self.paginator.page_query_param)
+        etag = catalog_etag(version, request.query_params, page_number)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
         
-        if muscle_group:
-            queryset = queryset.filter(muscle_groups=muscle_group)
-        if equipment:
-            queryset = queryset.filter(equipment_required=equipment)
-        if difficulty:
-            queryset = queryset.filter(difficulty_level=difficulty)
-            
-        return queryset
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        exercises = filter_catalog(exercises, request.query_params)
+        page = self.paginate_queryset(exercises)
+        response = self.get_paginated_response(page)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def exercise_search_view(request):
+    """Ranked, typo-tolerant search over exercise names and descriptions"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        raise ValidationError({'q': 'A search query is required'})
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        raise ValidationError({'limit': 'Must be a whole number'})
+    
+    exercise_ids = search_exercises(query, limit)
+    return Response({
+        'query': query,
+        'results': get_catalog_exercises(exercise_ids)
+    })
 
 
 class WorkoutTemplateListCreateView(generics.ListCreateAPIView):
@@ -43,13 +130,14 @@ class WorkoutTemplateListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = WorkoutTemplate.objects.filter(
+        queryset = with_template_details(WorkoutTemplate.objects.filter(
             Q(is_public=True) | Q(created_by=self.request.user)
-        )
+        ))
         
         workout_type = self.request.query_params.get('type')
         difficulty = self.request.query_params.get('difficulty')
         duration = self.request.query_params.get('max_duration')
+        my_equipment = self.request.query_params.get('my_equipment') == 'true'
         
         if workout_type:
             queryset = queryset.filter(workout_type=workout_type)
@@ -57,6 +145,12 @@ class WorkoutTemplateListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(difficulty_level=difficulty)
         if duration:
             queryset = queryset.filter(estimated_duration__lte=int(duration))
+        if my_equipment:
+            # Templates needing nothing beyond the user's equipment (bodyweight is always available)
+            user_mask = self.request.user.equipment_mask | BODYWEIGHT
+            queryset = queryset.alias(
+                missing_equipment=F('equipment_mask').bitand(lacking_equipment(user_mask))
+            ).filter(missing_equipment=0)
             
         return queryset
 
@@ -71,9 +165,9 @@ class WorkoutTemplateDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return WorkoutTemplate.objects.filter(
+        return with_template_details(WorkoutTemplate.objects.filter(
             Q(is_public=True) | Q(created_by=self.request.user)
-        )
+        ))
 
 
 class WorkoutListCreateView(generics.ListCreateAPIView):
@@ -81,7 +175,7 @@ class WorkoutListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Workout.objects.filter(user=self.request.user)
+        queryset = with_workout_details(Workout.objects.filter(user=self.request.user))
         
         status_filter = self.request.query_params.get('status')
         date_from = self.request.query_params.get('date_from')
@@ -107,7 +201,13 @@ class WorkoutDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Workout.objects.filter(user=self.request.user)
+        return with_workout_details(Workout.objects.filter(user=self.request.user))
+
+    def perform_update(self, serializer):
+        # Edits can change status, calories or timing; rebuild the stats on next read
+        with transaction.atomic():
+            serializer.save()
+            invalidate_user_workout_stats(self.request.user.id)
 
 
 class WorkoutSessionListView(generics.ListAPIView):
@@ -119,7 +219,7 @@ class WorkoutSessionListView(generics.ListAPIView):
         return WorkoutSession.objects.filter(
             workout_id=workout_id,
             workout__user=self.request.user
-        )
+        ).select_related('exercise').prefetch_related('sets')
 
 
 class WorkoutSessionDetailView(generics.RetrieveUpdateAPIView):
@@ -127,7 +227,36 @@ class WorkoutSessionDetailView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return WorkoutSession.objects.filter(workout__user=self.request.user)
+        return WorkoutSession.objects.filter(
+            workout__user=self.request.user
+        ).select_related('exercise', 'workout').prefetch_related('sets')
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_workout_view(request, workout_id):
+    """Apply a batch of offline session edits and return the sessions changed since `cursor`"""
+    try:
+        workout = Workout.objects.get(id=workout_id, user=request.user)
+    except Workout.DoesNotExist:
+        return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = WorkoutSyncSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    try:
+        result = apply_sync_operations(workout, serializer.validated_data['operations'])
+    except SyncError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Taken before reading the changes, with an overlap for transactions still committing
+    cursor = next_sync_cursor()
+    sessions = changed_sessions(workout, serializer.validated_data.get('cursor'))
+    return Response({
+        **result,
+        'sessions': WorkoutSessionSerializer(sessions, many=True).data,
+        'cursor': cursor
+    })
 
 
 class WorkoutPlanListCreateView(generics.ListCreateAPIView):
@@ -135,7 +264,7 @@ class WorkoutPlanListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return WorkoutPlan.objects.filter(user=self.request.user)
+        return with_plan_details(WorkoutPlan.objects.filter(user=self.request.user))
 
 
 class WorkoutPlanDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -143,7 +272,35 @@ class WorkoutPlanDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return WorkoutPlan.objects.filter(user=self.request.user)
+        return with_plan_details(WorkoutPlan.objects.filter(user=self.request.user))
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def activate_plan_view(request, plan_id):
+    """Schedule every workout of a plan, starting on `start_date` (default: the plan's own)"""
+    try:
+        plan = WorkoutPlan.objects.get(id=plan_id, user=request.user)
+    except WorkoutPlan.DoesNotExist:
+        return Response({'error': 'Workout plan not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    start_date = None
+    if request.data.get('start_date'):
+        try:
+            start_date = date.fromisoformat(request.data['start_date'])
+        except (TypeError, ValueError):
+            raise ValidationError({'start_date': 'Must be a date (YYYY-MM-DD)'})
+    
+    try:
+        result = activate_plan(plan, start_date)
+    except PlanActivationError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'message': 'Workout plan activated',
+        'plan_id': plan.id,
+        **result
+    }, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
@@ -154,10 +311,10 @@ def today_workout_view(request):
     today = timezone.now().date()
     
     # Check for scheduled workout today
-    today_workout = Workout.objects.filter(
+    today_workout = with_workout_details(Workout.objects.filter(
         user=user,
         scheduled_date__date=today
-    ).first()
+    )).first()
     
     if today_workout:
         workout_serializer = WorkoutSerializer(today_workout)
@@ -167,53 +324,13 @@ def today_workout_view(request):
             'motivational_message': f"Ready for your {today_workout.name}? Let's crush it!"
         }
     else:
-        # Provide suggestions based on user's history and preferences
-        suggestions = []
-        
-        # Get user's favorite workout types
-        favorite_types = Workout.objects.filter(
-            user=user,
-            status='completed'
-        ).values('template__workout_type').annotate(
-            count=Count('id')
-        ).order_by('-count')[:3]
-        
-        for fav_type in favorite_types:
-            if fav_type['template__workout_type']:
-                templates = WorkoutTemplate.objects.filter(
-                    workout_type=fav_type['template__workout_type'],
-                    is_public=True
-                )[:2]
-                
-                for template in templates:
-                    suggestions.append({
-                        'id': template.id,
-                        'name': template.name,
-                        'type': template.workout_type,
-                        'duration': template.estimated_duration,
-                        'difficulty': template.difficulty_level
-                    })
-        
-        # If no favorites, suggest popular beginner workouts
-        if not suggestions:
-            popular_templates = WorkoutTemplate.objects.filter(
-                is_public=True,
-                difficulty_level='beginner'
-            )[:5]
-            
-            for template in popular_templates:
-                suggestions.append({
-                    'id': template.id,
-                    'name': template.name,
-                    'type': template.workout_type,
-                    'duration': template.estimated_duration,
-                    'difficulty': template.difficulty_level
-                })
+        # Scored against the precomputed template index; cached per user per day
+        suggestions = suggest_templates(user)
         
         data = {
             'has_workout': False,
             'workout': None,
-            'suggestions': suggestions[:5],
+            'suggestions': suggestions,
             'motivational_message': "No workout scheduled for today. How about starting with one of these?"
         }
     
@@ -247,42 +364,37 @@ def start_workout_view(request, workout_id):
 @permission_classes([permissions.IsAuthenticated])
 def complete_workout_view(request, workout_id):
     """Complete a workout session"""
-    try:
-        workout = Workout.objects.get(id=workout_id, user=request.user)
-    except Workout.DoesNotExist:
-        return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
-    
-    if workout.status != 'in_progress':
-        return Response({'error': 'Workout is not in progress'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    workout.status = 'completed'
-    workout.completed_at = timezone.now()
-    
-    # Update user's workout streak and last workout date
     user = request.user
-    user.last_workout_date = workout.completed_at
-    
-    # Calculate streak
-    yesterday = timezone.now().date() - timedelta(days=1)
-    last_completed = Workout.objects.filter(
-        user=user,
-        status='completed',
-        completed_at__date=yesterday
-    ).exists()
-    
-    if last_completed:
-        user.workout_streak += 1
-    else:
-        user.workout_streak = 1
-    
-    user.save()
-    workout.save()
+    with transaction.atomic():
+        # Locked, so a retried or concurrent completion sees this one's status and counts nothing twice
+        try:
+            workout = Workout.objects.select_for_update(of=('self',)).select_related('template').get(
+                id=workout_id, user=user
+            )
+        except Workout.DoesNotExist:
+            return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if workout.status != 'in_progress':
+            return Response({'error': 'Workout is not in progress'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        workout.status = 'completed'
+        workout.completed_at = timezone.now()
+        if workout.calories_burned is None:
+            workout.calories_burned = calories_for_workout(workout, user.weight)
+        
+        workout.save()
+        record_workout_completed(workout)
+        record_completion(user, workout.completed_at)
+        if workout.plan_id:
+            record_plan_workout_completed(workout.plan_id)
     
     return Response({
         'message': 'Workout completed successfully',
         'completed_at': workout.completed_at,
         'duration_minutes': workout.duration_minutes,
-        'current_streak': user.workout_streak
+        'calories_burned': workout.calories_burned,
+        'current_streak': user.workout_streak,
+        'longest_streak': user.longest_workout_streak
     })
 
 
@@ -291,120 +403,107 @@ def complete_workout_view(request, workout_id):
 def workout_stats_view(request):
     """Get user's workout statistics"""
     user = request.user
-    now = timezone.now()
-    week_start = now - timedelta(days=now.weekday())
-    month_start = now.replace(day=1)
     
-    # Calculate various stats
-    total_workouts = Workout.objects.filter(user=user, status='completed').count()
-    workouts_this_week = Workout.objects.filter(
-        user=user,
-        status='completed',
-        completed_at__gte=week_start
-    ).count()
-    workouts_this_month = Workout.objects.filter(
-        user=user,
-        status='completed',
-        completed_at__gte=month_start
-    ).count()
-    
-    # Calories and duration stats
-    completed_workouts = Workout.objects.filter(user=user, status='completed')
-    total_calories = sum([w.calories_burned or 0 for w in completed_workouts])
-    
-    durations = [w.duration_minutes for w in completed_workouts if w.duration_minutes]
-    avg_duration = sum(durations) / len(durations) if durations else 0
-    
-    # Favorite workout type
-    favorite_type = Workout.objects.filter(
-        user=user,
-        status='completed',
-        template__isnull=False
-    ).values('template__workout_type').annotate(
-        count=Count('id')
-    ).order_by('-count').first()
-    
-    favorite_workout_type = favorite_type['template__workout_type'] if favorite_type else 'Mixed'
-    
-    # Completion rate
-    total_scheduled = Workout.objects.filter(user=user).count()
-    completion_rate = (total_workouts / total_scheduled * 100) if total_scheduled > 0 else 0
+    # Lifetime totals come from the rollup; only the recent window touches workouts
+    rollup = get_user_workout_stats(user)
+    recent = recent_completion_counts(user)
     
     stats = {
-        'total_workouts': total_workouts,
-        'workouts_this_week': workouts_this_week,
-        'workouts_this_month': workouts_this_month,
-        'total_calories_burned': total_calories,
-        'avg_workout_duration': round(avg_duration, 1),
-        'favorite_workout_type': favorite_workout_type,
-        'current_streak': user.workout_streak,
-        'longest_streak': user.workout_streak,  # TODO: Track separately
-        'completion_rate': round(completion_rate, 1)
+        'total_workouts': rollup.completed_workouts,
+        'workouts_this_week': recent['workouts_this_week'],
+        'workouts_this_month': recent['workouts_this_month'],
+        'total_calories_burned': rollup.total_calories_burned,
+        'avg_workout_duration': round(rollup.avg_workout_duration, 1),
+        'favorite_workout_type': rollup.favorite_workout_type,
+        'current_streak': user.get_current_streak(),
+        'longest_streak': user.longest_workout_streak,
+        'completion_rate': round(rollup.completion_rate, 1)
     }
     
     serializer = WorkoutStatsSerializer(stats)
     return Response(serializer.data)
 
 
-@api_view(['POST'])
+@api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
-def generate_ai_workout_view(request):
-    """Generate a personalized workout using AI"""
+def workout_analytics_view(request):
+    """Training volume per muscle group and e1RM progress per exercise"""
+    return Response(get_workout_analytics(request.user))
+
+
+@async_api_view(['POST'])
+async def generate_ai_workout_view(request):
+    """Queue a personalized AI workout, created once the Celery worker has generated it.
+    
+    Answers 202 with the request status URL, like /api/ai/generate/workout/;
+    the finished status carries the new workout's id in structured_data.
+    """
     serializer = AIWorkoutRequestSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     
-    user = request.user
-    preferences = serializer.validated_data
-    
-    # Build user profile for AI
-    user_profile = {
-        'age': user.get_age(),
-        'gender': user.get_gender_display() if user.gender else 'Not specified',
-        'fitness_level': user.get_fitness_level_display(),
-        'goals': user.get_fitness_goals(),
-        'workout_duration': preferences.get('duration_minutes', user.preferred_workout_duration),
-        'equipment': preferences.get('equipment_available', user.get_available_equipment()),
-        'activity_level': user.get_activity_level_display()
-    }
-    
-    # Use Claude to generate workout
-    claude_client = ClaudeClient()
-    workout_type = preferences.get('workout_type', 'general')
+    preferences = {**serializer.validated_data, 'create_workout': True}
+    ai_request = await AIContentRequest.objects.acreate(
+        user=request.user,
+        content_type='workout',
+        status='pending',
+        user_context=build_workout_profile(request.user, preferences),
+        prompt_context=preferences
+    )
+    return await enqueue_generation(ai_request)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def workout_calendar_view(request):
+    """Workouts per day and status between `from` and `to`, as parallel columns.
+    
+    Each position across `day`, `status` and `count` is one group: the day as
+    an offset from `from`, the status as an index into `statuses`, and how many
+    workouts it holds. `ids` lists the workouts of every group in the same order.
+    """
+    bounds = {}
+    for param in ('from', 'to'):
+        try:
+            bounds[param] = date.fromisoformat(request.query_params.get(param, ''))
+        except ValueError:
+            raise ValidationError({param: 'A date (YYYY-MM-DD) is required'})
+    first_day, last_day = bounds['from'], bounds['to']
+    if not 0 <= (last_day - first_day).days < MAX_CALENDAR_DAYS:
+        raise ValidationError({'to': f'Must be on or after `from`, at most {MAX_CALENDAR_DAYS} days on'})
+    
+    range_start = timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+    range_end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+    rows = Workout.objects.filter(
+        user=request.user,
+        scheduled_date__gte=range_start,
+        scheduled_date__lt=range_end
+    ).annotate(
+        day=TruncDate('scheduled_date')
+    ).order_by(
+        'day', 'status', 'id'
+    ).values_list('day', 'status', 'id')
+    
+    status_codes = {key: code for code, key in enumerate(CALENDAR_STATUSES)}
+    days, statuses, counts, ids = [], [], [], []
+    for day, workout_status, workout_id in rows:
+        offset = (day - first_day).days
+        code = status_codes[workout_status]
+        if not days or days[-1] != offset or statuses[-1] != code:
+            days.append(offset)
+            statuses.append(code)
+            counts.append(0)
+        counts[-1] += 1
+        ids.append(workout_id)
     
-    try:
-        ai_response = claude_client.generate_workout(user_profile, workout_type)
-        
-        if ai_response['success']:
-            # Create a custom workout from AI response
-            workout_name = f"AI Generated {workout_type.title()} Workout"
-            
-            workout = Workout.objects.create(
-                user=user,
-                name=workout_name,
-                scheduled_date=timezone.now(),
-                ai_prompt_context=str(preferences)
-            )
-            
-            return Response({
-                'success': True,
-                'workout_id': workout.id,
-                'workout_content': ai_response['workout'],
-                'tokens_used': ai_response.get('tokens_used', 0),
-                'message': 'Workout generated successfully!'
-            })
-        else:
-            return Response({
-                'success': False,
-                'error': ai_response['error'],
-                'message': 'Failed to generate workout. Please try again.'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e),
-            'message': 'AI service unavailable. Please try again later.'
-        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response({
+        'from': first_day,
+        'to': last_day,
+        'statuses': CALENDAR_STATUSES,
+        'day': days,
+        'status': statuses,
+        'count': counts,
+        'ids': ids
+    })
 
 
 @api_view(['GET'])
@@ -412,28 +511,40 @@ def generate_ai_workout_view(request):
 def workout_history_view(request):
     """Get user's workout history with analytics"""
     user = request.user
-    days = int(request.query_params.get('days', 30))
+    try:
+        days = min(max(int(request.query_params.get('days', 30)), 1), MAX_HISTORY_DAYS)
+    except ValueError:
+        raise ValidationError({'days': 'Must be a whole number of days'})
     
     start_date = timezone.now() - timedelta(days=days)
-    workouts = Workout.objects.filter(
+    completed = Workout.objects.filter(
+        COMPLETED,
         user=user,
-        completed_at__gte=start_date,
-        status='completed'
-    ).order_by('-completed_at')
-    
-    serializer = WorkoutSerializer(workouts, many=True)
-    
-    # Calculate summary stats for the period
-    total_workouts = workouts.count()
-    total_time = sum([w.duration_minutes or 0 for w in workouts])
-    total_calories = sum([w.calories_burned or 0 for w in workouts])
+        completed_at__gte=start_date
+    )
+    
+    # One page of workouts; the cursor in `next` resumes after its last completed_at
+    paginator = WorkoutHistoryPagination()
+    page = paginator.paginate_queryset(with_workout_details(completed), request)
+    serializer = WorkoutSerializer(page, many=True)
+    
+    # Summary for the whole period in one aggregate query
+    summary = completed.aggregate(
+        total_workouts=Count('id'),
+        total_duration=Sum(DURATION, filter=TIMED),
+        total_calories=Sum('calories_burned')
+    )
+    total_workouts = summary['total_workouts']
+    total_duration = summary['total_duration'] or timedelta()
     
     return Response({
         'workouts': serializer.data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
         'summary': {
             'total_workouts': total_workouts,
-            'total_time_minutes': total_time,
-            'total_calories_burned': total_calories,
+            'total_time_minutes': total_duration.total_seconds() / 60,
+            'total_calories_burned': summary['total_calories'] or 0,
             'avg_workouts_per_week': round((total_workouts / days) * 7, 1),
             'period_days': days
         }
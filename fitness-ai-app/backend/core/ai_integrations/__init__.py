@@ -1,3 +1,9 @@
-from .claude_client import ClaudeClient
+from .claude_client import (
+    ClaudeClient, AsyncClaudeClient, get_claude_client, close_claude_client,
+    get_async_claude_client, aclose_async_claude_client
+)
 
-__all__ = ['ClaudeClient']
\ No newline at end of file
+__all__ = [
+    'ClaudeClient', 'AsyncClaudeClient', 'get_claude_client', 'close_claude_client',
+    'get_async_claude_client', 'aclose_async_claude_client'
+]
\ No newline at end of file
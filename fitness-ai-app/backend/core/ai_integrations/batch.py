@@ -0,0 +1,95 @@
+import uuid
+from django.conf import settings
+from typing import Dict, Optional
+
+from .claude_client import BaseClaudeClient, ClaudeClient, get_claude_client
+
+
+class AnthropicBatchBackend:
+    """Submit generations through the Message Batches API.
+
+    Batches are billed at a discount and processed asynchronously (usually
+    well within the 24 hour limit), which suits overnight pre-generation.
+    """
+
+    def __init__(self, claude_client: Optional[ClaudeClient] = None):
+        self.claude_client = claude_client or get_claude_client()
+
+    def submit(self, requests: Dict[str, Dict]) -> str:
+        """Submit {custom_id: message params} and return the batch id"""
+        batch = self.claude_client.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests.items()]
+        )
+        return batch.id
+
+    def is_finished(self, batch_id: str) -> bool:
+        batch = self.claude_client.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def results(self, batch_id: str, result_key: str) -> Dict[str, Dict]:
+        """Return {custom_id: response} shaped like ClaudeClient responses"""
+        responses = {}
+        for entry in self.claude_client.client.messages.batches.results(batch_id):
+            responses[entry.custom_id] = batch_result_response(self.claude_client, result_key, entry.result)
+        return responses
+
+
+class LocalBatchBackend:
+    """In-process stand-in for the batch API.
+
+    Runs every request through the provider router, like a live generation,
+    as soon as it is submitted, so a batch is finished by the time submit()
+    returns. Results
+    live in this process only; use it for development and tests.
+    """
+    _batches = {}
+
+    def __init__(self, claude_client: Optional[ClaudeClient] = None):
+        self.claude_client = claude_client or get_claude_client()
+
+    def submit(self, requests: Dict[str, Dict]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        messages = {}
+        for custom_id, params in requests.items():
+            try:
+                messages[custom_id], _ = self.claude_client.router.create(params)
+            except Exception as e:
+                messages[custom_id] = e
+        self._batches[batch_id] = messages
+        return batch_id
+
+    def is_finished(self, batch_id: str) -> bool:
+        return True
+
+    def results(self, batch_id: str, result_key: str) -> Dict[str, Dict]:
+        responses = {}
+        for custom_id, message in self._batches.pop(batch_id, {}).items():
+            responses[custom_id] = self.claude_client.message_response(result_key, message)
+        return responses
+
+
+def batch_result_response(claude_client: BaseClaudeClient, result_key: str, result) -> Dict:
+    """Convert one batch result into a ClaudeClient-style response"""
+    if result.type == "succeeded":
+        return claude_client.message_response(result_key, result.message)
+
+    # Errored results wrap the API error body: result.error.error.message
+    error = getattr(getattr(result, "error", None), "error", None)
+    message = getattr(error, "message", None)
+    return {
+        "success": False,
+        "error": f"Batch request {result.type}: {message}" if message else f"Batch request {result.type}",
+        "retryable": result.type == "expired",
+        result_key: None
+    }
+
+
+BATCH_BACKENDS = {
+    "anthropic": AnthropicBatchBackend,
+    "local": LocalBatchBackend,
+}
+
+
+def get_batch_backend():
+    """Instantiate the batch backend selected by AI_BATCH_BACKEND"""
+    return BATCH_BACKENDS[settings.AI_BATCH_BACKEND]()
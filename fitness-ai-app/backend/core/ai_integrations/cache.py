@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from typing import Dict, List, Optional
+
+# Upper bounds (exclusive) of the age bands used in cache keys and prompts
+AGE_BANDS = [(18, 'under 18'), (30, '18-29'), (40, '30-39'), (50, '40-49'), (60, '50-59')]
+OLDEST_AGE_BAND = '60+'
+
+# Body measurements are rounded to this step so near-identical users share entries
+MEASUREMENT_STEP = 5
+
+
+def age_band(age) -> Optional[str]:
+    """Map an exact age to the band used for generation"""
+    if not isinstance(age, int):
+        return age
+    for upper, label in AGE_BANDS:
+        if age < upper:
+            return label
+    return OLDEST_AGE_BAND
+
+
+def normalize_list(values) -> List[str]:
+    """Lower-case, de-duplicate and sort a list of free-text values"""
+    return sorted({str(item).strip().lower() for item in values if str(item).strip()})
+
+
+def normalize_profile(user_profile: Dict) -> Dict:
+    """Canonicalize a user profile so equivalent users produce the same prompt.
+
+    Ages collapse to bands, weight and height round to the nearest
+    MEASUREMENT_STEP, and list values are lower-cased, de-duplicated and
+    sorted. Everything else passes through unchanged.
+    """
+    normalized = {}
+    for key, value in user_profile.items():
+        if key == 'age':
+            value = age_band(value)
+        elif key in ('weight', 'height') and isinstance(value, (int, float)):
+            value = int(round(value / MEASUREMENT_STEP) * MEASUREMENT_STEP)
+        elif isinstance(value, (list, tuple)):
+            value = normalize_list(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[key] = value
+    return normalized
+
+
+def make_cache_key(kind: str, model: str, profile: Dict, params: Dict) -> str:
+    """Hash a generation request into a stable cache key"""
+    payload = json.dumps(
+        {'kind': kind, 'model': model, 'profile': profile, 'params': params},
+        sort_keys=True,
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GenerationCache:
+    """Two-tier cache for AI generations.
+
+    A size-bounded LRU in each process answers repeat requests without a
+    network hop; the shared Django cache (Redis in deployment) lets workers
+    reuse each other's generations. Both tiers expire entries after the
+    same TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, alias: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self._get_local(key)
+        if value is None:
+            shared = self._shared()
+            if shared is not None:
+                value = shared.get(key)
+                if value is not None:
+                    self._set_local(key, value)
+        return value
+
+    def set(self, key: str, value: Dict) -> None:
+        self._set_local(key, value)
+        shared = self._shared()
+        if shared is not None:
+            shared.set(key, value, timeout=self.ttl)
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        value = self._get_local(key)
+        if value is None:
+            shared = self._shared()
+            if shared is not None:
+                value = await shared.aget(key)
+                if value is not None:
+                    self._set_local(key, value)
+        return value
+
+    async def aset(self, key: str, value: Dict) -> None:
+        self._set_local(key, value)
+        shared = self._shared()
+        if shared is not None:
+            await shared.aset(key, value, timeout=self.ttl)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the shared tier expires on its own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared(self):
+        if self.alias and self.alias in settings.CACHES:
+            return caches[self.alias]
+        return None
+
+
+generation_cache = GenerationCache(
+    max_entries=settings.AI_GENERATION_CACHE_LRU_SIZE,
+    ttl=settings.AI_GENERATION_CACHE_TTL,
+    alias=settings.AI_GENERATION_CACHE_ALIAS
+)
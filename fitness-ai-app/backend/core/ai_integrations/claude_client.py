@@ -1,105 +1,210 @@
+import asyncio
+import atexit
 import os
-from anthropic import Anthropic
+import threading
+import time
+from anthropic import (
+    Anthropic, AsyncAnthropic, DefaultHttpxClient, DefaultAsyncHttpxClient,
+    Timeout, DEFAULT_CONNECTION_LIMITS
+)
 from django.conf import settings
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 
+from .cache import generation_cache, make_cache_key, normalize_list, normalize_profile
+from .providers import build_providers
+from .router import ProviderRouter, is_retryable_error
 
-class ClaudeClient:
-    def __init__(self):
-        self.client = Anthropic(
-            api_key=settings.ANTHROPIC_API_KEY
-        )
-        self.model = "claude-3-5-sonnet-latest"
+# The SDK only exposes its transport's Limits class through this default,
+# so reuse its type rather than importing the HTTP library directly.
+Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+def build_http_options() -> Dict:
+    """Build connection pool and timeout options from settings"""
+    timeout = Timeout(
+        settings.ANTHROPIC_TIMEOUT,
+        connect=settings.ANTHROPIC_CONNECT_TIMEOUT
+    )
+    limits = Limits(
+        max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.ANTHROPIC_KEEPALIVE_EXPIRY
+    )
+    return {"timeout": timeout, "limits": limits}
+
+
+# Static instructions sent as a system block ahead of the per-user prompt.
+# Keep per-user details out of these so every request can share a cache entry.
+WORKOUT_INSTRUCTIONS = """
+You are a certified fitness instructor creating a personalized workout plan.
+
+Please create a detailed workout plan with:
+1. Warm-up (5-10 minutes)
+2. Main workout with specific exercises, sets, reps, and rest periods
+3. Cool-down and stretching (5-10 minutes)
+4. Safety considerations and modifications
+5. Progress tracking suggestions
+
+Format the response as a structured workout plan with clear instructions.
+"""
+
+NUTRITION_INSTRUCTIONS = """
+You are a certified nutritionist creating a personalized meal plan.
+
+Please create a comprehensive nutrition plan with:
+1. Daily calorie target and macronutrient breakdown
+2. Sample meal plan for 3 days
+3. Healthy snack options
+4. Hydration recommendations
+5. Supplement suggestions (if applicable)
+6. Meal prep tips
+
+Ensure all recommendations are safe and evidence-based.
+"""
+
+MEDICAL_ANALYSIS_INSTRUCTIONS = """
+You are a health data analyst providing insights on fitness metrics.
+
+IMPORTANT: This is for informational purposes only and should not replace professional medical advice.
+
+Please provide:
+1. General health trend analysis
+2. Fitness readiness assessment
+3. Lifestyle recommendations
+4. When to consult healthcare professionals
+5. Tracking suggestions for improvement
+
+Always include medical disclaimer and emphasize consulting healthcare providers for medical concerns.
+"""
+
+# The API ignores cache_control on a prefix shorter than 1024 tokens (2048 for
+# Haiku models, which the fallback chain uses). At roughly 4 characters a token,
+# blocks under this length would never be cached, so they are sent unmarked.
+PROMPT_CACHE_MIN_CHARACTERS = 2048 * 4
+
+
+def system_block(text: str) -> Dict:
+    """A system text block, marked for prompt caching when it is long enough to be cached"""
+    block = {"type": "text", "text": text}
+    if len(text) >= PROMPT_CACHE_MIN_CHARACTERS:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
+
+# System block for each response type, keyed like the response's result key
+SYSTEM_BLOCKS = {
+    "workout": system_block(WORKOUT_INSTRUCTIONS),
+    "nutrition_plan": system_block(NUTRITION_INSTRUCTIONS),
+    "analysis": system_block(MEDICAL_ANALYSIS_INSTRUCTIONS),
+}
+
+
+class BaseClaudeClient:
+    """Prompt building and response shaping shared by the sync and async clients"""
+    model = "claude-3-5-sonnet-latest"
     
-    def generate_workout(self, user_profile: Dict, workout_type: str = "general") -> Dict:
-        """Generate personalized workout based on user profile"""
+    def _message_params(self, result_key: str, prompt: str, max_tokens: int) -> Dict:
+        return {
+            "max_tokens": max_tokens,
+            "system": [SYSTEM_BLOCKS[result_key]],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "model": self.model
+        }
+    
+    def _routed_response(self, result_key: str, message, provider) -> Dict:
+        response = self._success_response(result_key, message)
+        response["model"] = provider.model
+        return response
+    
+    def _cacheable(self, cache_key: Optional[str], provider) -> bool:
+        # Fallback generations are served but not cached under the primary model's key
+        return bool(cache_key) and provider is self.router.primary
+    
+    def _success_response(self, result_key: str, message) -> Dict:
+        text = "".join(block.text for block in message.content if block.type == "text")
+        usage = message.usage
+        cache_read_tokens = usage.cache_read_input_tokens or 0
+        cache_write_tokens = usage.cache_creation_input_tokens or 0
+        return {
+            "success": True,
+            result_key: text,
+            "tokens_used": usage.input_tokens + cache_read_tokens + cache_write_tokens + usage.output_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens
+        }
+    
+    def _error_response(self, result_key: str, error: Exception) -> Dict:
+        return {
+            "success": False,
+            "error": str(error),
+            "retryable": is_retryable_error(error),
+            result_key: None
+        }
+    
+    def workout_fingerprint(self, user_profile: Dict, workout_type: str = "general") -> str:
+        """Key shared by workout requests that would produce the same prompt"""
+        return self._prepare_workout(user_profile, workout_type, use_cache=True)[1]
+    
+    def nutrition_fingerprint(self, user_profile: Dict, goals: List[str]) -> str:
+        """Key shared by nutrition requests that would produce the same prompt"""
+        return self._prepare_nutrition(user_profile, goals, use_cache=True)[1]
+    
+    def workout_message_params(self, user_profile: Dict, workout_type: str = "general") -> Dict:
+        """Messages API parameters for a workout generation, e.g. for batch submission"""
+        prompt, _ = self._prepare_workout(user_profile, workout_type, use_cache=False)
+        return self._message_params("workout", prompt, max_tokens=2000)
+    
+    def _prepare_workout(self, user_profile: Dict, workout_type: str, use_cache: bool):
+        user_profile = normalize_profile(user_profile)
         prompt = self._build_workout_prompt(user_profile, workout_type)
-        
-        try:
-            message = self.client.messages.create(
-                max_tokens=2000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model
-            )
-            
-            return {
-                "success": True,
-                "workout": message.content,
-                "tokens_used": message.usage.input_tokens + message.usage.output_tokens
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "workout": None
-            }
+        cache_key = self._cache_key("workout", user_profile, {"workout_type": workout_type}, use_cache)
+        return prompt, cache_key
     
-    def generate_nutrition_plan(self, user_profile: Dict, goals: List[str]) -> Dict:
-        """Generate personalized nutrition plan"""
+    def _prepare_nutrition(self, user_profile: Dict, goals: List[str], use_cache: bool):
+        user_profile = normalize_profile(user_profile)
+        goals = normalize_list(goals)
         prompt = self._build_nutrition_prompt(user_profile, goals)
-        
-        try:
-            message = self.client.messages.create(
-                max_tokens=2000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model
-            )
-            
-            return {
-                "success": True,
-                "nutrition_plan": message.content,
-                "tokens_used": message.usage.input_tokens + message.usage.output_tokens
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "nutrition_plan": None
-            }
+        cache_key = self._cache_key("nutrition", user_profile, {"goals": goals}, use_cache)
+        return prompt, cache_key
     
-    def analyze_medical_data(self, medical_data: Dict) -> Dict:
-        """Analyze medical data and provide health insights"""
-        prompt = self._build_medical_analysis_prompt(medical_data)
-        
-        try:
-            message = self.client.messages.create(
-                max_tokens=1500,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model
-            )
-            
-            return {
-                "success": True,
-                "analysis": message.content,
-                "tokens_used": message.usage.input_tokens + message.usage.output_tokens
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "analysis": None
-            }
+    def _cache_key(self, kind: str, user_profile: Dict, params: Dict, use_cache: bool) -> Optional[str]:
+        if not use_cache:
+            return None
+        return make_cache_key(kind, self.model, user_profile, params)
+    
+    def cached_response(self, cached: Dict, cache_key: str) -> Dict:
+        """Response for a generation found in the cache, shaped like a generate_* cache hit"""
+        return self._cache_hit_response(cached, cache_key)
+    
+    def message_response(self, result_key: str, message, cache_key: Optional[str] = None) -> Dict:
+        """Response for a message generated outside the router (e.g. by a batch),
+        or for the exception its request failed with, shaped like a generate_* result"""
+        if isinstance(message, Exception):
+            return self._error_response(result_key, message)
+        return self._cache_miss_response(self._success_response(result_key, message), cache_key)
+    
+    def _cache_hit_response(self, cached: Dict, cache_key: str) -> Dict:
+        # A hit spends no tokens; the original spend was recorded on the miss
+        return {
+            **cached,
+            "tokens_used": 0,
+            "cache_read_tokens": 0,
+            "cache_write_tokens": 0,
+            "cache_hit": True,
+            "cache_key": cache_key
+        }
+    
+    def _cache_miss_response(self, response: Dict, cache_key: Optional[str]) -> Dict:
+        return {**response, "cache_hit": False, "cache_key": cache_key or ""}
     
     def _build_workout_prompt(self, user_profile: Dict, workout_type: str) -> str:
-        """Build personalized workout generation prompt"""
+        """Build the per-user part of the workout generation prompt"""
         return f"""
-        You are a certified fitness instructor creating a personalized workout plan.
-        
         User Profile:
         - Age: {user_profile.get('age', 'Not specified')}
         - Gender: {user_profile.get('gender', 'Not specified')}
@@ -111,22 +216,11 @@ class ClaudeClient:
         - Preferred Activities: {user_profile.get('preferred_activities', 'Any')}
         
         Workout Type: {workout_type}
-        
-        Please create a detailed workout plan with:
-        1. Warm-up (5-10 minutes)
-        2. Main workout with specific exercises, sets, reps, and rest periods
-        3. Cool-down and stretching (5-10 minutes)
-        4. Safety considerations and modifications
-        5. Progress tracking suggestions
-        
-        Format the response as a structured workout plan with clear instructions.
         """
     
     def _build_nutrition_prompt(self, user_profile: Dict, goals: List[str]) -> str:
-        """Build personalized nutrition plan prompt"""
+        """Build the per-user part of the nutrition plan prompt"""
         return f"""
-        You are a certified nutritionist creating a personalized meal plan.
-        
         User Profile:
         - Age: {user_profile.get('age', 'Not specified')}
         - Gender: {user_profile.get('gender', 'Not specified')}
@@ -136,25 +230,11 @@ class ClaudeClient:
         - Dietary Restrictions: {user_profile.get('dietary_restrictions', 'None')}
         - Food Allergies: {user_profile.get('food_allergies', 'None')}
         - Goals: {', '.join(goals)}
-        
-        Please create a comprehensive nutrition plan with:
-        1. Daily calorie target and macronutrient breakdown
-        2. Sample meal plan for 3 days
-        3. Healthy snack options
-        4. Hydration recommendations
-        5. Supplement suggestions (if applicable)
-        6. Meal prep tips
-        
-        Ensure all recommendations are safe and evidence-based.
         """
     
     def _build_medical_analysis_prompt(self, medical_data: Dict) -> str:
-        """Build medical data analysis prompt"""
+        """Build the per-user part of the medical data analysis prompt"""
         return f"""
-        You are a health data analyst providing insights on fitness metrics.
-        
-        IMPORTANT: This is for informational purposes only and should not replace professional medical advice.
-        
         Health Data:
         - Heart Rate: {medical_data.get('heart_rate', 'Not provided')} bpm
         - Blood Pressure: {medical_data.get('blood_pressure', 'Not provided')}
@@ -162,13 +242,232 @@ class ClaudeClient:
         - Stress Level: {medical_data.get('stress_level', 'Not provided')}/10
         - Energy Level: {medical_data.get('energy_level', 'Not provided')}/10
         - Recent Symptoms: {medical_data.get('symptoms', 'None reported')}
+        """
+
+
+class ClaudeClient(BaseClaudeClient):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        http_options = build_http_options()
+        self.client = Anthropic(
+            api_key=api_key or settings.ANTHROPIC_API_KEY,
+            base_url=base_url or settings.ANTHROPIC_BASE_URL,
+            timeout=http_options["timeout"],
+            max_retries=settings.ANTHROPIC_MAX_RETRIES,
+            http_client=DefaultHttpxClient(**http_options)
+        )
+        self.router = ProviderRouter(build_providers(self.client))
+        self.model = self.router.primary.model
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections held by the SDK client"""
+        self.client.close()
+    
+    def generate_workout(self, user_profile: Dict, workout_type: str = "general", use_cache: bool = True) -> Dict:
+        """Generate personalized workout based on user profile"""
+        prompt, cache_key = self._prepare_workout(user_profile, workout_type, use_cache)
+        return self._generate("workout", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    def generate_nutrition_plan(self, user_profile: Dict, goals: List[str], use_cache: bool = True) -> Dict:
+        """Generate personalized nutrition plan"""
+        prompt, cache_key = self._prepare_nutrition(user_profile, goals, use_cache)
+        return self._generate("nutrition_plan", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    def analyze_medical_data(self, medical_data: Dict) -> Dict:
+        """Analyze medical data and provide health insights"""
+        prompt = self._build_medical_analysis_prompt(medical_data)
+        return self._generate("analysis", prompt, max_tokens=1500)
+    
+    def _generate(self, result_key: str, prompt: str, max_tokens: int, cache_key: Optional[str] = None) -> Dict:
+        if cache_key:
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit_response(cached, cache_key)
         
-        Please provide:
-        1. General health trend analysis
-        2. Fitness readiness assessment
-        3. Lifestyle recommendations
-        4. When to consult healthcare professionals
-        5. Tracking suggestions for improvement
+        try:
+            message, provider = self.router.create(self._message_params(result_key, prompt, max_tokens))
+            response = self._routed_response(result_key, message, provider)
+        except Exception as e:
+            return self._error_response(result_key, e)
         
-        Always include medical disclaimer and emphasize consulting healthcare providers for medical concerns.
-        """
\ No newline at end of file
+        if self._cacheable(cache_key, provider):
+            generation_cache.set(cache_key, response)
+        return self._cache_miss_response(response, cache_key)
+
+
+class AsyncClaudeClient(BaseClaudeClient):
+    """Non-blocking ClaudeClient for async views served through core.asgi"""
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        http_options = build_http_options()
+        self.client = AsyncAnthropic(
+            api_key=api_key or settings.ANTHROPIC_API_KEY,
+            base_url=base_url or settings.ANTHROPIC_BASE_URL,
+            timeout=http_options["timeout"],
+            max_retries=settings.ANTHROPIC_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(**http_options)
+        )
+        self.router = ProviderRouter(build_providers(self.client))
+        self.model = self.router.primary.model
+    
+    async def close(self) -> None:
+        """Close pooled HTTP connections held by the SDK client"""
+        await self.client.close()
+    
+    async def generate_workout(self, user_profile: Dict, workout_type: str = "general", use_cache: bool = True) -> Dict:
+        """Generate personalized workout based on user profile"""
+        prompt, cache_key = self._prepare_workout(user_profile, workout_type, use_cache)
+        return await self._generate("workout", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    async def generate_nutrition_plan(self, user_profile: Dict, goals: List[str], use_cache: bool = True) -> Dict:
+        """Generate personalized nutrition plan"""
+        prompt, cache_key = self._prepare_nutrition(user_profile, goals, use_cache)
+        return await self._generate("nutrition_plan", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    async def analyze_medical_data(self, medical_data: Dict) -> Dict:
+        """Analyze medical data and provide health insights"""
+        prompt = self._build_medical_analysis_prompt(medical_data)
+        return await self._generate("analysis", prompt, max_tokens=1500)
+    
+    async def _generate(self, result_key: str, prompt: str, max_tokens: int, cache_key: Optional[str] = None) -> Dict:
+        if cache_key:
+            cached = await generation_cache.aget(cache_key)
+            if cached is not None:
+                return self._cache_hit_response(cached, cache_key)
+        
+        try:
+            message, provider = await self.router.acreate(self._message_params(result_key, prompt, max_tokens))
+            response = self._routed_response(result_key, message, provider)
+        except Exception as e:
+            return self._error_response(result_key, e)
+        
+        if self._cacheable(cache_key, provider):
+            await generation_cache.aset(cache_key, response)
+        return self._cache_miss_response(response, cache_key)
+    
+    def stream_workout(self, user_profile: Dict, workout_type: str = "general", use_cache: bool = True) -> AsyncIterator[Dict]:
+        """Stream a personalized workout as it is generated"""
+        prompt, cache_key = self._prepare_workout(user_profile, workout_type, use_cache)
+        return self._stream("workout", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    def stream_nutrition_plan(self, user_profile: Dict, goals: List[str], use_cache: bool = True) -> AsyncIterator[Dict]:
+        """Stream a personalized nutrition plan as it is generated"""
+        prompt, cache_key = self._prepare_nutrition(user_profile, goals, use_cache)
+        return self._stream("nutrition_plan", prompt, max_tokens=2000, cache_key=cache_key)
+    
+    def stream_medical_analysis(self, medical_data: Dict) -> AsyncIterator[Dict]:
+        """Stream health insights as they are generated"""
+        prompt = self._build_medical_analysis_prompt(medical_data)
+        return self._stream("analysis", prompt, max_tokens=1500)
+    
+    async def _stream(self, result_key: str, prompt: str, max_tokens: int, cache_key: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Yield {"type": "text"} events per text delta, then one {"type": "response"}
+        event carrying the same payload _generate would have returned"""
+        if cache_key:
+            cached = await generation_cache.aget(cache_key)
+            if cached is not None:
+                yield {"type": "text", "text": cached[result_key]}
+                yield {"type": "response", "response": self._cache_hit_response(cached, cache_key)}
+                return
+        
+        params = self._message_params(result_key, prompt, max_tokens)
+        last_error = None
+        for provider, health, timeout in self.router.attempts():
+            start = time.monotonic()
+            first_token_latency = None
+            try:
+                async with provider.stream(params, timeout) as stream:
+                    async for text in stream.text_stream:
+                        if first_token_latency is None:
+                            first_token_latency = time.monotonic() - start
+                        yield {"type": "text", "text": text}
+                    message = await stream.get_final_message()
+            except Exception as e:
+                try:
+                    last_error = self.router.record_failure(health, e, first_token_latency or time.monotonic() - start)
+                except Exception:
+                    last_error = e
+                    break
+                if first_token_latency is not None:
+                    # Tokens already reached the client; a fallback would restart the text
+                    break
+                continue
+            else:
+                # Time to first token is what streaming callers wait on
+                health.record_success(first_token_latency or time.monotonic() - start)
+                response = self._routed_response(result_key, message, provider)
+                break
+            finally:
+                # Cancelled or closed mid-stream: nothing was recorded, so free the half-open trial
+                health.release_trial()
+        else:
+            last_error = self.router.unavailable_error(last_error)
+        
+        if last_error is not None:
+            yield {"type": "response", "response": self._error_response(result_key, last_error)}
+            return
+        
+        if self._cacheable(cache_key, provider):
+            await generation_cache.aset(cache_key, response)
+        yield {"type": "response", "response": self._cache_miss_response(response, cache_key)}
+
+
+_shared_client: Optional[ClaudeClient] = None
+_shared_client_pid: Optional[int] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_claude_client() -> ClaudeClient:
+    """Return the process-wide ClaudeClient, creating it on first use.
+
+    The client owns a keep-alive connection pool, so it must not be shared
+    across a fork: a worker that inherits a client from its parent builds
+    its own instead.
+    """
+    global _shared_client, _shared_client_pid
+    pid = os.getpid()
+    if _shared_client is None or _shared_client_pid != pid:
+        with _shared_client_lock:
+            if _shared_client is None or _shared_client_pid != pid:
+                _shared_client = ClaudeClient()
+                _shared_client_pid = pid
+    return _shared_client
+
+
+def close_claude_client() -> None:
+    """Shut down the process-wide ClaudeClient and its connection pool"""
+    global _shared_client, _shared_client_pid
+    with _shared_client_lock:
+        if _shared_client is not None and _shared_client_pid == os.getpid():
+            _shared_client.close()
+        _shared_client = None
+        _shared_client_pid = None
+
+
+atexit.register(close_claude_client)
+
+
+_shared_async_client: Optional[AsyncClaudeClient] = None
+_shared_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_async_claude_client() -> AsyncClaudeClient:
+    """Return the AsyncClaudeClient for the running event loop.
+
+    Async connection pools are bound to the loop that opened them, so the
+    shared client is rebuilt if it is requested from a different loop.
+    """
+    global _shared_async_client, _shared_async_loop
+    loop = asyncio.get_running_loop()
+    if _shared_async_client is None or _shared_async_loop is not loop:
+        _shared_async_client = AsyncClaudeClient()
+        _shared_async_loop = loop
+    return _shared_async_client
+
+
+async def aclose_async_claude_client() -> None:
+    """Shut down the shared AsyncClaudeClient if it belongs to this loop"""
+    global _shared_async_client, _shared_async_loop
+    if _shared_async_client is not None and _shared_async_loop is asyncio.get_running_loop():
+        await _shared_async_client.close()
+    _shared_async_client = None
+    _shared_async_loop = None
@@ -0,0 +1,118 @@
+import asyncio
+import time
+import uuid
+from anthropic.types import Message
+from django.conf import settings
+from typing import AsyncIterator, Dict
+
+
+class AnthropicProvider:
+    """One Anthropic model served through a pooled SDK client.
+
+    Routed calls make a single HTTP try: the SDK would retry each one for up
+    to AI_PROVIDER_TIMEOUT again, while the router fails over to the next
+    provider and counts every timeout against the breaker.
+    """
+    backend = "anthropic"
+
+    def __init__(self, client, model: str):
+        # Shares the client's connection pool
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.name = f"{self.backend}:{model}"
+
+    def create(self, params: Dict, timeout: float) -> Message:
+        return self.client.messages.create(**{**params, "model": self.model}, timeout=timeout)
+
+    async def acreate(self, params: Dict, timeout: float) -> Message:
+        return await self.client.messages.create(**{**params, "model": self.model}, timeout=timeout)
+
+    def stream(self, params: Dict, timeout: float):
+        """Async context manager exposing text_stream and get_final_message()"""
+        return self.client.messages.stream(**{**params, "model": self.model}, timeout=timeout)
+
+
+class StubProvider:
+    """Offline provider returning a canned response, for tests and local development.
+
+    Set AI_STUB_PROVIDER_LATENCY to simulate a slow upstream.
+    """
+    backend = "stub"
+
+    def __init__(self, client=None, model: str = "stub"):
+        self.model = model
+        self.name = f"{self.backend}:{model}"
+        self.latency = settings.AI_STUB_PROVIDER_LATENCY
+
+    def create(self, params: Dict, timeout: float) -> Message:
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+            self._check_timeout(timeout)
+        return self._message(params)
+
+    async def acreate(self, params: Dict, timeout: float) -> Message:
+        if self.latency:
+            await asyncio.sleep(min(self.latency, timeout))
+            self._check_timeout(timeout)
+        return self._message(params)
+
+    def stream(self, params: Dict, timeout: float):
+        return _StubStream(self, params, timeout)
+
+    def _check_timeout(self, timeout: float) -> None:
+        if self.latency > timeout:
+            raise TimeoutError(f"{self.name} did not answer within {timeout:.1f}s")
+
+    def _message(self, params: Dict) -> Message:
+        prompt = params["messages"][-1]["content"]
+        text = f"Stub response from {self.model} ({len(prompt)} prompt characters)."
+        return Message.model_validate({
+            "id": f"msg_stub_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": self.model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+        })
+
+
+class _StubStream:
+    """Minimal stand-in for the SDK's message stream manager"""
+
+    def __init__(self, provider: StubProvider, params: Dict, timeout: float):
+        self.provider = provider
+        self.params = params
+        self.timeout = timeout
+        self.message = None
+
+    async def __aenter__(self):
+        self.message = await self.provider.acreate(self.params, self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self) -> AsyncIterator[str]:
+        for word in self.message.content[0].text.split(" "):
+            yield word + " "
+
+    async def get_final_message(self) -> Message:
+        return self.message
+
+
+PROVIDER_BACKENDS = {
+    "anthropic": AnthropicProvider,
+    "stub": StubProvider,
+}
+
+
+def build_providers(client):
+    """Build the configured provider chain (AI_PROVIDER_CHAIN, "backend:model,...") on an SDK client"""
+    providers = []
+    for entry in settings.AI_PROVIDER_CHAIN.split(","):
+        backend, _, model = entry.strip().partition(":")
+        providers.append(PROVIDER_BACKENDS[backend](client, model))
+    return providers
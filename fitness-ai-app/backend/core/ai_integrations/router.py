@@ -0,0 +1,219 @@
+"""
+Latency-aware routing across the configured AI providers.
+
+Each provider/model has a ProviderHealth: a rolling window of call latencies
+and outcomes (for p95 latency and error rate) plus a circuit breaker. The
+router tries healthy providers in configured order, demotes degraded ones,
+skips open circuits and falls back to the next provider on a transient
+failure, all within one overall deadline.
+"""
+import threading
+import time
+from collections import deque
+from anthropic import APIConnectionError, APIStatusError
+from django.conf import settings
+from typing import Dict, List, Optional
+
+
+class ProvidersUnavailable(Exception):
+    """No provider could serve the request within the deadline"""
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a failed call is transient (same rules as the SDK's own retries)"""
+    if isinstance(error, (APIConnectionError, TimeoutError, ProvidersUnavailable)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class ProviderHealth:
+    """Rolling health window and circuit breaker for one provider/model.
+
+    Latency and error rate only count samples from the last max_age seconds,
+    so a demoted provider is tried again once its bad samples age out, and
+    need min_samples of them before the provider counts as degraded.
+
+    The circuit opens after failure_threshold consecutive transient
+    failures. Once cooldown seconds have passed it lets a single trial call
+    through (half-open); success closes it, failure re-opens it. A trial
+    that ends with neither (cancelled, or killed by a BaseException) is
+    released, so the next request becomes the trial instead.
+    """
+
+    min_samples = 5
+
+    def __init__(self, window: int, max_age: float, failure_threshold: int, cooldown: float):
+        self.max_age = max_age
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._samples = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, True))
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, False))
+            self._consecutive_failures += 1
+            if self._trial_in_flight or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Let another trial through after one ended without an outcome; no-op once recorded"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _recent(self) -> List:
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            return [(latency, ok) for at, latency, ok in self._samples if at >= cutoff]
+
+    def p95_latency(self) -> Optional[float]:
+        latencies = sorted(latency for latency, _ in self._recent())
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def is_degraded(self) -> bool:
+        if len(self._recent()) < self.min_samples:
+            return False
+        p95 = self.p95_latency()
+        return (
+            (p95 is not None and p95 > settings.AI_PROVIDER_SLOW_P95)
+            or self.error_rate() > settings.AI_PROVIDER_MAX_ERROR_RATE
+        )
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_provider_health(name: str) -> ProviderHealth:
+    """Process-wide health for a provider, shared by the sync and async clients"""
+    with _health_lock:
+        if name not in _health:
+            _health[name] = ProviderHealth(
+                window=settings.AI_PROVIDER_HEALTH_WINDOW,
+                max_age=settings.AI_PROVIDER_HEALTH_MAX_AGE,
+                failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+                cooldown=settings.AI_CIRCUIT_COOLDOWN
+            )
+        return _health[name]
+
+
+class ProviderRouter:
+    """Pick and call providers for one client (sync or async)"""
+
+    def __init__(self, providers: List):
+        self.providers = providers
+
+    @property
+    def primary(self):
+        return self.providers[0]
+
+    def candidates(self) -> List:
+        """Providers worth trying, healthy ones first, in configured order otherwise"""
+        ranked = sorted(
+            enumerate(self.providers),
+            key=lambda item: (get_provider_health(item[1].name).is_degraded(), item[0])
+        )
+        return [provider for _, provider in ranked]
+
+    def attempts(self):
+        """Yield (provider, health, timeout) for each attempt allowed by breakers and the deadline"""
+        deadline = time.monotonic() + settings.AI_ROUTER_DEADLINE
+        for provider in self.candidates():
+            remaining = deadline - time.monotonic()
+            if remaining < settings.AI_PROVIDER_MIN_ATTEMPT_TIME:
+                return
+            health = get_provider_health(provider.name)
+            if not health.allow_request():
+                continue
+            yield provider, health, min(settings.AI_PROVIDER_TIMEOUT, remaining)
+
+    def create(self, params: Dict):
+        """Return (message, provider) from the first provider that answers"""
+        last_error = None
+        for provider, health, timeout in self.attempts():
+            start = time.monotonic()
+            try:
+                message = provider.create(params, timeout)
+            except Exception as e:
+                last_error = self.record_failure(health, e, time.monotonic() - start)
+                continue
+            else:
+                health.record_success(time.monotonic() - start)
+                return message, provider
+            finally:
+                health.release_trial()
+        raise self.unavailable_error(last_error)
+
+    async def acreate(self, params: Dict):
+        """Async create(): return (message, provider) from the first provider that answers"""
+        last_error = None
+        for provider, health, timeout in self.attempts():
+            start = time.monotonic()
+            try:
+                message = await provider.acreate(params, timeout)
+            except Exception as e:
+                last_error = self.record_failure(health, e, time.monotonic() - start)
+                continue
+            else:
+                health.record_success(time.monotonic() - start)
+                return message, provider
+            finally:
+                health.release_trial()
+        raise self.unavailable_error(last_error)
+
+    def record_failure(self, health: ProviderHealth, error: Exception, latency: float) -> Exception:
+        """Count a transient failure against the provider; re-raise anything else"""
+        if not is_retryable_error(error):
+            # A request the API rejects outright would fail on every provider
+            health.record_success(latency)
+            raise error
+        health.record_failure(latency)
+        return error
+
+    def unavailable_error(self, last_error: Optional[Exception]) -> Exception:
+        if last_error is not None:
+            return last_error
+        return ProvidersUnavailable("All AI providers are unavailable")
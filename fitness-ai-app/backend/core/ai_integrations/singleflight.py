@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from typing import Callable, Dict, Optional
+
+
+class _Flight:
+    """An in-process call that other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one execution.
+
+    Threads in one process wait on the first caller's in-flight call. Across
+    processes, the first caller takes a lock in the shared Django cache
+    (an atomic ``add``, i.e. SET NX in Redis) and publishes its result under
+    that lock's token; callers that find the lock held poll for the result.
+    If the shared cache is unavailable, each process runs its own call.
+    """
+
+    def __init__(self, alias: Optional[str], lock_timeout: int, result_ttl: int, poll_interval: float):
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Dict]) -> Dict:
+        """Return fn()'s result, shared with every concurrent caller using key"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.result is None:
+                # The leader raised; run our own call rather than share the error
+                return fn()
+            return dict(flight.result)
+
+        try:
+            flight.result = self._do_shared(key, fn)
+            return dict(flight.result)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _do_shared(self, key: str, fn: Callable[[], Dict]) -> Dict:
+        shared = self._shared()
+        if shared is None:
+            return fn()
+
+        lock_key = f'singleflight:lock:{key}'
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            token = uuid.uuid4().hex
+            acquired = shared.add(lock_key, token, timeout=self.lock_timeout)
+            if acquired is None:
+                # Shared cache unreachable (errors are ignored and return None)
+                return fn()
+
+            if acquired:
+                try:
+                    result = fn()
+                    shared.set(self._result_key(key, token), result, timeout=self.result_ttl)
+                    return result
+                finally:
+                    if shared.get(lock_key) == token:
+                        shared.delete(lock_key)
+
+            holder = shared.get(lock_key)
+            if holder is None:
+                continue
+            result = self._wait_for_result(shared, lock_key, self._result_key(key, holder), holder, deadline)
+            if result is not None:
+                return result
+
+        return fn()
+
+    def _wait_for_result(self, shared, lock_key: str, result_key: str, holder: str, deadline: float) -> Optional[Dict]:
+        """Poll for another process's result until it lands or that flight ends"""
+        while time.monotonic() < deadline:
+            result = shared.get(result_key)
+            if result is not None:
+                return result
+            if shared.get(lock_key) != holder:
+                return shared.get(result_key)
+            time.sleep(self.poll_interval)
+        return None
+
+    def _result_key(self, key: str, token: str) -> str:
+        return f'singleflight:result:{key}:{token}'
+
+    def _shared(self):
+        if self.alias and self.alias in settings.CACHES:
+            return caches[self.alias]
+        return None
+
+
+single_flight = SingleFlight(
+    alias=settings.AI_GENERATION_CACHE_ALIAS,
+    lock_timeout=settings.AI_SINGLE_FLIGHT_LOCK_TIMEOUT,
+    result_ttl=settings.AI_SINGLE_FLIGHT_RESULT_TTL,
+    poll_interval=settings.AI_SINGLE_FLIGHT_POLL_INTERVAL
+)
@@ -0,0 +1,78 @@
+"""
+Async counterpart of DRF's ``@api_view`` for endpoints served through core.asgi.
+
+DRF views are synchronous, and under ASGI Django runs every sync view on one
+shared thread per worker. Views that wait on slow upstream calls (Claude
+generations) use ``async_api_view`` instead so they release the event loop
+while waiting.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def async_api_view(http_method_names):
+    """Wrap an async view with DRF authentication, parsing and error handling.
+
+    The wrapped view receives a DRF ``Request`` with ``user`` already
+    resolved and must return a Django ``HttpResponse`` (usually a
+    ``JsonResponse``). Only authenticated users are let through, matching
+    the project's default ``IsAuthenticated`` permission.
+    """
+    allowed_methods = [method.upper() for method in http_method_names]
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in allowed_methods:
+                return JsonResponse(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=405,
+                    headers={'Allow': ', '.join(allowed_methods)}
+                )
+
+            authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+            drf_request = Request(
+                request,
+                parsers=[JSONParser(), FormParser(), MultiPartParser()],
+                authenticators=authenticators
+            )
+
+            try:
+                user = await sync_to_async(lambda: drf_request.user)()
+                if not user or not user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                return await func(drf_request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return _exception_response(exc, drf_request)
+
+        view.csrf_exempt = True
+        return view
+
+    return decorator
+
+
+def _exception_response(exc, request):
+    """Render an APIException the way DRF's default exception handler does"""
+    headers = {}
+    status_code = exc.status_code
+
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticators = request.authenticators
+        auth_header = authenticators[0].authenticate_header(request) if authenticators else None
+        if auth_header:
+            headers['WWW-Authenticate'] = auth_header
+        else:
+            status_code = 403
+
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+
+    return JsonResponse(data, status=status_code, headers=headers, safe=False)
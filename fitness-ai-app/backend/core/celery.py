@@ -0,0 +1,17 @@
+"""
+Celery application for core project.
+
+Workers are started with ``celery -A core worker``. Configuration is read from
+Django settings under the ``CELERY_`` namespace and tasks are discovered from
+each installed app's ``tasks`` module.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -158,15 +159,122 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'cache_table',
-    }
+    },
+    # Shared tier of the AI generation cache; errors degrade to cache misses
+    'ai_generations': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0'),
+        'KEY_PREFIX': 'ai_generations',
+        'OPTIONS': {
+            'IGNORE_EXCEPTIONS': True,
+            'SOCKET_CONNECT_TIMEOUT': 0.5,
+            'SOCKET_TIMEOUT': 0.5,
+        },
+    },
+    # Per-user training analytics, shared so that a change seen by one process invalidates them for all
+    'workout_analytics': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0'),
+        'KEY_PREFIX': 'workout_analytics',
+        'OPTIONS': {
+            'IGNORE_EXCEPTIONS': True,
+            'SOCKET_CONNECT_TIMEOUT': 0.5,
+            'SOCKET_TIMEOUT': 0.5,
+        },
+    },
+    # Per-process cache of each user's daily workout suggestions
+    'workout_suggestions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'workout_suggestions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+# AI generation cache: per-process LRU in front of the shared Redis tier
+AI_GENERATION_CACHE_ALIAS = 'ai_generations'
+AI_GENERATION_CACHE_TTL = int(os.getenv('AI_GENERATION_CACHE_TTL', str(6 * 60 * 60)))
+AI_GENERATION_CACHE_LRU_SIZE = int(os.getenv('AI_GENERATION_CACHE_LRU_SIZE', '512'))
+
+# Workout suggestions: template index rebuilt per process after the TTL, results cached per user per day
+WORKOUT_SUGGESTION_CACHE_ALIAS = 'workout_suggestions'
+WORKOUT_SUGGESTION_INDEX_TTL = int(os.getenv('WORKOUT_SUGGESTION_INDEX_TTL', str(60 * 60)))
+
+# Per-user training analytics, cached until a workout or session changes
+WORKOUT_ANALYTICS_CACHE_ALIAS = 'workout_analytics'
+WORKOUT_ANALYTICS_CACHE_TTL = int(os.getenv('WORKOUT_ANALYTICS_CACHE_TTL', str(24 * 60 * 60)))
+
+# Offline sync: the returned cursor trails the clock by this many seconds, so
+# session edits stamped before it but committed after it are still picked up
+WORKOUT_SYNC_CURSOR_OVERLAP = int(os.getenv('WORKOUT_SYNC_CURSOR_OVERLAP', '60'))
+
+# Single-flight coalescing of identical concurrent generations (locks live in the cache above)
+AI_SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.getenv('AI_SINGLE_FLIGHT_LOCK_TIMEOUT', '180'))
+AI_SINGLE_FLIGHT_RESULT_TTL = int(os.getenv('AI_SINGLE_FLIGHT_RESULT_TTL', '60'))
+AI_SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv('AI_SINGLE_FLIGHT_POLL_INTERVAL', '0.25'))
+
 # Anthropic API Configuration
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL') or None
+
+# Shared Claude client connection pool (one pool per worker process)
+ANTHROPIC_TIMEOUT = float(os.getenv('ANTHROPIC_TIMEOUT', '60'))
+ANTHROPIC_CONNECT_TIMEOUT = float(os.getenv('ANTHROPIC_CONNECT_TIMEOUT', '5'))
+ANTHROPIC_MAX_RETRIES = int(os.getenv('ANTHROPIC_MAX_RETRIES', '2'))  # direct SDK calls (batch API); routed calls fail over instead
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv('ANTHROPIC_MAX_CONNECTIONS', '50'))
+ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS', '20'))
+ANTHROPIC_KEEPALIVE_EXPIRY = float(os.getenv('ANTHROPIC_KEEPALIVE_EXPIRY', '30'))
+
+# AI provider routing: models tried in order ("backend:model,..."; backends: anthropic, stub)
+AI_PROVIDER_CHAIN = os.getenv('AI_PROVIDER_CHAIN', 'anthropic:claude-3-5-sonnet-latest,anthropic:claude-3-5-haiku-latest')
+AI_PROVIDER_TIMEOUT = float(os.getenv('AI_PROVIDER_TIMEOUT', '40'))  # per attempt; above the 10-30s a full generation takes
+AI_ROUTER_DEADLINE = float(os.getenv('AI_ROUTER_DEADLINE', '90'))  # no new attempt starts after this; leaves room for a fallback
+AI_PROVIDER_MIN_ATTEMPT_TIME = float(os.getenv('AI_PROVIDER_MIN_ATTEMPT_TIME', '2'))
+AI_PROVIDER_HEALTH_WINDOW = int(os.getenv('AI_PROVIDER_HEALTH_WINDOW', '50'))  # calls
+AI_PROVIDER_HEALTH_MAX_AGE = float(os.getenv('AI_PROVIDER_HEALTH_MAX_AGE', '300'))  # seconds
+AI_PROVIDER_SLOW_P95 = float(os.getenv('AI_PROVIDER_SLOW_P95', '30'))  # seconds
+AI_PROVIDER_MAX_ERROR_RATE = float(os.getenv('AI_PROVIDER_MAX_ERROR_RATE', '0.5'))
+AI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AI_CIRCUIT_FAILURE_THRESHOLD', '5'))
+AI_CIRCUIT_COOLDOWN = float(os.getenv('AI_CIRCUIT_COOLDOWN', '30'))  # seconds
+AI_STUB_PROVIDER_LATENCY = float(os.getenv('AI_STUB_PROVIDER_LATENCY', '0'))
 
 # Celery Configuration
-CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
-CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+# CELERY_IN_MEMORY swaps Redis for Celery's in-memory transport and runs tasks
+# eagerly, so the generation pipeline can be exercised without a broker.
+CELERY_IN_MEMORY = os.getenv('CELERY_IN_MEMORY', 'False').lower() == 'true'
+if CELERY_IN_MEMORY:
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+else:
+    CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+    CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', str(CELERY_IN_MEMORY)).lower() == 'true'
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# AI generation jobs
+AI_GENERATION_MAX_RETRIES = int(os.getenv('AI_GENERATION_MAX_RETRIES', '3'))
+AI_GENERATION_RETRY_BACKOFF = int(os.getenv('AI_GENERATION_RETRY_BACKOFF', '5'))  # seconds, doubled per retry
+AI_GENERATION_RETRY_BACKOFF_MAX = int(os.getenv('AI_GENERATION_RETRY_BACKOFF_MAX', '300'))
+AI_GENERATION_LONG_POLL_MAX = int(os.getenv('AI_GENERATION_LONG_POLL_MAX', '30'))  # seconds
+
+# Overnight workout pre-generation ('anthropic' Message Batches API or 'local' stand-in)
+AI_BATCH_BACKEND = os.getenv('AI_BATCH_BACKEND', 'anthropic')
+AI_PREGENERATION_HOUR = int(os.getenv('AI_PREGENERATION_HOUR', '1'))  # UTC hour the batch is submitted
+AI_PREGENERATED_WORKOUT_HOUR = int(os.getenv('AI_PREGENERATED_WORKOUT_HOUR', '7'))  # scheduled start of the workout
+
+# Scheduled start (local hour) of workouts created by activating a plan
+WORKOUT_PLAN_START_HOUR = int(os.getenv('WORKOUT_PLAN_START_HOUR', '7'))
+
+CELERY_BEAT_SCHEDULE = {
+    'pregenerate-workouts': {
+        'task': 'apps.workouts.tasks.pregenerate_workouts_task',
+        'schedule': crontab(hour=AI_PREGENERATION_HOUR, minute=0),
+    },
+    'collect-workout-batches': {
+        'task': 'apps.workouts.tasks.collect_workout_batches_task',
+        'schedule': crontab(minute='*/15'),
+    },
+}
 
 # Security Settings
 ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
@@ -0,0 +1,58 @@
+"""
+Helpers shared by the apps' test suites.
+"""
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+
+from core.ai_integrations import claude_client, router
+from core.ai_integrations.cache import generation_cache
+from core.celery import app as celery_app
+
+LOCMEM_AI_CACHE = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ai_generations'}
+
+
+class QueryBudgetMixin:
+    """Mixin for APITestCase: endpoints must stay within a fixed number of queries however many rows they render"""
+
+    def assertBudget(self, budget, url):
+        """GET url within budget queries and expect a 200; returns the response"""
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class StubAIMixin:
+    """Mixin for TestCases: generations come from StubProvider through fresh clients and
+    provider health, the AI caches start empty in local memory and Celery tasks run eagerly"""
+    provider_chain = 'stub:primary,stub:fallback'
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(
+            AI_PROVIDER_CHAIN=self.provider_chain,
+            CACHES={**settings.CACHES, 'ai_generations': LOCMEM_AI_CACHE}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patcher in (
+            mock.patch.dict(router._health, clear=True),
+            mock.patch.object(claude_client, '_shared_async_client', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # The CELERY_IN_MEMORY setup; eager tasks still open a broker connection
+        celery_conf = {'CELERY_BROKER_URL': 'memory://', 'CELERY_TASK_ALWAYS_EAGER': True}
+        previous = {key: celery_app.conf.get(key) for key in celery_conf}
+        celery_app.conf.update(celery_conf)
+        self.addCleanup(celery_app.conf.update, previous)
+
+        claude_client.close_claude_client()
+        self.addCleanup(claude_client.close_claude_client)
+        generation_cache.clear()
+        self.addCleanup(generation_cache.clear)
+        caches['ai_generations'].clear()
@@ -0,0 +1,41 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from apps.ai_content.views import generate_workout_view
+
+User = get_user_model()
+
+
+class AsyncAPIViewTests(APITestCase):
+    """DRF authentication, parsing and errors around the async generation views"""
+
+    url = '/api/ai/generate/workout/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='async@example.com', username='async', password='x')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def test_view_runs_natively_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(generate_workout_view))
+
+    def test_anonymous_request_is_rejected_like_drf_views(self):
+        response = self.client.post(self.url, {}, format='json')
+        drf_response = self.client.get('/api/workouts/stats/')
+        self.assertEqual(response.status_code, drf_response.status_code)
+        self.assertEqual(response.json(), drf_response.json())
+
+    def test_token_authenticated_request_reaches_the_view(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = self.client.post(self.url, {'duration_minutes': 5}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('duration_minutes', response.json())
+
+    def test_other_methods_are_not_allowed(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'POST')
@@ -0,0 +1,87 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from core.ai_integrations.cache import GenerationCache, normalize_profile
+from core.ai_integrations.claude_client import AsyncClaudeClient, ClaudeClient
+from core.ai_integrations.providers import StubProvider
+from core.testing import StubAIMixin
+
+PROFILE = {'age': 31, 'weight': 71.8, 'goals': ['Strength', 'endurance'], 'fitness_level': 'Intermediate '}
+
+
+class ProfileNormalizationTests(SimpleTestCase):
+    """Equivalent users map onto the same prompt, and so the same cache entry"""
+
+    def test_equivalent_profiles_normalize_alike(self):
+        similar = {'age': 38, 'weight': 70.4, 'goals': ['endurance', 'STRENGTH', 'strength'], 'fitness_level': 'Intermediate'}
+        self.assertEqual(normalize_profile(PROFILE), normalize_profile(similar))
+        self.assertEqual(normalize_profile(PROFILE), {
+            'age': '30-39', 'weight': 70, 'goals': ['endurance', 'strength'], 'fitness_level': 'Intermediate'
+        })
+
+    def test_different_age_bands_stay_apart(self):
+        self.assertNotEqual(normalize_profile(PROFILE), normalize_profile({**PROFILE, 'age': 41}))
+
+
+class GenerationCacheTests(StubAIMixin, SimpleTestCase):
+    """The per-process LRU in front of the shared cache tier"""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = GenerationCache(max_entries=2, ttl=60)
+        cache.set('a', {'n': 1})
+        cache.set('b', {'n': 2})
+        cache.get('a')
+        cache.set('c', {'n': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'n': 1})
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = GenerationCache(max_entries=2, ttl=60)
+        cache.set('a', {'n': 1})
+        with mock.patch('core.ai_integrations.cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(cache.get('a'))
+
+    def test_shared_tier_serves_other_processes(self):
+        GenerationCache(max_entries=2, ttl=60, alias='ai_generations').set('a', {'n': 1})
+        other_process = GenerationCache(max_entries=2, ttl=60, alias='ai_generations')
+        self.assertEqual(other_process.get('a'), {'n': 1})
+        caches['ai_generations'].clear()
+        self.assertEqual(other_process.get('a'), {'n': 1})
+
+
+class CachedGenerationTests(StubAIMixin, SimpleTestCase):
+    """Identical generations are served from the cache without another upstream call"""
+
+    def test_repeat_generation_is_a_cache_hit(self):
+        client = ClaudeClient(api_key='test')
+        with mock.patch.object(StubProvider, 'create', autospec=True, side_effect=StubProvider.create) as create:
+            miss = client.generate_workout(PROFILE, 'strength')
+            hit = client.generate_workout({**PROFILE, 'age': 35}, 'strength')
+        self.assertEqual(create.call_count, 1)
+        self.assertFalse(miss['cache_hit'])
+        self.assertGreater(miss['tokens_used'], 0)
+        self.assertTrue(hit['cache_hit'])
+        self.assertEqual(hit['tokens_used'], 0)
+        self.assertEqual(hit['workout'], miss['workout'])
+        self.assertEqual(hit['cache_key'], miss['cache_key'])
+
+    def test_different_parameters_miss(self):
+        client = ClaudeClient(api_key='test')
+        client.generate_workout(PROFILE, 'strength')
+        self.assertFalse(client.generate_workout(PROFILE, 'cardio')['cache_hit'])
+
+    def test_use_cache_false_bypasses_the_cache(self):
+        client = ClaudeClient(api_key='test')
+        client.generate_workout(PROFILE, 'strength')
+        response = client.generate_workout(PROFILE, 'strength', use_cache=False)
+        self.assertFalse(response['cache_hit'])
+        self.assertEqual(response['cache_key'], '')
+
+    def test_sync_and_async_clients_share_entries(self):
+        miss = ClaudeClient(api_key='test').generate_nutrition_plan(PROFILE, ['Lose weight'])
+        hit = asyncio.run(AsyncClaudeClient(api_key='test').generate_nutrition_plan(PROFILE, ['lose weight']))
+        self.assertTrue(hit['cache_hit'])
+        self.assertEqual(hit['nutrition_plan'], miss['nutrition_plan'])
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.ai_integrations import claude_client
+from core.ai_integrations.claude_client import (
+    build_http_options, close_claude_client, get_async_claude_client, get_claude_client
+)
+
+
+class SharedClientTests(SimpleTestCase):
+    """One pooled ClaudeClient per process instead of one per request"""
+
+    def setUp(self):
+        close_claude_client()
+        self.addCleanup(close_claude_client)
+        patcher = mock.patch.object(claude_client, '_shared_async_client', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_is_shared(self):
+        self.assertIs(get_claude_client(), get_claude_client())
+
+    def test_forked_worker_builds_its_own_client(self):
+        parent_client = get_claude_client()
+        with mock.patch.object(claude_client.os, 'getpid', return_value=os.getpid() + 1):
+            child_client = get_claude_client()
+            self.assertIsNot(child_client, parent_client)
+            self.assertIs(get_claude_client(), child_client)
+
+    def test_close_releases_the_pool(self):
+        client = get_claude_client()
+        with mock.patch.object(client, 'close') as close:
+            close_claude_client()
+        close.assert_called_once_with()
+        self.assertIsNot(get_claude_client(), client)
+
+    @override_settings(ANTHROPIC_MAX_CONNECTIONS=7, ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS=3, ANTHROPIC_CONNECT_TIMEOUT=2)
+    def test_pool_limits_come_from_settings(self):
+        options = build_http_options()
+        self.assertEqual(options['limits'].max_connections, 7)
+        self.assertEqual(options['limits'].max_keepalive_connections, 3)
+        self.assertEqual(options['timeout'].connect, 2)
+
+    def test_async_client_is_shared_within_an_event_loop(self):
+        async def clients():
+            return get_async_claude_client(), get_async_claude_client()
+
+        first, again = asyncio.run(clients())
+        self.assertIs(first, again)
+        # Async pools are bound to their loop, so a new loop gets a new client
+        self.assertIsNot(asyncio.run(clients())[0], first)
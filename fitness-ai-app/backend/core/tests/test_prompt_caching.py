@@ -0,0 +1,60 @@
+from anthropic.types import Message
+from django.test import SimpleTestCase
+
+from core.ai_integrations.claude_client import (
+    ClaudeClient, PROMPT_CACHE_MIN_CHARACTERS, SYSTEM_BLOCKS, WORKOUT_INSTRUCTIONS, system_block
+)
+from core.testing import StubAIMixin
+
+
+def message(usage):
+    return Message.model_validate({
+        'id': 'msg_test', 'type': 'message', 'role': 'assistant', 'model': 'primary',
+        'content': [{'type': 'text', 'text': 'Squats'}], 'stop_reason': 'end_turn', 'stop_sequence': None,
+        'usage': usage,
+    })
+
+
+class PromptCachingTests(StubAIMixin, SimpleTestCase):
+    """Static instructions go in a system block shared by every user, cached once long enough"""
+
+    def test_instructions_are_the_system_block(self):
+        client = ClaudeClient(api_key='test')
+        params = client.workout_message_params({'age': 25, 'goals': ['strength']}, 'strength')
+        self.assertEqual(params['system'], [SYSTEM_BLOCKS['workout']])
+        self.assertEqual(params['system'][0]['text'], WORKOUT_INSTRUCTIONS)
+        self.assertIn('Workout Type: strength', params['messages'][-1]['content'])
+
+    def test_only_prefixes_long_enough_to_cache_are_marked(self):
+        for result_key, block in SYSTEM_BLOCKS.items():
+            with self.subTest(result_key):
+                self.assertEqual('cache_control' in block, len(block['text']) >= PROMPT_CACHE_MIN_CHARACTERS)
+
+        long_block = system_block('x' * PROMPT_CACHE_MIN_CHARACTERS)
+        self.assertEqual(long_block['cache_control'], {'type': 'ephemeral'})
+        self.assertNotIn('cache_control', system_block('x' * (PROMPT_CACHE_MIN_CHARACTERS - 1)))
+
+    def test_users_share_the_system_block(self):
+        client = ClaudeClient(api_key='test')
+        first = client.workout_message_params({'age': 25, 'goals': ['strength']}, 'strength')
+        second = client.workout_message_params({'age': 52, 'goals': ['mobility']}, 'yoga')
+        self.assertEqual(first['system'], second['system'])
+        self.assertNotEqual(first['messages'], second['messages'])
+        self.assertNotIn('52', second['system'][0]['text'])
+
+    def test_cached_prompt_tokens_are_counted(self):
+        response = ClaudeClient(api_key='test').message_response('workout', message({
+            'input_tokens': 40, 'output_tokens': 300,
+            'cache_read_input_tokens': 900, 'cache_creation_input_tokens': 0,
+        }))
+        self.assertEqual(response['workout'], 'Squats')
+        self.assertEqual(response['tokens_used'], 40 + 900 + 300)
+        self.assertEqual(response['cache_read_tokens'], 900)
+        self.assertEqual(response['cache_write_tokens'], 0)
+
+    def test_missing_cache_usage_counts_as_zero(self):
+        response = ClaudeClient(api_key='test').message_response('workout', message({
+            'input_tokens': 40, 'output_tokens': 300,
+        }))
+        self.assertEqual(response['tokens_used'], 340)
+        self.assertEqual((response['cache_read_tokens'], response['cache_write_tokens']), (0, 0))
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from core.ai_integrations import router
+from core.ai_integrations.claude_client import AsyncClaudeClient, ClaudeClient
+from core.ai_integrations.router import ProviderHealth, ProviderRouter, ProvidersUnavailable
+
+
+class ScriptedProvider:
+    """Provider that answers, or raises error, and counts its calls"""
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.calls = 0
+
+    def create(self, params, timeout):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return f'message from {self.name}'
+
+
+class HangingProvider:
+    """Provider that never answers within its attempt timeout"""
+    name = 'stub:hanging'
+
+    def create(self, params, timeout):
+        time.sleep(timeout)
+        raise TimeoutError(f'{self.name} did not answer within {timeout:.1f}s')
+
+
+class CancelledProvider:
+    name = 'stub:cancelled'
+
+    async def acreate(self, params, timeout):
+        raise asyncio.CancelledError()
+
+
+@override_settings(AI_PROVIDER_CHAIN='stub:primary')
+class HalfOpenTrialTests(SimpleTestCase):
+    """A half-open trial that ends without an outcome must not block the breaker for good"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(router._health, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def half_open(self, name):
+        health = router._health[name] = ProviderHealth(window=10, max_age=60, failure_threshold=1, cooldown=0)
+        health.record_failure(1.0)
+        self.assertEqual(health.state, 'half_open')
+        return health
+
+    def test_cancelled_trial_is_released(self):
+        health = self.half_open(CancelledProvider.name)
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(ProviderRouter([CancelledProvider()]).acreate({}))
+        self.assertTrue(health.allow_request())
+
+    def test_stream_closed_mid_trial_is_released(self):
+        health = self.half_open('stub:primary')
+
+        async def read_first_event():
+            events = AsyncClaudeClient(api_key='test').stream_medical_analysis({})
+            event = await events.__anext__()
+            self.assertFalse(health.allow_request())
+            await events.aclose()
+            return event
+
+        self.assertEqual(asyncio.run(read_first_event())['type'], 'text')
+        self.assertTrue(health.allow_request())
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """closed -> open after consecutive failures, half-open after the cooldown, then closed or open again"""
+
+    def setUp(self):
+        self.health = ProviderHealth(window=10, max_age=60, failure_threshold=2, cooldown=30)
+
+    def open_and_cool_down(self):
+        self.health.record_failure(1.0)
+        self.assertEqual(self.health.state, 'closed')
+        self.health.record_failure(1.0)
+        self.assertEqual(self.health.state, 'open')
+        self.assertFalse(self.health.allow_request())
+        self.health._opened_at -= self.health.cooldown
+        self.assertEqual(self.health.state, 'half_open')
+
+    def test_successful_trial_closes_the_circuit(self):
+        self.open_and_cool_down()
+        self.assertTrue(self.health.allow_request())
+        self.assertFalse(self.health.allow_request())
+        self.health.record_success(1.0)
+        self.assertEqual(self.health.state, 'closed')
+        self.assertTrue(self.health.allow_request())
+
+    def test_failed_trial_reopens_the_circuit(self):
+        self.open_and_cool_down()
+        self.assertTrue(self.health.allow_request())
+        self.health.record_failure(1.0)
+        self.assertEqual(self.health.state, 'open')
+
+    def test_success_resets_the_failure_count(self):
+        self.health.record_failure(1.0)
+        self.health.record_success(1.0)
+        self.health.record_failure(1.0)
+        self.assertEqual(self.health.state, 'closed')
+
+
+@override_settings(AI_CIRCUIT_FAILURE_THRESHOLD=2, AI_CIRCUIT_COOLDOWN=30)
+class ProviderRouterTests(SimpleTestCase):
+    """Fallback, breaker skipping and demotion across providers"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(router._health, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_transient_failure_falls_back_to_the_next_provider(self):
+        primary = ScriptedProvider('stub:primary', TimeoutError('slow'))
+        fallback = ScriptedProvider('stub:fallback')
+        message, provider = ProviderRouter([primary, fallback]).create({})
+        self.assertEqual((message, provider), ('message from stub:fallback', fallback))
+        self.assertEqual(router.get_provider_health('stub:primary').error_rate(), 1.0)
+
+    def test_open_circuit_is_skipped(self):
+        primary = ScriptedProvider('stub:primary', TimeoutError('slow'))
+        fallback = ScriptedProvider('stub:fallback')
+        providers = ProviderRouter([primary, fallback])
+        for _ in range(3):
+            providers.create({})
+        self.assertEqual(router.get_provider_health('stub:primary').state, 'open')
+        self.assertEqual((primary.calls, fallback.calls), (2, 3))
+
+    @override_settings(AI_PROVIDER_TIMEOUT=0.2, AI_ROUTER_DEADLINE=0.5, AI_PROVIDER_MIN_ATTEMPT_TIME=0.05)
+    def test_hung_provider_fails_over_within_the_deadline(self):
+        fallback = ScriptedProvider('stub:fallback')
+        started = time.monotonic()
+        message, provider = ProviderRouter([HangingProvider(), fallback]).create({})
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIs(provider, fallback)
+        self.assertEqual(router.get_provider_health(HangingProvider.name).error_rate(), 1.0)
+
+    def test_default_deadline_leaves_room_for_a_fallback_attempt(self):
+        self.assertGreaterEqual(
+            settings.AI_ROUTER_DEADLINE - settings.AI_PROVIDER_TIMEOUT,
+            settings.AI_PROVIDER_TIMEOUT
+        )
+
+    def test_non_retryable_error_is_raised_without_fallback(self):
+        primary = ScriptedProvider('stub:primary', ValueError('bad request'))
+        fallback = ScriptedProvider('stub:fallback')
+        with self.assertRaises(ValueError):
+            ProviderRouter([primary, fallback]).create({})
+        self.assertEqual(fallback.calls, 0)
+        self.assertEqual(router.get_provider_health('stub:primary').error_rate(), 0.0)
+
+    def test_last_error_is_raised_when_every_provider_fails(self):
+        error = TimeoutError('slow')
+        providers = ProviderRouter([ScriptedProvider('stub:primary', error), ScriptedProvider('stub:fallback', error)])
+        with self.assertRaises(TimeoutError):
+            providers.create({})
+        with self.assertRaises(TimeoutError):
+            providers.create({})
+        # Both circuits are open now, so nothing is tried
+        with self.assertRaises(ProvidersUnavailable):
+            providers.create({})
+
+    @override_settings(AI_PROVIDER_SLOW_P95=5)
+    def test_degraded_provider_is_demoted(self):
+        primary = ScriptedProvider('stub:primary')
+        fallback = ScriptedProvider('stub:fallback')
+        providers = ProviderRouter([primary, fallback])
+        health = router.get_provider_health('stub:primary')
+        for _ in range(ProviderHealth.min_samples - 1):
+            health.record_success(10.0)
+        self.assertEqual(providers.candidates(), [primary, fallback])
+
+        health.record_success(10.0)
+        self.assertEqual(providers.candidates(), [fallback, primary])
+        self.assertEqual(providers.create({})[1], fallback)
+
+
+class ProviderRetryTests(SimpleTestCase):
+
+    @override_settings(ANTHROPIC_MAX_RETRIES=4, AI_PROVIDER_CHAIN='anthropic:primary,anthropic:fallback')
+    def test_routed_calls_leave_retries_to_the_router(self):
+        claude_client = ClaudeClient(api_key='test')
+        self.assertEqual(claude_client.client.max_retries, 4)
+        self.assertEqual([provider.client.max_retries for provider in claude_client.router.providers], [0, 0])
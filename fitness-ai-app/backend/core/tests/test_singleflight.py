@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from core.ai_integrations.singleflight import SingleFlight
+from core.testing import StubAIMixin
+
+
+def single_flight_for(alias=None):
+    return SingleFlight(alias=alias, lock_timeout=10, result_ttl=10, poll_interval=0.01)
+
+
+class SingleFlightTests(StubAIMixin, SimpleTestCase):
+    """Concurrent identical calls share one execution"""
+
+    def run_concurrently(self, calls):
+        """Start each call in its own thread, 20 ms apart; returns their results in order"""
+        results = [None] * len(calls)
+
+        def run(i, call):
+            results[i] = call()
+
+        threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        return results
+
+    def slow_generation(self, calls, text):
+        def generate():
+            calls.append(text)
+            time.sleep(0.2)
+            return {'success': True, 'workout': text}
+        return generate
+
+    def test_threads_in_one_process_share_the_call(self):
+        flight, calls = single_flight_for(), []
+        generate = self.slow_generation(calls, 'shared')
+        results = self.run_concurrently([lambda: flight.do('key', generate)] * 5)
+        self.assertEqual(calls, ['shared'])
+        self.assertEqual(results, [{'success': True, 'workout': 'shared'}] * 5)
+
+        # Results are copies, so one caller's changes don't leak into another's
+        results[0]['source_request_id'] = 1
+        self.assertNotIn('source_request_id', results[1])
+
+    def test_processes_share_the_call_through_the_shared_cache(self):
+        first_process, second_process = single_flight_for('ai_generations'), single_flight_for('ai_generations')
+        calls = []
+        results = self.run_concurrently([
+            lambda: first_process.do('key', self.slow_generation(calls, 'first')),
+            lambda: second_process.do('key', self.slow_generation(calls, 'second')),
+        ])
+        self.assertEqual(calls, ['first'])
+        self.assertEqual(results[1]['workout'], 'first')
+
+    def test_different_keys_run_separately(self):
+        flight, calls = single_flight_for(), []
+        self.run_concurrently([
+            lambda: flight.do('strength', self.slow_generation(calls, 'strength')),
+            lambda: flight.do('cardio', self.slow_generation(calls, 'cardio')),
+        ])
+        self.assertEqual(sorted(calls), ['cardio', 'strength'])
+
+    def test_followers_run_their_own_call_when_the_leader_fails(self):
+        flight, calls = single_flight_for(), []
+
+        def failing():
+            time.sleep(0.2)
+            raise TimeoutError('No answer')
+
+        def leader():
+            try:
+                flight.do('key', failing)
+            except TimeoutError as e:
+                return e
+
+        results = self.run_concurrently([leader, lambda: flight.do('key', self.slow_generation(calls, 'retry'))])
+        self.assertIsInstance(results[0], TimeoutError)
+        self.assertEqual(results[1]['workout'], 'retry')